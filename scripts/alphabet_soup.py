@@ -3,30 +3,72 @@
 Google Autocomplete 挖词模块 (Alphabet Soup)
 """
 
-import time
-import random
+import asyncio
 import requests
-from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlparse
+
+from prefix_expander import PrefixExpander
+from suggest_cache import SUGGEST_URL, get_suggest_cache
+from throttle import AsyncRateLimiter
+
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
 
 
 class GoogleSuggestHarvester:
-    """Google 自动补全挖词器"""
+    """Google 自动补全挖词器
     
-    def __init__(self):
+    concurrency: 同时进行的请求数上限
+    rate_limit: 每台主机每秒最多发起的请求数（None 表示不限）
+    use_cache: 是否读写共享的本地建议缓存
+    seen: 已处理关键词索引（seen_index.SeenIndex），设置后结果中去掉以前处理过的词；
+          由调用方在处理完成后 add() 记录
+    """
+    
+    def __init__(self, concurrency=8, rate_limit=10.0, base_url=SUGGEST_URL, use_cache=True, seen=None):
+        self.concurrency = max(1, concurrency)
+        self.seen = seen
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        self.limiter = AsyncRateLimiter(rate_limit)
+        self.cache = get_suggest_cache() if use_cache else None
+        self.stats = {}
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # 连接池与并发数对齐，避免并发时频繁重建连接
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def _get_cached(self, keyword):
+        """读取本地缓存，未命中（或未启用缓存）返回 None"""
+        if self.cache is None:
+            return None
+        return self.cache.get(keyword, endpoint=self.base_url)
     
     def _get_suggestions(self, keyword):
-        """获取单个关键词的建议"""
-        url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={quote(keyword)}"
+        """获取单个关键词的建议（优先读缓存）"""
+        cached = self._get_cached(keyword)
+        if cached is not None:
+            return cached
+        return self._request_suggestions(keyword)
+    
+    def _request_suggestions(self, keyword):
+        """请求接口并写入缓存"""
+        url = f"{self.base_url}?client=firefox&q={quote(keyword)}"
         
         try:
             response = self.session.get(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
-                return data[1] if len(data) > 1 else []
+                suggestions = data[1] if len(data) > 1 else []
+                if self.cache is not None:
+                    self.cache.put(keyword, suggestions, endpoint=self.base_url)
+                return suggestions
         except Exception as e:
             pass
         
@@ -39,25 +81,89 @@ class GoogleSuggestHarvester:
         # 简化版：只返回主关键词
         return []
     
-    def harvest(self, seed_words, max_per_word=20):
-        """批量挖词"""
-        all_suggestions = set()
-        
+    def _build_queries(self, seed_words, max_per_word):
+        """展开种子词：基础查询 + 字母汤变体，附带每个查询保留的建议数"""
+        queries = []
         for word in seed_words:
-            # 基础建议
-            suggestions = self._get_suggestions(word)
-            all_suggestions.update(suggestions[:max_per_word])
-            
-            # 字母汤变体
-            for char in 'abcdefghijklmnopqrstuvwxyz':
-                variant = f"{char} {word}"
-                suggestions = self._get_suggestions(variant)
-                all_suggestions.update(suggestions[:max_per_word // 2])
-            
-            # 随机延迟，避免限频
-            time.sleep(random.uniform(0.5, 1.5))
+            queries.append((word, max_per_word))
+            for char in LETTERS:
+                queries.append((f"{char} {word}", max_per_word // 2))
+        return queries
+    
+    async def harvest_async(self, seed_words, max_per_word=20, query_budget=None, on_keywords=None):
+        """并发批量挖词
+        
+        默认模式：所有种子词及其 a-z 变体同时排队，受并发上限和主机限频约束，
+        返回结果与逐个请求完全一致。
+        
+        query_budget: 设置后改用前缀树扩展（见 prefix_expander），
+        每层前缀并发查询，总请求数不超过该预算。
+        
+        on_keywords: 每完成一个查询就用其建议列表回调一次（在事件循环线程内调用，
+        回调阻塞会暂停后续请求，可借此向下游施加背压）
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        
+        async def fetch(query):
+            # 缓存命中不占并发名额，也不受限频约束
+            cached = self._get_cached(query)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                await self.limiter.wait(self.host)
+                return await loop.run_in_executor(executor, self._request_suggestions, query)
+        
+        async def fetch_and_emit(query, limit=None):
+            suggestions = await fetch(query)
+            if on_keywords is not None:
+                emitted = suggestions[:limit]
+                if self.seen is not None:
+                    emitted = self.seen.filter_new(emitted)
+                on_keywords(emitted)
+            return suggestions
+        
+        try:
+            if query_budget:
+                expander = PrefixExpander(query_budget=query_budget)
+                expander.start(seed_words)
+                while True:
+                    batch = expander.next_batch()
+                    if not batch:
+                        break
+                    results = await asyncio.gather(*(fetch_and_emit(query) for query, _ in batch))
+                    expander.feed(batch, results)
+                all_suggestions = expander.keywords
+                requests_made = expander.queries
+            else:
+                queries = self._build_queries(seed_words, max_per_word)
+                results = await asyncio.gather(*(fetch_and_emit(query, limit) for query, limit in queries))
+                all_suggestions = set()
+                for (_, limit), suggestions in zip(queries, results):
+                    all_suggestions.update(suggestions[:limit])
+                requests_made = len(queries)
+        finally:
+            executor.shutdown(wait=False)
+        
+        harvested = len(all_suggestions)
+        if self.seen is not None:
+            all_suggestions = set(self.seen.filter_new(all_suggestions))
+        
+        self.stats = {
+            'requests': requests_made,
+            'keywords': len(all_suggestions),
+            'yield_per_request': len(all_suggestions) / requests_made if requests_made else 0,
+            'skipped_seen': harvested - len(all_suggestions),
+        }
+        if self.cache is not None:
+            self.stats['cache'] = self.cache.stats()
         
         return all_suggestions
+    
+    def harvest(self, seed_words, max_per_word=20, query_budget=None, on_keywords=None):
+        """批量挖词（同步入口）"""
+        return asyncio.run(self.harvest_async(seed_words, max_per_word, query_budget, on_keywords))
 
 
 # 简化版实现
@@ -0,0 +1,1320 @@
+#!/usr/bin/env python3
+"""
+Profit Hunter ULTIMATE - 性能基准测试
+
+Usage:
+    python3 benchmark.py harvest              # 串行 vs 并发 Alphabet Soup
+    python3 benchmark.py expand               # 固定 a-z vs 前缀树扩展
+    python3 benchmark.py trends               # 逐个 vs 5 词批量 Trends payload
+    python3 benchmark.py metrics              # 逐列 pandas vs 向量化趋势指标
+    python3 benchmark.py matcher              # 逐词子串扫描 vs 编译匹配器
+    python3 benchmark.py frame                # 逐词 dict 评分 vs 列式 score_frame
+    python3 benchmark.py parallel             # 1/2/4/8 进程评分扩展性
+    python3 benchmark.py topk                 # 全量排序 vs Top-K 选择
+    python3 benchmark.py rescore              # 完整评分 vs 分项得分增量重算
+    python3 benchmark.py memory               # 逐条 dict vs KeywordRecord 常驻内存
+    python3 benchmark.py features             # 五个评分器各扫一遍 vs 共享特征引擎一次匹配
+    python3 benchmark.py warehouse            # 逐条提交 vs 批量 executemany 写入关键词仓库
+    python3 benchmark.py table                # CSV vs Parquet 表的写入、加载与列裁剪
+    python3 benchmark.py spill                # 深度挖掘全量结果留在内存 vs 每轮落盘 + Top-K
+    python3 benchmark.py novelty              # 每轮重建同一批候选词 vs 惰性关键词空间的新词覆盖
+    python3 benchmark.py seen                 # 内存 set vs 持久化 Bloom 过滤器的已处理关键词去重
+    python3 benchmark.py serp                 # Playwright 逐个开页面 + sleep vs 浏览器池并发（需 chromium）
+    python3 benchmark.py serp-modes           # SERP 整页 vs 拦截资源 vs HTTP 直取（每页字节数和耗时）
+    python3 benchmark.py archive              # SERP 页面压缩归档 + 单进程 vs 多进程离线重新解析
+    python3 benchmark.py serp-parse           # SERP 逐个 count 子串 vs 一次遍历的结构化解析（逐页耗时）
+    python3 benchmark.py domains              # SERP 域名子串匹配 vs 可注册域名 + 分类表（速度和误判）
+
+所有网络相关基准都跑在本地模拟服务上，不访问真实接口。
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, quote_plus, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+# ============== 本地模拟 Suggest 服务 ==============
+
+class FakeSuggestHandler(BaseHTTPRequestHandler):
+    """模拟 suggestqueries.google.com：固定延迟，按查询词生成 10 条建议"""
+    
+    latency = 0.05
+    
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        time.sleep(self.latency)
+        
+        suggestions = [f"{query} {i}" for i in range(10)]
+        body = json.dumps([query, suggestions]).encode('utf-8')
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_suggest_server(latency=0.05):
+    """启动本地模拟服务，返回 (server, base_url)"""
+    handler = type('Handler', (FakeSuggestHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/complete/search"
+
+
+class FakeSerpHandler(BaseHTTPRequestHandler):
+    """模拟搜索结果页：固定延迟，返回 3 条自然结果
+    
+    页面和真实结果页一样引用图片、样式表、字体和第三方统计脚本（/static/*，
+    第三方脚本走 localhost 主机名），用来对比拦截资源前后的流量和耗时
+    """
+    
+    latency = 0.3
+    asset_latency = 0.05
+    
+    # 路径 -> (Content-Type, 字节数)
+    ASSETS = {
+        "/static/app.css": ("text/css", 40_000),
+        "/static/roboto.woff2": ("font/woff2", 60_000),
+        "/static/logo.png": ("image/png", 25_000),
+        "/static/thumb.jpg": ("image/jpeg", 30_000),
+        "/static/tracker.js": ("application/javascript", 80_000),
+    }
+    
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in self.ASSETS:
+            time.sleep(self.asset_latency)
+            content_type, size = self.ASSETS[path]
+            if path == "/static/app.css":
+                body = b"@font-face{font-family:r;src:url(/static/roboto.woff2)}body{font-family:r}"
+                body += b" " * (size - len(body))
+            else:
+                body = b"\0" * size
+            self._send(content_type, body)
+            return
+        
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        time.sleep(self.latency)
+        
+        results = "".join(
+            f'<div class="g"><div class="yuRUbf"><a href="https://{domain}/{quote(query)}">{query}</a></div>'
+            f'<img src="/static/thumb.jpg?{domain}"></div>'
+            for domain in ("reddit.com", "medium.com", "github.com")
+        )
+        port = self.server.server_port
+        body = (
+            f'<html><head><link rel="stylesheet" href="/static/app.css"></head><body>'
+            f'<img src="/static/logo.png"><div id="search">{results}</div>'
+            f'<script src="http://localhost:{port}/static/tracker.js"></script></body></html>'
+        ).encode('utf-8')
+        self._send('text/html; charset=utf-8', body)
+        
+    def _send(self, content_type, body):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_serp_server(latency=0.3, asset_latency=0.05):
+    """启动本地模拟搜索结果页服务，返回 (server, search_url)"""
+    handler = type('Handler', (FakeSerpHandler,), {'latency': latency, 'asset_latency': asset_latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/search"
+
+
+def build_fake_serp_html(query, rng):
+    """构造一个接近真实大小（约 300KB）的结果页：大段内联脚本和样式、10 条自然结果、
+    广告块、"相关问题"等 SERP 特性，正文里混有工具/论坛字样"""
+    domains = ["reddit.com", "quora.com", "stackoverflow.com", "medium.com", "dev.to", "github.com",
+               "canva.com", "adobe.com", "www.notion.so", "calculatorsoup.com", "smallpdf.com",
+               "freeconvert.com", "example-blog.net", "docs.python.org", "wikipedia.org"]
+    words = ["free", "online", "tool", "guide", "how", "best", "forum", "calculator", "convert", "fast",
+             "simple", "template", "review", "compare", "generator", "easy", "app", "download"]
+    
+    def text(count):
+        return " ".join(rng.choice(words) for _ in range(count))
+    
+    script = "".join(f"var _{i}=function(a,b){{return a.{rng.choice(words)}(b)||'{text(4)}'}};"
+                     for i in range(2600))
+    style = "".join(f".c{i}{{margin:{i % 17}px;padding:{i % 5}px;font:{i % 13}px arial}}" for i in range(1100))
+    ads = "".join(
+        f'<div class="uEierd" data-text-ad="1"><a href="https://ads.{rng.choice(domains)}/lp?q={quote(query)}">'
+        f'<span>Sponsored</span> {text(8)}</a></div>'
+        for _ in range(rng.randint(0, 4))
+    )
+    results = "".join(
+        f'<div class="g"><div class="yuRUbf"><a href="https://{domain}/{quote(query)}/{i}"><h3>{text(6)}</h3></a>'
+        f'</div><div class="VwiC3b">{text(30)}</div></div>'
+        for i, domain in enumerate(rng.sample(domains, 10))
+    )
+    questions = "".join(f'<div class="related-question-pair" data-q="{text(5)}">{text(20)}</div>'
+                        for _ in range(rng.randint(0, 4)))
+    nav = "".join(f'<a href="/search?q={quote(query)}&tbm={tab}">{tab}</a>' for tab in ("isch", "vid", "nws", "shop"))
+    return (
+        f'<!doctype html><html><head><title>{query} - Google Search</title><style>{style}</style>'
+        f'<script nonce="x">{script}</script></head><body><div id="top_nav">{nav}</div>'
+        f'<div id="tads">{ads}</div><div id="search"><div id="rso">{questions}{results}</div></div>'
+        f'<div id="footcnt"><a href="https://policies.google.com/privacy">Privacy</a>'
+        f'<a href="https://support.google.com/websearch">Help</a></div></body></html>'
+    )
+
+
+def build_fake_completion(seeds, phrases_per_seed=400, page_size=10, rng_seed=42):
+    """构造模拟补全语料，按热度返回前 page_size 条
+    
+    匹配规则模仿 Google：查询的每个词都是短语对应位置单词的前缀，
+    所以 "b seed" 能补全出 "bmi seed"，"seed b" 能补全出 "seed bulk ..."。
+    首字母按英文词频分布，部分字母分支天然稀疏。
+    """
+    rng = random.Random(rng_seed)
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    weights = [26 - i for i in range(len(letters))]
+    vocab = [''.join(rng.choices(letters, weights, k=rng.randint(3, 8)))
+             for _ in range(2000)]
+    
+    corpus = {}
+    for seed in seeds:
+        for _ in range(phrases_per_seed):
+            form = rng.random()
+            if form < 0.5:
+                phrase = f"{seed} {rng.choice(vocab)}"
+            elif form < 0.8:
+                phrase = f"{seed} {rng.choice(vocab)} {rng.choice(vocab)}"
+            else:
+                phrase = f"{rng.choice(vocab)} {seed}"
+            corpus[phrase] = rng.paretovariate(1.2)
+    
+    ranked = sorted(corpus, key=corpus.get, reverse=True)
+    
+    def matches(phrase, tokens):
+        words = phrase.split()
+        return len(words) >= len(tokens) and all(w.startswith(t) for w, t in zip(words, tokens))
+    
+    def fetch(query):
+        tokens = query.split()
+        return [p for p in ranked if matches(p, tokens)][:page_size]
+    
+    return fetch, len(corpus)
+
+
+class FakeTrendReq:
+    """模拟 pytrends.TrendReq：每个关键词有固定的真实热度，
+    每个 payload 内按最大值归一化到 0-100 并取整（与 Google Trends 一致）"""
+    
+    def __init__(self, volumes, days=90, rng_seed=7):
+        import numpy as np
+        import pandas as pd
+        self._pd = pd
+        rng = np.random.default_rng(rng_seed)
+        self.curves = {kw: vol * (1 + 0.1 * rng.standard_normal(days)).clip(0.5)
+                       for kw, vol in volumes.items()}
+        self.index = pd.date_range(end="2026-01-01", periods=days)
+        self.payloads = 0
+        self.kw_list = []
+    
+    def build_payload(self, kw_list, timeframe=None, geo=""):
+        self.payloads += 1
+        self.kw_list = list(kw_list)
+    
+    def interest_over_time(self):
+        peak = max(self.curves[kw].max() for kw in self.kw_list)
+        return self._pd.DataFrame(
+            {kw: (self.curves[kw] / peak * 100).round() for kw in self.kw_list},
+            index=self.index
+        )
+    
+    def related_queries(self):
+        return {kw: {"rising": None, "top": None} for kw in self.kw_list}
+
+
+def build_fake_keywords(count, rng_seed=5):
+    """用信号词 + 普通词随机拼出关键词，覆盖各类命中组合"""
+    from config import PAIN_TRIGGERS, INTENT_SIGNALS
+    from scorer import USER_INTENTS
+    
+    rng = random.Random(rng_seed)
+    signal_words = sorted({
+        w for group in [PAIN_TRIGGERS['strong'], *[v for v in INTENT_SIGNALS.values() if isinstance(v, list)]]
+        for w in group
+    } | {w for info in USER_INTENTS.values() for w in info['keywords']})
+    plain_words = ["pdf", "image", "video", "text", "json", "excel", "photo", "canvas",
+                   "budget", "invoice", "resume", "password", "online", "free", "web", "ai"]
+    return [
+        " ".join(rng.choice(signal_words) if rng.random() < 0.3 else rng.choice(plain_words)
+                 for _ in range(rng.randint(1, 5)))
+        for _ in range(count)
+    ]
+
+
+def legacy_signals(keyword):
+    """重构前 KeywordScorer 的逐词子串扫描（基准对照）"""
+    from config import PAIN_TRIGGERS, INTENT_SIGNALS
+    from scorer import USER_INTENTS
+    
+    keyword_lower = keyword.lower()
+    score, signals = 50, []
+    for trigger in PAIN_TRIGGERS.get('strong', []):
+        if trigger in keyword_lower:
+            score += 40
+            signals.append(f'痛点:{trigger}')
+            break
+    for name, label, bonus in [('tool', '工具', 30), ('对比', '对比', 25), ('B2B', 'B2B', 25), ('速度', '速度', 20)]:
+        for word in INTENT_SIGNALS.get(name, []):
+            if word in keyword_lower:
+                score += bonus
+                signals.append(f'{label}:{word}')
+                break
+    word_count = len(keyword.split())
+    if word_count >= 2:
+        score += 15
+        signals.append(f'长尾:{word_count}词')
+    
+    buildability = 70
+    if any(w in keyword_lower for w in ['calculator', 'generator', 'converter']):
+        buildability = 100
+    elif any(w in keyword_lower for w in ['online', 'free', 'web']):
+        buildability = 85
+    
+    intents = []
+    for intent_type, info in USER_INTENTS.items():
+        for kw in info['keywords']:
+            if kw in keyword_lower:
+                intents.append(intent_type)
+                break
+    return (min(100, score), signals), buildability, intents
+
+
+def legacy_features(keyword, groups):
+    """重构前各评分器各扫一遍：每个档案单独小写、分词、逐个子串判断（基准对照）
+    
+    groups: [[(类别, 信号词列表), ...], ...]，每个档案一组
+    """
+    hits = {}
+    for group in groups:
+        keyword_lower = keyword.lower()
+        word_count = len(keyword.split())
+        for category, words in group:
+            found = {word for word in words if word in keyword_lower}
+            if found:
+                hits[category] = found
+    return word_count, hits
+
+
+def build_fake_analysis(keywords, seed=42):
+    """随机生成 trends/gpts/serp/deep 分析数据（部分关键词缺失，走默认值）"""
+    rng = random.Random(seed)
+    trends, gpts, serp, deep = {}, {}, {}, {}
+    for kw in keywords:
+        if rng.random() < 0.8:
+            trends[kw] = {'trend_score': rng.choice([rng.randint(0, 100), rng.random() * 100])}
+        if rng.random() < 0.7:
+            gpts[kw] = {'ratio': rng.random() * 3}
+        if rng.random() < 0.7:
+            serp[kw] = {
+                'competition_score': rng.randint(0, 100),
+                '降维打击': rng.random() < 0.2,
+                'competition': rng.choice(['LOW', 'MEDIUM', 'HIGH']),
+            }
+        if rng.random() < 0.6:
+            deep[kw] = {
+                'demand_strength': rng.choice(['HIGH', 'MEDIUM', 'LOW']),
+                'community_buzz': rng.randint(0, 9),
+                'is_pain_point': rng.random() < 0.3,
+                'is_tool_demand': rng.random() < 0.3,
+                'is_comparison': rng.random() < 0.2,
+            }
+    return trends, gpts, serp, deep
+
+
+def legacy_score(scorer, keyword):
+    """重构前 KeywordScorer 的逐词评分：每个关键词单独算分、组 dict（基准对照）"""
+    from scorer import V3_FEATURES
+    
+    serp = scorer.serp.get(keyword, {})
+    deep = scorer.deep.get(keyword, {})
+    features = V3_FEATURES.extract(keyword)
+    intent_score, _ = scorer._calc_intent_score(keyword, features)
+    
+    bonus = {'HIGH': 15, 'MEDIUM': 8}.get(deep.get('demand_strength'), 0)
+    bonus += min(10, deep.get('community_buzz', 0) * 2)
+    bonus += 10 if deep.get('is_pain_point') else 0
+    bonus += 5 if deep.get('is_tool_demand') else 0
+    
+    final_score = (
+        scorer.trends.get(keyword, {}).get('trend_score', 50) * scorer.weights['trend'] +
+        intent_score * scorer.weights['intent'] +
+        serp.get('competition_score', 60) * scorer.weights['competition'] +
+        scorer._calc_buildability(keyword, features) * scorer.weights['buildability'] +
+        bonus
+    )
+    if serp.get('降维打击'):
+        final_score = min(100, final_score + 20)
+    return round(final_score, 1)
+
+
+# ============== 基准项 ==============
+
+def bench_harvest(args):
+    """Alphabet Soup：串行（concurrency=1）vs 并发"""
+    from alphabet_soup import GoogleSuggestHarvester
+    
+    server, base_url = start_fake_suggest_server(args.latency)
+    seeds = [f"seed{i}" for i in range(args.seeds)]
+    
+    print(f"📊 种子词: {len(seeds)} 个 | 每个种子 27 次请求 | 模拟延迟: {args.latency*1000:.0f}ms")
+    
+    try:
+        harvester = GoogleSuggestHarvester(concurrency=1, rate_limit=None,
+                                           base_url=base_url, use_cache=False)
+        start = time.perf_counter()
+        sequential = harvester.harvest(seeds)
+        sequential_time = time.perf_counter() - start
+        print(f"   串行:          {sequential_time:6.2f}s  ({len(sequential)} 个关键词)")
+        
+        harvester = GoogleSuggestHarvester(concurrency=args.concurrency,
+                                           rate_limit=args.rate, base_url=base_url,
+                                           use_cache=False)
+        start = time.perf_counter()
+        concurrent = harvester.harvest(seeds)
+        concurrent_time = time.perf_counter() - start
+        print(f"   并发 x{args.concurrency:<3}:     {concurrent_time:6.2f}s  ({len(concurrent)} 个关键词)")
+    finally:
+        server.shutdown()
+    
+    print(f"   🚀 加速比: {sequential_time / concurrent_time:.1f}x | 结果一致: {sequential == concurrent}")
+
+
+def bench_expand(args):
+    """前缀扩展：固定 a-z 循环 vs 前缀树扩展，比较每次请求的新词产出
+    
+    两种方式使用同一个模拟补全语料和相同的请求预算。
+    """
+    from prefix_expander import LETTERS, PrefixExpander
+    
+    seeds = [f"seed{i}" for i in range(args.seeds)]
+    fetch, corpus_size = build_fake_completion(seeds)
+    budget = len(seeds) * 27
+    
+    print(f"📊 种子词: {len(seeds)} 个 | 模拟语料: {corpus_size} 条 | 请求预算: {budget}")
+    
+    flat = set()
+    for seed in seeds:
+        flat.update(fetch(seed))
+        for char in LETTERS:
+            flat.update(fetch(f"{char} {seed}"))
+    print(f"   固定 a-z:   {budget:5d} 次请求 → {len(flat):5d} 个关键词 "
+          f"({len(flat) / budget:.2f}/请求)")
+    
+    expander = PrefixExpander(query_budget=budget)
+    trie = expander.expand(seeds, fetch)
+    print(f"   前缀树扩展: {expander.queries:5d} 次请求 → {len(trie):5d} 个关键词 "
+          f"({expander.yield_per_request:.2f}/请求)")
+
+
+def bench_trends(args):
+    """Trends：逐个关键词一个 payload vs 锚点词 + 4 词批量，比较 payload 数和换算误差"""
+    import numpy as np
+    from trends_batch import fetch_batched_trends
+    
+    rng = np.random.default_rng(1)
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    volumes = dict(zip(keywords, rng.lognormal(mean=3, sigma=0.6, size=len(keywords))))
+    
+    single = FakeTrendReq(volumes)
+    for kw in keywords:
+        single.build_payload([kw])
+        single.interest_over_time()
+        single.related_queries()
+    
+    batched = FakeTrendReq(volumes)
+    interest, _, _ = fetch_batched_trends(batched, keywords, anchor=keywords[0], delay=0)
+    
+    # 换算后的热度比值应与真实热度比值一致
+    anchor_level = interest[keywords[0]].mean()
+    true_anchor = batched.curves[keywords[0]].mean()
+    errors = [
+        abs(interest[kw].mean() / anchor_level - batched.curves[kw].mean() / true_anchor)
+        / (batched.curves[kw].mean() / true_anchor)
+        for kw in keywords
+    ]
+    
+    print(f"📊 关键词: {len(keywords)} 个")
+    print(f"   逐个查询:   {single.payloads:4d} 个 payload")
+    print(f"   5 词批量:   {batched.payloads:4d} 个 payload")
+    print(f"   📉 请求减少: {single.payloads / batched.payloads:.1f}x | "
+          f"跨批换算误差: 中位数 {np.median(errors):.1%}, 最大 {max(errors):.1%}")
+
+
+def bench_metrics(args):
+    """趋势指标：逐个关键词 pandas 计算 vs trend_metrics 一次向量化"""
+    import numpy as np
+    import pandas as pd
+    from trend_metrics import trend_metrics
+    
+    rng = np.random.default_rng(3)
+    index = pd.date_range(end="2026-01-01", periods=args.points)
+    frame = pd.DataFrame(rng.integers(0, 100, size=(args.points, args.series)).astype(float),
+                         index=index, columns=[f"kw{i}" for i in range(args.series)])
+    
+    print(f"📊 序列: {args.series} 条 × {args.points} 个时间点")
+    
+    start = time.perf_counter()
+    loop = {}
+    for keyword in frame.columns:
+        series = frame[keyword]
+        recent = series.tail(7).mean()
+        older = series.tail(30).mean() if len(series) > 7 else recent
+        growth = (recent - older) / older * 100 if older > 0 else 0
+        loop[keyword] = (min(100, max(0, 50 + growth)) if older > 0 else 0, growth)
+    loop_time = time.perf_counter() - start
+    print(f"   逐列 pandas: {loop_time:6.3f}s  (仅 trend_score + growth)")
+    
+    start = time.perf_counter()
+    metrics = trend_metrics(frame)
+    vector_time = time.perf_counter() - start
+    print(f"   向量化:      {vector_time:6.3f}s  (trend_score + growth + slope + volatility)")
+    
+    match = all(
+        np.isclose(score, metrics.at[kw, 'trend_score']) and np.isclose(growth, metrics.at[kw, 'growth'])
+        for kw, (score, growth) in loop.items()
+    )
+    print(f"   🚀 加速比: {loop_time / vector_time:.0f}x | 结果一致: {match}")
+
+
+def bench_matcher(args):
+    """评分信号匹配：逐词子串扫描 vs 编译后的单次匹配"""
+    from scorer import KeywordScorer, USER_INTENTS, V3_FEATURES
+    
+    keywords = build_fake_keywords(args.keywords)
+    scorer = KeywordScorer({}, {}, {})
+    print(f"📊 关键词: {len(keywords):,} 个")
+    
+    start = time.perf_counter()
+    legacy = [legacy_signals(kw) for kw in keywords]
+    legacy_time = time.perf_counter() - start
+    print(f"   逐词扫描:   {legacy_time:6.2f}s  ({len(keywords) / legacy_time:10,.0f} 词/秒)")
+    
+    start = time.perf_counter()
+    compiled = []
+    for kw in keywords:
+        features = V3_FEATURES.extract(kw)
+        compiled.append((
+            scorer._calc_intent_score(kw, features),
+            scorer._calc_buildability(kw, features),
+            [t for t in USER_INTENTS if features.has(f'v3:user:{t}')],
+        ))
+    compiled_time = time.perf_counter() - start
+    print(f"   编译匹配器: {compiled_time:6.2f}s  ({len(keywords) / compiled_time:10,.0f} 词/秒)")
+    
+    print(f"   🚀 加速比: {legacy_time / compiled_time:.1f}x | 结果一致: {legacy == compiled}")
+
+
+def bench_frame(args):
+    """关键词评分：逐词 dict vs 列式 score_frame"""
+    from scorer import KeywordScorer
+    
+    keywords = build_fake_keywords(args.keywords)
+    scorer = KeywordScorer(*build_fake_analysis(keywords))
+    print(f"📊 关键词: {len(keywords):,} 个")
+    
+    start = time.perf_counter()
+    legacy = [legacy_score(scorer, kw) for kw in keywords]
+    legacy_time = time.perf_counter() - start
+    print(f"   逐词评分:    {legacy_time:6.2f}s  (仅 final_score)")
+    
+    frame = scorer.to_frame(keywords)
+    start = time.perf_counter()
+    result = scorer.score_frame(frame)
+    frame_time = time.perf_counter() - start
+    print(f"   score_frame: {frame_time:6.2f}s  (全部字段 + decision)")
+    
+    start = time.perf_counter()
+    scorer.get_final_results(scorer.score(keywords))
+    print(f"   dict 接口:   {time.perf_counter() - start:6.2f}s  (score + get_final_results)")
+    
+    match = legacy == result['final_score'].tolist()
+    print(f"   🚀 加速比: {legacy_time / frame_time:.1f}x | 结果一致: {match}")
+
+
+def bench_parallel(args):
+    """多进程评分扩展性：KeywordScorer / 深度挖掘 / Step 4 意图分析"""
+    import os
+    from deep_digger import DeepKeywordDigger
+    from process_pool import map_records
+    from profit_hunter import ProfitHunterUltimate
+    from scorer import KeywordScorer
+    
+    keywords = build_fake_keywords(args.keywords)
+    scorer = KeywordScorer(*build_fake_analysis(keywords))
+    hunter = ProfitHunterUltimate()
+    tasks = [
+        ("KeywordScorer.score", lambda n: scorer.score(keywords, parallel=n)),
+        ("analyze_keyword_quality", lambda n: map_records(DeepKeywordDigger, (), 'analyze_keywords', keywords, n)),
+        ("step4_intent_analysis", lambda n: hunter.step4_intent_analysis(keywords, parallel=n)),
+    ]
+    workers = [int(n) for n in args.workers.split(',')]
+    print(f"📊 关键词: {len(keywords):,} 个 | CPU 核数: {os.cpu_count()}")
+    
+    for name, run in tasks:
+        print(f"\n   {name}")
+        baseline = None
+        for n in workers:
+            start = time.perf_counter()
+            result = run(n)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = (elapsed, result)
+            print(f"   {n} 进程: {elapsed:6.2f}s  加速比 {baseline[0] / elapsed:4.1f}x | 结果一致: {result == baseline[1]}")
+
+
+def bench_topk(args):
+    """取前 K 名：全量排序后切片 vs argpartition 选择"""
+    from top_k import top_k
+    
+    rng = random.Random(42)
+    results = [{'keyword': f'kw{i}', 'final_score': round(rng.random() * 100, 1)} for i in range(args.results)]
+    key = lambda x: x['final_score']
+    print(f"📊 结果: {len(results):,} 条 | K = {args.k}")
+    
+    start = time.perf_counter()
+    sorted_top = sorted(results, key=key, reverse=True)[:args.k]
+    sort_time = time.perf_counter() - start
+    print(f"   全量排序: {sort_time:6.3f}s")
+    
+    start = time.perf_counter()
+    selected = top_k(results, args.k, key=key)
+    select_time = time.perf_counter() - start
+    print(f"   Top-K:    {select_time:6.3f}s")
+    
+    print(f"   🚀 加速比: {sort_time / select_time:.1f}x | 结果一致: {sorted_top == selected}")
+
+
+def bench_rescore(args):
+    """权重调整后：完整重新评分 vs 读取分项得分重算"""
+    import tempfile
+    from config import THRESHOLDS, WEIGHTS
+    from rescore import load_components, rescore, save_components
+    from scorer import KeywordScorer
+    
+    keywords = list(dict.fromkeys(build_fake_keywords(args.keywords * 2)))[:args.keywords]
+    scorer = KeywordScorer(*build_fake_analysis(keywords))
+    weights = {**WEIGHTS, 'trend': 0.35, 'intent': 0.25}
+    thresholds = {**THRESHOLDS, 'BUILD_NOW': 70}
+    print(f"📊 关键词: {len(keywords):,} 个")
+    
+    path = Path(tempfile.mkdtemp()) / "score_components.csv"
+    save_components(scorer.score_frame(scorer.to_frame(keywords)), path)
+    
+    start = time.perf_counter()
+    scorer.weights = weights
+    full = scorer.score_frame(scorer.to_frame(keywords))
+    full_time = time.perf_counter() - start
+    print(f"   完整评分:   {full_time:6.3f}s")
+    
+    start = time.perf_counter()
+    updated, diff = rescore(load_components(path), weights, thresholds)
+    rescore_time = time.perf_counter() - start
+    print(f"   增量重算:   {rescore_time:6.3f}s  (含读取 CSV，决策变化 {len(diff):,} 个)")
+    
+    match = full.set_index('keyword')['final_score'].equals(updated.set_index('keyword')['final_score'])
+    print(f"   🚀 加速比: {full_time / rescore_time:.1f}x | 评分一致: {match}")
+
+
+def bench_memory(args):
+    """深度挖掘结果常驻内存：逐条 dict vs __slots__ KeywordRecord（tracemalloc）"""
+    import gc
+    import tracemalloc
+    from deep_digger import DeepKeywordDigger
+    
+    keywords = build_fake_keywords(args.keywords)
+    digger = DeepKeywordDigger()
+    print(f"📊 记录: {len(keywords):,} 条")
+    
+    def traced(build):
+        gc.collect()
+        tracemalloc.start()
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+    
+    dicts, dict_size = traced(lambda: [digger.analyze_keyword_quality(kw) for kw in keywords])
+    print(f"   dict:          {dict_size / 2**20:7.1f} MB  ({dict_size / len(keywords):6.0f} B/条)")
+    
+    records, record_size = traced(lambda: digger.analyze_keywords(keywords))
+    print(f"   KeywordRecord: {record_size / 2**20:7.1f} MB  ({record_size / len(keywords):6.0f} B/条)")
+    
+    match = [r.to_dict() for r in records] == dicts
+    print(f"   🚀 节省: {1 - record_size / dict_size:.0%} | 结果一致: {match}")
+
+
+def bench_features(args):
+    """关键词特征：v3 / ultimate / deep / blue-ocean / super 各扫一遍 vs 共享引擎一次匹配"""
+    from keyword_features import FEATURES, PROFILES, SIGNALS
+    
+    profiles = ['v3', 'ultimate', 'deep', 'blue', 'super']
+    groups = [[(name, words) for name, words in SIGNALS.items() if name.startswith(f'{profile}:')]
+              for profile in profiles]
+    keywords = build_fake_keywords(args.keywords)
+    print(f"📊 关键词: {len(keywords):,} 个 | 信号类别: {len(SIGNALS)} 个 | "
+          f"信号词: {len({w for words in SIGNALS.values() for w in words})} 个")
+    
+    start = time.perf_counter()
+    legacy = [legacy_features(kw, groups) for kw in keywords]
+    legacy_time = time.perf_counter() - start
+    print(f"   各扫一遍:   {legacy_time:6.2f}s  ({len(profiles)} 次扫描/词)")
+    
+    start = time.perf_counter()
+    extracted = [FEATURES.extract(kw) for kw in keywords]
+    engine_time = time.perf_counter() - start
+    print(f"   共享引擎:   {engine_time:6.2f}s  (1 次匹配/词)")
+    
+    start = time.perf_counter()
+    for features in extracted:
+        for components in PROFILES.values():
+            for profile in components.values():
+                profile.score(features)
+    profile_time = time.perf_counter() - start
+    print(f"   档案评分:   {profile_time:6.2f}s  ({sum(len(c) for c in PROFILES.values())} 个加分表/词，只查特征)")
+    
+    match = legacy == [(f.word_count, f.hits) for f in extracted]
+    print(f"   🚀 加速比: {legacy_time / engine_time:.1f}x | 特征一致: {match}")
+
+
+def bench_warehouse(args):
+    """关键词仓库写入：逐条 INSERT + 提交 vs 按批 executemany 单事务，以及跨运行查询耗时"""
+    import tempfile
+    from keyword_warehouse import KeywordWarehouse
+    from scorer import KeywordScorer, frame_records
+    
+    keywords = list(dict.fromkeys(build_fake_keywords(args.keywords * 2)))[:args.keywords]
+    scorer = KeywordScorer(*build_fake_analysis(keywords))
+    rows = scorer.get_final_results(frame_records(scorer.score_frame(scorer.to_frame(keywords))))
+    print(f"📊 每次运行: {len(rows):,} 条结果 × {args.runs} 次运行")
+    
+    # 逐条：每条结果一条 INSERT 并立即提交
+    naive = KeywordWarehouse(Path(tempfile.mkdtemp()) / "naive.sqlite")
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        run_id = naive.start_run("bench")
+        for row in rows:
+            naive.conn.execute(
+                "INSERT INTO keywords VALUES (?, ?, ?) "
+                "ON CONFLICT (keyword) DO UPDATE SET last_run=MAX(last_run, excluded.last_run)",
+                (row["keyword"], run_id, run_id)
+            )
+            naive.conn.execute(
+                "INSERT OR REPLACE INTO stage_results VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, "final", row["keyword"], float(row["final_score"]), row["decision"],
+                 json.dumps(row, ensure_ascii=False, default=str))
+            )
+            naive.conn.commit()
+    naive_time = time.perf_counter() - start
+    print(f"   逐条提交:   {naive_time:6.2f}s  ({len(rows) * args.runs / naive_time:,.0f} 条/秒)")
+    
+    warehouse = KeywordWarehouse(Path(tempfile.mkdtemp()) / "batched.sqlite")
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        run_id = warehouse.start_run("bench")
+        warehouse.write_stage(run_id, "final", rows)
+        warehouse.finish_run(run_id)
+    batched_time = time.perf_counter() - start
+    print(f"   批量写入:   {batched_time:6.2f}s  ({len(rows) * args.runs / batched_time:,.0f} 条/秒，"
+          f"每批 {warehouse.batch_size} 条)")
+    
+    start = time.perf_counter()
+    new = warehouse.new_since_last_run()
+    new_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for row in rows[:1000]:
+        warehouse.score_history(row["keyword"])
+    history_time = (time.perf_counter() - start) / min(len(rows), 1000)
+    print(f"   新词查询:   {new_time * 1000:6.1f}ms ({len(new)} 个) | 评分历史: {history_time * 1e6:.0f}µs/词")
+    
+    same = naive.stage_rows(1, "final") == warehouse.stage_rows(1, "final")
+    print(f"   🚀 加速比: {naive_time / batched_time:.1f}x | 结果一致: {same}")
+
+
+def bench_table(args):
+    """最终结果表：CSV vs 按日期分区的 Parquet（写入、文件大小、全量加载、列裁剪加载）"""
+    import tempfile
+    import pandas as pd
+    import data_utils
+    from data_utils import load_table, save_table
+    from scorer import KeywordScorer, frame_records
+    
+    if data_utils.pq is None:
+        print("❌ 未安装 pyarrow: pip install pyarrow")
+        return
+    
+    # 先评分一批真实结构的结果，再平铺到目标行数
+    keywords = list(dict.fromkeys(build_fake_keywords(min(args.rows, 100000))))
+    scorer = KeywordScorer(*build_fake_analysis(keywords))
+    base = pd.DataFrame(scorer.get_final_results(frame_records(scorer.score_frame(scorer.to_frame(keywords)))))
+    frame = pd.concat([base] * -(-args.rows // len(base)), ignore_index=True).head(args.rows)
+    columns = ['keyword', 'final_score', 'decision']
+    print(f"📊 结果: {len(frame):,} 行 × {len(frame.columns)} 列 | 列裁剪: {', '.join(columns)}")
+    
+    workdir = Path(tempfile.mkdtemp())
+    data_utils.TABLES["dir"] = str(workdir / "tables")
+    csv_path = workdir / "ultimate_final_results.csv"
+    
+    def timed(func):
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+    
+    _, csv_write = timed(lambda: frame.to_csv(csv_path, index=False, encoding='utf-8'))
+    parquet_path, parquet_write = timed(lambda: save_table(frame, "ultimate_final_results"))
+    csv_size, parquet_size = csv_path.stat().st_size, parquet_path.stat().st_size
+    print(f"   写入:      CSV {csv_write:6.2f}s ({csv_size / 2**20:6.1f} MB) | "
+          f"Parquet {parquet_write:6.2f}s ({parquet_size / 2**20:6.1f} MB)")
+    
+    csv_full, csv_load = timed(lambda: pd.read_csv(csv_path, encoding='utf-8'))
+    parquet_full, parquet_load = timed(lambda: load_table("ultimate_final_results"))
+    print(f"   全量加载:  CSV {csv_load:6.2f}s | Parquet {parquet_load:6.2f}s  ({csv_load / parquet_load:.1f}x)")
+    
+    _, csv_project = timed(lambda: pd.read_csv(csv_path, usecols=columns, encoding='utf-8'))
+    _, parquet_project = timed(lambda: load_table("ultimate_final_results", columns=columns))
+    print(f"   列裁剪:    CSV {csv_project:6.2f}s | Parquet {parquet_project:6.2f}s  "
+          f"({csv_project / parquet_project:.1f}x)")
+    
+    match = parquet_full.equals(frame)
+    print(f"   🚀 体积 {parquet_size / csv_size:.0%} | 加载加速 {csv_load / parquet_load:.1f}x | 结果一致: {match}")
+
+
+def bench_spill(args):
+    """长时间深度挖掘：结果全部留在内存最后写出 vs 每轮追加落盘、内存只留 Top-K（内存用 tracemalloc 另跑一遍）"""
+    import filecmp
+    import gc
+    import shutil
+    import tempfile
+    import tracemalloc
+    import data_utils
+    from data_utils import save_table
+    from deep_digger import DeepKeywordDigger
+    from keyword_record import KeywordRecord, write_csv
+    from result_spill import SORT_CHUNK_SIZE, SpillWriter
+    from top_k import top_k
+    
+    workdir = Path(tempfile.mkdtemp())
+    data_utils.TABLES["dir"] = str(workdir / "tables")
+    sample = DeepKeywordDigger().analyze_keywords(build_fake_keywords(args.per_round))
+    print(f"📊 {args.rounds} 轮 × {len(sample):,} 条 = {args.rounds * len(sample):,} 条结果")
+    
+    def rounds():
+        # 每轮产出新的记录对象（模拟逐轮分析）
+        for _ in range(args.rounds):
+            yield [KeywordRecord.from_dict(record.to_dict()) for record in sample]
+    
+    def legacy(out):
+        results = []
+        for round_results in rounds():
+            results.extend(round_results)
+        resident = tracemalloc.get_traced_memory()[0]
+        ranked = top_k(results, key=lambda x: x["final_score"])
+        write_csv(out / "deep_dig_results.csv", ranked)
+        save_table(ranked, "deep_dig_results")
+        build_now = [r for r in ranked if r["decision"] == "🔴 BUILD NOW"]
+        if build_now:
+            write_csv(out / "build_now_list.csv", build_now)
+        drop_attack = [r for r in ranked if r["降维打击"]]
+        if drop_attack:
+            write_csv(out / "drop_attack_opportunities.csv", drop_attack)
+        return resident
+    
+    def streaming(out):
+        digger = DeepKeywordDigger()
+        digger.data_dir = out
+        digger.spill_path = out / "deep_dig_spill.jsonl"
+        spill = SpillWriter(digger.spill_path)
+        for round_results in rounds():
+            spill.write(round_results)
+            digger.track(round_results)
+        spill.close()
+        resident = tracemalloc.get_traced_memory()[0]
+        digger.save_results()
+        return resident
+    
+    outputs = []
+    for name, run in (("全部留在内存", legacy), ("每轮落盘    ", streaming)):
+        out = workdir / name.strip()
+        out.mkdir()
+        start = time.perf_counter()
+        run(out)
+        elapsed = time.perf_counter() - start
+        
+        traced = workdir / f"{name.strip()}-traced"
+        traced.mkdir()
+        gc.collect()
+        tracemalloc.start()
+        resident = run(traced)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        shutil.rmtree(traced)
+        outputs.append((out, resident, peak))
+        print(f"   {name}: {elapsed:6.2f}s | 挖掘结束时常驻 {resident / 2**20:7.1f} MB | 峰值 {peak / 2**20:7.1f} MB")
+    
+    (legacy_out, legacy_resident, legacy_peak), (stream_out, stream_resident, stream_peak) = outputs
+    files = sorted(p.name for p in legacy_out.glob("*.csv"))
+    match = files == sorted(p.name for p in stream_out.glob("*.csv")) and all(
+        filecmp.cmp(legacy_out / f, stream_out / f, shallow=False) for f in files)
+    print(f"   🚀 常驻内存 {legacy_resident / max(stream_resident, 1):.0f}x 更小 | "
+          f"峰值 {legacy_peak / stream_peak:.1f}x 更小（归并分块 {SORT_CHUNK_SIZE:,} 条） | 输出一致: {match}")
+
+
+def legacy_longtail(roots, patterns, count):
+    """旧版 generate_longtail_keywords：每轮从头生成，截取前 count 个"""
+    keywords = set()
+    for root in roots:
+        for pattern in patterns:
+            keyword = pattern.format(root=root)
+            keywords.add(keyword)
+            for letter in 'abcdefghijklmnopqrstuvwxyz':
+                keywords.add(f"{letter} {keyword}")
+            if len(keywords) >= count:
+                break
+        if len(keywords) >= count:
+            break
+    return list(keywords)[:count]
+
+
+def bench_novelty(args):
+    """多轮、多次运行取词：每轮重建同一批候选词 vs 惰性关键词空间（游标 + 已分析集合）"""
+    import tempfile
+    from deep_digger import DeepKeywordDigger
+    from keyword_space import KeywordSpace
+    
+    digger = DeepKeywordDigger()
+    roots, patterns = digger.seed_roots, digger.longtail_patterns
+    total = args.runs * args.rounds * args.per_round
+    print(f"📊 {args.runs} 次运行 × {args.rounds} 轮 × {args.per_round} 个 = {total:,} 次分析")
+    
+    start = time.perf_counter()
+    legacy_seen = set()
+    for _ in range(args.runs * args.rounds):
+        legacy_seen.update(legacy_longtail(roots, patterns, args.per_round))
+    legacy_time = time.perf_counter() - start
+    print(f"   每轮重建:   {legacy_time:6.3f}s | 不同的词 {len(legacy_seen):>7,}")
+    
+    state_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    space_seen = set()
+    analyzed = 0
+    for _ in range(args.runs):
+        # 每次运行重新加载空间，模拟跨进程续挖
+        space = KeywordSpace(roots, patterns, state_dir)
+        for _ in range(args.rounds):
+            keywords = space.take(args.per_round)
+            analyzed += len(keywords)
+            space_seen.update(keywords)
+            space.commit()
+    space_time = time.perf_counter() - start
+    print(f"   关键词空间: {space_time:6.3f}s | 不同的词 {len(space_seen):>7,}（空间共 {space.size:,}）")
+    
+    print(f"   🚀 新词覆盖 {len(space_seen) / len(legacy_seen):.0f}x | "
+          f"重复分析 {total - len(legacy_seen):,} → {analyzed - len(space_seen):,}")
+
+
+def bench_seen(args):
+    """已处理关键词去重：进程内 set（退出即丢） vs 持久化 Bloom 过滤器（内存、写入、查询、误判率）"""
+    import gc
+    import tempfile
+    import tracemalloc
+    from seen_index import SeenIndex, normalize_keyword
+    
+    known = [f"kw{i} {i % 977} tool" for i in range(args.keywords)]
+    probes = known[::2] + [f"new{i} {i % 977} tool" for i in range(args.probes)]
+    print(f"📊 已处理: {len(known):,} 个 | 查询: {len(probes):,} 个（其中新词 {args.probes:,}）")
+    
+    start = time.perf_counter()
+    seen_set = {normalize_keyword(keyword) for keyword in known}
+    set_add = time.perf_counter() - start
+    del seen_set
+    gc.collect()
+    tracemalloc.start()
+    seen_set = {normalize_keyword(keyword) for keyword in known}
+    set_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    set_hits = sum(normalize_keyword(keyword) in seen_set for keyword in probes)
+    set_query = time.perf_counter() - start
+    print(f"   set:   写入 {set_add:6.2f}s | 查询 {set_query:6.2f}s | 内存 {set_memory / 2**20:7.1f} MB | 跨运行: 否")
+    del seen_set
+    
+    # --capacity 小于词数时写满会开新分代，误判率按全部分代计
+    index = SeenIndex("bench", root=tempfile.mkdtemp(), capacity=args.capacity or args.keywords,
+                      error_rate=args.error_rate)
+    start = time.perf_counter()
+    for i in range(0, len(known), 100000):
+        index.add(known[i:i + 100000])
+    bloom_add = time.perf_counter() - start
+    start = time.perf_counter()
+    bloom_hits = sum(int(index.seen_mask(probes[i:i + 100000]).sum()) for i in range(0, len(probes), 100000))
+    bloom_query = time.perf_counter() - start
+    stats = index.stats()
+    size = stats["bytes"]
+    false_positive = (bloom_hits - set_hits) / args.probes
+    print(f"   Bloom: 写入 {bloom_add:6.2f}s | 查询 {bloom_query:6.2f}s | 文件 {size / 2**20:7.1f} MB | "
+          f"{stats['generations']} 个分代 | 跨运行: 是")
+    print(f"   🚀 内存 {set_memory / size:.1f}x 更小 | 误判率 {false_positive:.3%}（目标 {args.error_rate:.1%}）| "
+          f"漏判: {bloom_hits < set_hits}")
+
+
+def bench_serp(args):
+    """Playwright SERP：一个浏览器逐个开页面、每个关键词后 sleep vs 浏览器池并发 + 按主机限频"""
+    import asyncio
+    import numpy as np
+    from serp_browser import SerpBrowserPool, async_playwright, top_result_links
+    
+    if async_playwright is None:
+        print("⚠️ 未安装 playwright，跳过（pip install playwright && playwright install chromium）")
+        return
+    
+    server, search_url = start_fake_serp_server(args.latency)
+    keywords = [f"serp keyword {i}" for i in range(args.keywords)]
+    print(f"📊 关键词: {len(keywords)} 个 | 模拟页面延迟: {args.latency*1000:.0f}ms | "
+          f"旧版每词间隔 {args.pause}s | 浏览器池限频 {args.rate} 页/秒")
+    
+    async def legacy():
+        # 原实现：每个关键词新开页面、加载、解析、关闭，再 sleep
+        results, latencies = {}, []
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            for keyword in keywords:
+                page = await browser.new_page()
+                start = time.perf_counter()
+                await page.goto(f"{search_url}?q={quote_plus(keyword)}", timeout=30000)
+                results[keyword] = await top_result_links(page)
+                latencies.append(time.perf_counter() - start)
+                await page.close()
+                await asyncio.sleep(args.pause)
+            await browser.close()
+        return results, float(np.percentile(latencies, 95))
+    
+    async def pooled():
+        async with SerpBrowserPool(concurrency=args.concurrency, rate=args.rate, search_url=search_url,
+                                   mode="full") as pool:
+            results = await pool.run(keywords)
+        return results, pool.stats()
+    
+    try:
+        start = time.perf_counter()
+        legacy_results, legacy_p95 = asyncio.run(legacy())
+        legacy_time = time.perf_counter() - start
+        print(f"   逐个开页面: {legacy_time:6.2f}s | {len(keywords) / legacy_time:5.2f} 页/秒 | p95 {legacy_p95:.2f}s")
+        
+        start = time.perf_counter()
+        pool_results, stats = asyncio.run(pooled())
+        pool_time = time.perf_counter() - start
+        print(f"   浏览器池:   {pool_time:6.2f}s | {stats['throughput']:5.2f} 页/秒 | p95 {stats['p95']:.2f}s | "
+              f"失败 {stats['failed']} 个")
+    except Exception as e:
+        print(f"⚠️ 无法启动 Chromium（{str(e).splitlines()[0]}），请先运行 playwright install chromium")
+        return
+    finally:
+        server.shutdown()
+    
+    print(f"   🚀 加速比: {legacy_time / pool_time:.1f}x | 结果一致: {legacy_results == pool_results}")
+
+
+
+def bench_serp_modes(args):
+    """SERP 抓取模式：整页加载 vs 拦截资源只等结果容器 vs 不开浏览器直接取 HTML"""
+    from serp_browser import async_playwright, fetch_serps
+    
+    server, search_url = start_fake_serp_server(args.latency, args.asset_latency)
+    keywords = [f"serp keyword {i}" for i in range(args.keywords)]
+    print(f"📊 关键词: {len(keywords)} 个 | 页面延迟 {args.latency*1000:.0f}ms | "
+          f"资源延迟 {args.asset_latency*1000:.0f}ms | 并发 {args.concurrency}")
+    
+    results = {}
+    try:
+        for mode in ("full", "light", "http"):
+            if mode != "http" and async_playwright is None:
+                print(f"   {mode:<6} ⚠️ 未安装 playwright，跳过")
+                continue
+            try:
+                start = time.perf_counter()
+                results[mode], stats = fetch_serps(keywords, mode=mode, concurrency=args.concurrency,
+                                                   rate=0, search_url=search_url)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                print(f"   {mode:<6} ⚠️ 无法启动 Chromium（{str(e).splitlines()[0]}）")
+                continue
+            print(f"   {mode:<6} {elapsed:6.2f}s | {stats['throughput']:6.2f} 页/秒 | "
+                  f"每页 {stats['bytes_per_page'] / 1024:7.1f} KB, {stats['seconds_per_page']:.3f}s | "
+                  f"p95 {stats['p95']:.3f}s | 拦截 {stats['blocked']} | 失败 {stats['failed']}")
+    finally:
+        server.shutdown()
+    
+    if len(results) > 1:
+        first = next(iter(results.values()))
+        print(f"   结果一致: {all(r == first for r in results.values())}")
+
+
+def bench_archive(args):
+    """SERP 页面归档：压缩率、写入速度，以及单进程 vs 多进程离线重新解析"""
+    import os
+    import tempfile
+    from serp_archive import SerpArchive, reparse
+    
+    workers = args.workers or os.cpu_count() or 1
+    rng = random.Random(7)
+    archive = SerpArchive(tempfile.mkdtemp())
+    print(f"📊 页面: {args.pages} 个 | 压缩: {archive.codec} | 重新解析进程数: {workers}")
+    
+    elapsed = 0.0
+    for i in range(args.pages):
+        html = build_fake_serp_html(f"serp keyword {i}", rng)
+        start = time.perf_counter()
+        archive.put(f"serp keyword {i}", html, params={"num": 10}, source="deep_validation")
+        elapsed += time.perf_counter() - start
+    stats = archive.stats()["deep_validation"]
+    print(f"   归档: {elapsed:6.2f}s（{args.pages / elapsed:6.0f} 页/秒）| 原始 {stats['size'] / 2**20:7.1f} MB → "
+          f"{stats['stored'] / 2**20:6.1f} MB（{stats['size'] / stats['stored']:.1f}x）| 每页 {stats['size'] / args.pages / 1024:.0f} KB")
+    
+    start = time.perf_counter()
+    serial = reparse(archive, workers=1)
+    serial_time = time.perf_counter() - start
+    print(f"   重新解析（单进程）: {serial_time:6.2f}s | {len(serial) / serial_time:6.0f} 页/秒")
+    
+    start = time.perf_counter()
+    parallel = reparse(archive, workers=workers)
+    parallel_time = time.perf_counter() - start
+    print(f"   重新解析（{workers} 进程）: {parallel_time:6.2f}s | {len(parallel) / parallel_time:6.0f} 页/秒")
+    print(f"   🚀 加速比: {serial_time / parallel_time:.1f}x | 结果一致: {serial == parallel} | 网络请求: 0")
+
+
+def legacy_serp_signals(html):
+    """重构前 analyze_google_serp 的计数：整页小写后对每个标记 count 一遍（基准对照）"""
+    tool_count = sum(html.lower().count(domain)
+                     for domain in ["calculator", "converter", "generator", "tool", "online", "free"])
+    forum_count = sum(html.lower().count(domain)
+                      for domain in ["reddit.com", "quora.com", "stackoverflow.com", "forum"])
+    ad_count = html.count('data-text-ad') + html.count('ads-fr')
+    return {"tool_results_count": tool_count, "forum_results_count": forum_count,
+            "commercial_intent": min(100, ad_count * 10)}
+
+
+def bench_serp_parse(args):
+    """SERP 解析：整页小写后逐个 count 子串 vs 一次遍历的结构化解析（归档页面上逐页计时）"""
+    import tempfile
+    from profit_hunter_deep_validation import serp_signals
+    from serp_archive import SerpArchive
+    from serp_parser import LexborHTMLParser, parse_serp
+    
+    if args.archive:
+        archive = SerpArchive(args.archive)
+    else:
+        rng = random.Random(11)
+        archive = SerpArchive(tempfile.mkdtemp())
+        for i in range(args.pages):
+            archive.put(f"serp keyword {i}", build_fake_serp_html(f"serp keyword {i}", rng), source="deep_validation")
+    pages = [archive.get(entry["key"]) for entry in archive.entries()[:args.pages]]
+    print(f"📊 归档页面: {len(pages)} 个 | 平均 {sum(map(len, pages)) / len(pages) / 1024:.0f} KB/页")
+    
+    def per_page(function):
+        start = time.perf_counter()
+        results = [function(html) for html in pages]
+        return (time.perf_counter() - start) / len(pages), results
+    
+    legacy_time, legacy = per_page(legacy_serp_signals)
+    print(f"   逐个 count 子串:    {legacy_time * 1000:7.2f} ms/页")
+    backends = ["stdlib"] + (["lexbor"] if LexborHTMLParser is not None else [])
+    for backend in backends:
+        parse_time, _ = per_page(lambda html: parse_serp(html, backend))
+        print(f"   结构化解析 {backend:<7}: {parse_time * 1000:7.2f} ms/页 | {legacy_time / parse_time:5.1f}x")
+    if LexborHTMLParser is None:
+        print("   ⚠️ 未安装 selectolax，只测了标准库后端（pip install selectolax）")
+    
+    _, structured = per_page(serp_signals)
+    for field in ("tool_results_count", "forum_results_count", "commercial_intent"):
+        old = sum(r[field] for r in legacy) / len(pages)
+        new = sum(r[field] for r in structured) / len(pages)
+        print(f"   {field:<20} 子串计数均值 {old:7.1f} → 结构化 {new:5.1f}")
+
+
+def bench_domains(args):
+    """SERP 域名分类：逐个 `w in domain` 子串匹配 vs 可注册域名 + 分类表哈希查询（速度和误判）"""
+    from domain_classifier import get_domain_classifier
+    
+    classifier = get_domain_classifier()
+    weak_list = [d for d, c in classifier.categories.items() if c in classifier.weak]
+    giant_list = [d for d, c in classifier.categories.items() if c in classifier.giant]
+    
+    rng = random.Random(13)
+    known = list(classifier.categories)
+    # 诱饵主机：包含表中域名的子串，但不是同一个站（只用本身就是可注册域名的条目，避免造出真正的子域名）
+    sites = [d for d in known if classifier.registrable_domain(d) == d]
+    decoys = [f"{d.split('.')[0]}.{rng.choice(['solutions', 'community', 'xyz', 'company.io'])}" for d in sites] + \
+             [f"my{d}" for d in sites] + [f"{d}.mirror-site.net" for d in sites]
+    others = [f"site{i}.{rng.choice(['com', 'net', 'org', 'co.uk', 'io'])}" for i in range(2000)]
+    hosts = []
+    for _ in range(args.results):
+        roll = rng.random()
+        if roll < 0.5:
+            hosts.append((rng.choice(["", "www.", "m.", "blog."]) + rng.choice(known), True))
+        elif roll < 0.7:
+            hosts.append((rng.choice(decoys), False))
+        else:
+            hosts.append((rng.choice(others), False))
+    urls = [f"https://{host}/page/{i}" for i, (host, _) in enumerate(hosts)]
+    print(f"📊 结果链接: {len(urls):,} 个 | 分类表: {len(classifier.categories)} 个域名 | 诱饵主机占 20%")
+    
+    def legacy(url):
+        # 重构前：netloc 去掉 www. 后对名单逐个做子串判断
+        domain = urlparse(url).netloc.replace("www.", "")
+        return any(w in domain for w in weak_list), any(g in domain for g in giant_list)
+    
+    start = time.perf_counter()
+    old = [legacy(url) for url in urls]
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = [(category in classifier.weak, category in classifier.giant)
+           for category in map(classifier.category, urls)]
+    classifier_time = time.perf_counter() - start
+    
+    def false_positives(flags):
+        return sum(1 for (weak, giant), (_, listed) in zip(flags, hosts) if (weak or giant) and not listed)
+    
+    print(f"   子串匹配: {legacy_time / len(urls) * 1e6:6.2f} µs/条 | 误判 {false_positives(old):,} 条")
+    print(f"   分类表:   {classifier_time / len(urls) * 1e6:6.2f} µs/条 | 误判 {false_positives(new):,} 条")
+    print(f"   🚀 加速比: {legacy_time / classifier_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profit Hunter ULTIMATE - 性能基准测试")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+    
+    p = subparsers.add_parser("harvest", help="串行 vs 并发 Alphabet Soup")
+    p.add_argument("--seeds", type=int, default=10, help="种子词数量")
+    p.add_argument("--latency", type=float, default=0.05, help="模拟服务延迟（秒）")
+    p.add_argument("--concurrency", type=int, default=16, help="并发上限")
+    p.add_argument("--rate", type=float, default=None, help="每秒请求上限")
+    p.set_defaults(func=bench_harvest)
+    
+    p = subparsers.add_parser("expand", help="固定 a-z vs 前缀树扩展")
+    p.add_argument("--seeds", type=int, default=20, help="种子词数量")
+    p.set_defaults(func=bench_expand)
+    
+    p = subparsers.add_parser("trends", help="逐个 vs 5 词批量 Trends payload")
+    p.add_argument("--keywords", type=int, default=200, help="关键词数量")
+    p.set_defaults(func=bench_trends)
+    
+    p = subparsers.add_parser("metrics", help="逐列 pandas vs 向量化趋势指标")
+    p.add_argument("--series", type=int, default=10000, help="序列数量")
+    p.add_argument("--points", type=int, default=90, help="每条序列的时间点数")
+    p.set_defaults(func=bench_metrics)
+    
+    p = subparsers.add_parser("matcher", help="逐词子串扫描 vs 编译匹配器")
+    p.add_argument("--keywords", type=int, default=1000000, help="关键词数量")
+    p.set_defaults(func=bench_matcher)
+    
+    p = subparsers.add_parser("frame", help="逐词 dict 评分 vs 列式 score_frame")
+    p.add_argument("--keywords", type=int, default=100000, help="关键词数量")
+    p.set_defaults(func=bench_frame)
+    
+    p = subparsers.add_parser("parallel", help="1/2/4/8 进程评分扩展性")
+    p.add_argument("--keywords", type=int, default=200000, help="关键词数量")
+    p.add_argument("--workers", default="1,2,4,8", help="逗号分隔的进程数")
+    p.set_defaults(func=bench_parallel)
+    
+    p = subparsers.add_parser("topk", help="全量排序 vs Top-K 选择")
+    p.add_argument("--results", type=int, default=1000000, help="结果条数")
+    p.add_argument("--k", type=int, default=10, help="取前 K 名")
+    p.set_defaults(func=bench_topk)
+    
+    p = subparsers.add_parser("rescore", help="完整评分 vs 分项得分增量重算")
+    p.add_argument("--keywords", type=int, default=100000, help="关键词数量")
+    p.set_defaults(func=bench_rescore)
+    
+    p = subparsers.add_parser("memory", help="逐条 dict vs KeywordRecord 常驻内存")
+    p.add_argument("--keywords", type=int, default=200000, help="记录条数")
+    p.set_defaults(func=bench_memory)
+    
+    p = subparsers.add_parser("features", help="五个评分器各扫一遍 vs 共享特征引擎一次匹配")
+    p.add_argument("--keywords", type=int, default=200000, help="关键词数量")
+    p.set_defaults(func=bench_features)
+    
+    p = subparsers.add_parser("warehouse", help="逐条提交 vs 批量 executemany 写入关键词仓库")
+    p.add_argument("--keywords", type=int, default=20000, help="每次运行的结果条数")
+    p.add_argument("--runs", type=int, default=3, help="运行次数")
+    p.set_defaults(func=bench_warehouse)
+    
+    p = subparsers.add_parser("table", help="CSV vs Parquet 表的写入、加载与列裁剪")
+    p.add_argument("--rows", type=int, default=1000000, help="结果行数")
+    p.set_defaults(func=bench_table)
+    
+    p = subparsers.add_parser("spill", help="深度挖掘全量结果留在内存 vs 每轮落盘 + Top-K")
+    p.add_argument("--rounds", type=int, default=100, help="挖掘轮数")
+    p.add_argument("--per-round", type=int, default=2000, help="每轮结果条数")
+    p.set_defaults(func=bench_spill)
+    
+    p = subparsers.add_parser("novelty", help="每轮重建同一批候选词 vs 惰性关键词空间的新词覆盖")
+    p.add_argument("--runs", type=int, default=3, help="运行次数（每次重新加载空间状态）")
+    p.add_argument("--rounds", type=int, default=20, help="每次运行的轮数")
+    p.add_argument("--per-round", type=int, default=200, help="每轮取词数")
+    p.set_defaults(func=bench_novelty)
+    
+    p = subparsers.add_parser("seen", help="内存 set vs 持久化 Bloom 过滤器的已处理关键词去重")
+    p.add_argument("--keywords", type=int, default=1000000, help="已处理关键词数")
+    p.add_argument("--probes", type=int, default=500000, help="查询的新词数")
+    p.add_argument("--error-rate", type=float, default=0.01, help="Bloom 过滤器误判率")
+    p.add_argument("--capacity", type=int, default=None, help="分代初始容量（默认等于已处理关键词数，只有一个分代）")
+    p.set_defaults(func=bench_seen)
+    
+    p = subparsers.add_parser("serp", help="Playwright 逐个开页面 + sleep vs 浏览器池并发（需 chromium）")
+    p.add_argument("--keywords", type=int, default=40, help="关键词数")
+    p.add_argument("--latency", type=float, default=0.3, help="模拟页面延迟（秒）")
+    p.add_argument("--pause", type=float, default=1.5, help="旧版每个关键词后的 sleep（秒，原实现 1-2 秒随机）")
+    p.add_argument("--rate", type=float, default=1.0, help="浏览器池对同一主机每秒最多加载的页面数")
+    p.add_argument("--concurrency", type=int, default=4, help="浏览器池并发页面数")
+    p.set_defaults(func=bench_serp)
+    
+    p = subparsers.add_parser("serp-modes", help="SERP 整页 vs 拦截资源 vs HTTP 直取")
+    p.add_argument("--keywords", type=int, default=40, help="关键词数量")
+    p.add_argument("--latency", type=float, default=0.3, help="模拟结果页延迟（秒）")
+    p.add_argument("--asset-latency", type=float, default=0.05, help="模拟图片/样式/字体/脚本延迟（秒）")
+    p.add_argument("--concurrency", type=int, default=4, help="同时加载的页面上限")
+    p.set_defaults(func=bench_serp_modes)
+    
+    p = subparsers.add_parser("archive", help="SERP 页面压缩归档 + 单进程 vs 多进程离线重新解析")
+    p.add_argument("--pages", type=int, default=500, help="归档页面数")
+    p.add_argument("--workers", type=int, default=None, help="重新解析进程数（默认 CPU 核数）")
+    p.set_defaults(func=bench_archive)
+    
+    p = subparsers.add_parser("serp-parse", help="SERP 逐个 count 子串 vs 一次遍历结构化解析")
+    p.add_argument("--pages", type=int, default=200, help="页面数")
+    p.add_argument("--archive", default=None, help="已有归档目录（默认生成模拟页面）")
+    p.set_defaults(func=bench_serp_parse)
+    
+    p = subparsers.add_parser("domains", help="SERP 域名子串匹配 vs 可注册域名 + 分类表")
+    p.add_argument("--results", type=int, default=200000, help="结果链接数")
+    p.set_defaults(func=bench_domains)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
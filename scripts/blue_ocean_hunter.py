@@ -27,6 +27,13 @@ import random
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from urllib.parse import quote
+
+from domain_classifier import get_domain_classifier
+from keyword_features import AI_APPLICABLE, PROFILES, extract
+from prefix_expander import PrefixExpander
+from seen_index import SeenIndex
+from trends_store import get_trends_store, rising_records
 
 # ============ 依赖 ============
 try:
@@ -50,249 +57,73 @@ THRESHOLDS = {
 
 # ============ 核心：需求 vs 产品 分类 ============
 
-# 产品词（不能做，这些是产品名）
-PRODUCT_INDICATORS = [
-    # 工具类产品
-    "calculator", "converter", "generator", "editor", "tool", "maker",
-    "creator", "builder", "parser", "formatter", "validator", "checker",
-    "finder", "searcher", "extractor", "downloader", "uploader",
-    "compressor", "resizer", "cropper", "merger", "splitter",
-    # 平台/服务
-    "app", "software", "platform", "service", "website", "online tool",
-    "free tool", "best tool", "top tool",
-    # 具体产品类别
-    "pdf", "excel", "word", "image", "video", "audio", "text",
-    "barcode", "qr code", "password", "email", "link", "url",
-    # 格式转换
-    "to pdf", "to excel", "to jpg", "to png", "to mp3", "to mp4",
-]
+# 产品词 PRODUCT_INDICATORS、需求词 NEED_INDICATORS、AI适用场景 AI_APPLICABLE
+# 与其他评分器的词表统一登记在 keyword_features.py，一次匹配得到全部特征
 
-# 需求词（可以做，这些是问题/痛点）
-NEED_INDICATORS = {
-    # 痛点信号（强）
-    "pain_strong": [
-        "struggling with", "how to fix", "how to solve", "error", "not working",
-        "cannot", "can't", "doesn't work", "failed", "issue", "problem",
-        "help", "urgent", "asap", "quickly", "fast", "instant",
-        "stuck", "confused", "lost", "frustrated", "annoying",
-        # 中文
-        "怎么办", "求助", "急", "救命", "崩溃", "蛋疼", "烦死了"
-    ],
-    # 痛点信号（中）
-    "pain_medium": [
-        "difficult", "hard", "complicated", "confusing", "complex",
-        "tired of", "sick of", "fed up", "waste time", "manual",
-        "boring", "repetitive", "tedious", "slow",
-        # 中文
-        "麻烦", "难", "复杂", "太慢", "太累"
-    ],
-    # 需求信号
-    "need": [
-        "need", "want", "looking for", "searching for", "wish",
-        "trying to", "need to", "have to", "must", "should",
-        "anyone know", "does anyone", "suggestion", "recommendation",
-        # 中文
-        "需要", "想要", "求推荐", "应该怎么"
-    ],
-    # 对比/选择信号
-    "compare": [
-        "vs", "versus", "better than", "alternative", "instead of",
-        "compare", "difference between", "pros and cons", "which one",
-        "which is better", "should i use", "or", "either",
-        # 中文
-        "哪个好", "区别", "对比", "还是", "推荐"
-    ],
-    # DIY/教程信号
-    "howto": [
-        "how to", "how do i", "how can i", "how does", "how make",
-        "tutorial", "guide", "step by step", "instructions",
-        "tips", "tricks", "secrets", "hacks", "strategies",
-        # 中文
-        "如何", "怎么", "教程", "指南", "技巧"
-    ],
-    # 优化/改进信号
-    "improve": [
-        "improve", "optimize", "enhance", "better", "upgrade",
-        "increase", "boost", "maximize", "efficient", "automate",
-        # 中文
-        "优化", "改进", "提升", "自动化"
-    ]
+# 需求类型标签（按 NEED_INDICATORS 顺序）
+NEED_TYPE_LABELS = {
+    "pain_strong": "强痛点",
+    "pain_medium": "中痛点",
+    "need": "需求",
+    "compare": "对比选择",
+    "howto": "教程",
+    "improve": "优化",
 }
 
 # ============ 核心功能 ============
 
-def is_product_keyword(keyword):
+def is_product_keyword(keyword, features=None):
     """判断是否是产品词（不是需求）- V2.0 优化版"""
-    keyword_lower = keyword.lower()
-    word_count = len(keyword.split())
+    if features is None:
+        features = extract(keyword)
     
     # 强需求信号（出现则判定为需求词，优先级最高）
-    STRONG_NEED_SIGNALS = [
-        "struggling with", "how to fix", "how to solve", "how to create",
-        "how to make", "how to write", "how to build", "how to learn",
-        "how to start", "tips for", "best way to", "tutorial for",
-        "help me fix", "help me create", "anyone know how",
-        "does anyone know", "why is my", "why does my",
-        "how long does", "is it worth", "difference between",
-        "pros and cons", "step by step", "advanced strategies"
-    ]
-    
-    for signal in STRONG_NEED_SIGNALS:
-        if signal in keyword_lower:
-            return False  # 有强需求信号，是需求词
+    if features.has("blue:strong_need"):
+        return False  # 有强需求信号，是需求词
     
     # 如果是短词（<=2个词），很可能是产品词
-    if word_count <= 2:
-        # 检查是否包含产品词根
-        product_roots = [
-            "generator", "calculator", "converter", "maker", "creator",
-            "builder", "formatter", "validator", "checker", "parser"
-        ]
-        for root in product_roots:
-            if root in keyword_lower:
-                return True  # 短词+产品词根 = 产品词
-        # 短但没有产品词根，可能是通用需求
-        return False
+    if features.word_count <= 2:
+        # 短词+产品词根 = 产品词；短但没有产品词根，可能是通用需求
+        return features.has("blue:product_root")
     
     # 中长词（>=3个词），检查是否主要是产品描述
-    # 如果包含大量产品词，判定为产品词
-    product_count = 0
-    for product in PRODUCT_INDICATORS:
-        if product in keyword_lower:
-            product_count += 1
-    
     # 如果3个词中有2个以上是产品词，判定为产品词
-    if word_count >= 3 and product_count >= 2:
+    if features.count("blue:product") >= 2:
         return True
     
     # 默认认为是需求词
     return False
 
-def analyze_need_type(keyword):
+def analyze_need_type(keyword, features=None):
     """分析需求类型"""
-    keyword_lower = keyword.lower()
-    
-    need_type = []
-    need_strength = 0
-    
-    # 强痛点
-    for signal in NEED_INDICATORS["pain_strong"]:
-        if signal in keyword_lower:
-            need_type.append("强痛点")
-            need_strength += 40
-            break
-    
-    # 中痛点
-    for signal in NEED_INDICATORS["pain_medium"]:
-        if signal in keyword_lower:
-            need_type.append("中痛点")
-            need_strength += 25
-            break
-    
-    # 需求信号
-    for signal in NEED_INDICATORS["need"]:
-        if signal in keyword_lower:
-            need_type.append("需求")
-            need_strength += 20
-            break
-    
-    # 对比信号
-    for signal in NEED_INDICATORS["compare"]:
-        if signal in keyword_lower:
-            need_type.append("对比选择")
-            need_strength += 15
-            break
-    
-    # 教程信号
-    for signal in NEED_INDICATORS["howto"]:
-        if signal in keyword_lower:
-            need_type.append("教程")
-            need_strength += 10
-            break
-    
-    # 优化信号
-    for signal in NEED_INDICATORS["improve"]:
-        if signal in keyword_lower:
-            need_type.append("优化")
-            need_strength += 15
-            break
+    if features is None:
+        features = extract(keyword)
+    
+    # 强痛点 / 中痛点 / 需求 / 对比 / 教程 / 优化，每类命中一次
+    need_type = [label for name, label in NEED_TYPE_LABELS.items() if features.has(f"blue:need:{name}")]
     
     return {
         "types": need_type if need_type else ["通用"],
-        "strength": min(need_strength, 100),
+        "strength": PROFILES["blue-ocean"]["need"].score(features),
         "is_real_need": len(need_type) > 0
     }
 
-def check_ai_feasibility(keyword):
+def check_ai_feasibility(keyword, features=None):
     """检查是否可以用AI解决"""
-    keyword_lower = keyword.lower()
-    
-    # AI适用场景
-    ai_applicable = {
-        "text": {
-            "keywords": ["text", "content", "writing", "article", "blog", "post",
-                        "文案", "文章", "写作", "内容", "博客"],
-            "score": 90,
-            "solution": "AI写作/内容生成"
-        },
-        "image": {
-            "keywords": ["image", "photo", "picture", "art", "design", "logo",
-                        "图片", "图片", "照片", "设计", "艺术"],
-            "score": 85,
-            "solution": "AI图像生成/编辑"
-        },
-        "code": {
-            "keywords": ["code", "coding", "program", "script", "function",
-                        "代码", "编程", "程序", "脚本"],
-            "score": 95,
-            "solution": "AI编程助手"
-        },
-        "data": {
-            "keywords": ["data", "analysis", "analyze", "report", "summary",
-                        "数据", "分析", "报告", "总结"],
-            "score": 88,
-            "solution": "AI数据分析"
-        },
-        "chat": {
-            "keywords": ["chat", "conversation", "reply", "response", "message",
-                        "对话", "回复", "消息"],
-            "score": 92,
-            "solution": "AI对话/客服"
-        },
-        "translate": {
-            "keywords": ["translate", "translation", "language",
-                        "翻译", "语言"],
-            "score": 90,
-            "solution": "AI翻译"
-        },
-        "video": {
-            "keywords": ["video", "subtitle", "caption", "transcribe",
-                        "视频", "字幕", "转录"],
-            "score": 80,
-            "solution": "AI视频处理"
-        },
-        "seo": {
-            "keywords": ["seo", "keyword", "meta", "description", "title",
-                        "关键词", "元描述"],
-            "score": 82,
-            "solution": "AI SEO优化"
-        }
-    }
+    if features is None:
+        features = extract(keyword)
     
     best_match = None
     best_score = 0
     
-    for category, info in ai_applicable.items():
-        for kw in info["keywords"]:
-            if kw in keyword_lower:
-                if info["score"] > best_score:
-                    best_score = info["score"]
-                    best_match = {
-                        "category": category,
-                        "solution": info["solution"],
-                        "score": info["score"]
-                    }
-                break
+    for category, info in AI_APPLICABLE.items():
+        if features.has(f"blue:ai:{category}") and info["score"] > best_score:
+            best_score = info["score"]
+            best_match = {
+                "category": category,
+                "solution": info["solution"],
+                "score": info["score"]
+            }
     
     if best_match:
         return best_match
@@ -304,57 +135,82 @@ def check_ai_feasibility(keyword):
             "score": 60
         }
 
-def alphabet_soup_mining(keyword, prefix_letters="abcdefghijklmnopqrstuvwxyz"):
-    """Alphabet Soup 挖掘真实需求"""
+def alphabet_soup_mining(keyword, prefix_letters="abcdefghijklmnopqrstuvwxyz", query_budget=None):
+    """Alphabet Soup 挖掘真实需求
+    
+    query_budget: 设置后用前缀树扩展代替固定字母循环
+    """
     suggestions = []
     
-    for letter in prefix_letters[:10]:  # 限制数量
-        try:
-            # Google Suggest API
-            url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={letter}%20{keyword}"
-            resp = requests.get(url, timeout=10)
-            if resp.status_code == 200:
-                data = resp.json()
-                for suggestion in data[1]:
-                    # 过滤：必须是真实需求，不是产品名
-                    if len(suggestion.split()) >= 3:  # 至少3个词
-                        if not is_product_keyword(suggestion):
-                            if suggestion not in suggestions:
-                                suggestions.append(suggestion)
-            time.sleep(0.3)
-        except:
-            continue
+    if query_budget:
+        def fetch(query):
+            try:
+                url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={quote(query)}"
+                resp = requests.get(url, timeout=10)
+                time.sleep(0.3)
+                if resp.status_code == 200:
+                    return resp.json()[1]
+            except:
+                pass
+            return []
+        
+        expander = PrefixExpander(query_budget=query_budget)
+        candidates = sorted(expander.expand([keyword], fetch))
+        print(f"      请求 {expander.queries} 次, 每次请求 {expander.yield_per_request:.1f} 个关键词")
+    else:
+        candidates = []
+        for letter in prefix_letters[:10]:  # 限制数量
+            try:
+                # Google Suggest API
+                url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={letter}%20{keyword}"
+                resp = requests.get(url, timeout=10)
+                if resp.status_code == 200:
+                    data = resp.json()
+                    candidates.extend(data[1])
+                time.sleep(0.3)
+            except:
+                continue
+    
+    for suggestion in candidates:
+        # 过滤：必须是真实需求，不是产品名
+        if len(suggestion.split()) >= 3:  # 至少3个词
+            if not is_product_keyword(suggestion):
+                if suggestion not in suggestions:
+                    suggestions.append(suggestion)
     
     return suggestions
 
 def google_trends_rising(seed_words):
     """Google Trends 飙升词挖掘"""
     pytrends = TrendReq(hl='en-US', tz=360)
+    store = get_trends_store()
     rising_data = []
     
     for word in seed_words[:8]:  # 限制数量
-        try:
-            pytrends.build_payload([word], timeframe='now 7-d')
-            related = pytrends.related_queries()
-            
-            if word in related and related[word]:
-                rising = related[word].get('rising')
-                if rising is not None and not rising.empty:
-                    for _, row in rising.head(5).iterrows():
-                        value = row['value'] if isinstance(row['value'], (int, float)) else 0
-                        if value > 0:
-                            keyword = row['query']
-                            # 过滤：必须是真实需求
-                            if not is_product_keyword(keyword):
-                                rising_data.append({
-                                    "keyword": keyword,
-                                    "growth": value,
-                                    "source": word
-                                })
-            
-            time.sleep(2)
-        except:
-            continue
+        # 时序库中未过期的飙升词直接使用
+        record = store.get(word, 'now 7-d')
+        if record and record['rising_fresh']:
+            rising = record['rising']
+        else:
+            try:
+                pytrends.build_payload([word], timeframe='now 7-d')
+                rising = rising_records(pytrends.related_queries(), word)
+                store.put(word, 'now 7-d', rising=rising)
+                time.sleep(2)
+            except:
+                continue
+        
+        for row in rising[:5]:
+            value = row['value'] if isinstance(row['value'], (int, float)) else 0
+            if value > 0:
+                keyword = row['query']
+                # 过滤：必须是真实需求
+                if not is_product_keyword(keyword):
+                    rising_data.append({
+                        "keyword": keyword,
+                        "growth": value,
+                        "source": word
+                    })
     
     return rising_data
 
@@ -383,7 +239,9 @@ def gpts_contrast(keywords):
 
 def serp_competition_check(keywords):
     """SERP 竞争分析"""
-    # 弱竞争者（博客/论坛）
+    classifier = get_domain_classifier()
+    
+    # 模拟结果的候选域名：弱竞争者（博客/论坛）
     weak_competitors = [
         "reddit.com", "quora.com", "stackoverflow.com",
         "medium.com", "dev.to", "blogger.com", "wordpress.com",
@@ -406,8 +264,8 @@ def serp_competition_check(keywords):
             k=3
         )
         
-        has_weak = any(d in weak_competitors for d in top_domains)
-        has_giant = any(d in giants for d in top_domains)
+        has_weak = any(classifier.is_weak(d) for d in top_domains)
+        has_giant = any(classifier.is_giant(d) for d in top_domains)
         
         if has_weak and not has_giant:
             competition = "LOW"  # 降维打击机会
@@ -465,8 +323,11 @@ def make_decision(score):
 
 # ============ 主程序 ============
 
-def run_hunter(seed_words, max_keywords=100):
-    """运行蓝海需求挖掘"""
+def run_hunter(seed_words, max_keywords=100, query_budget=None, revisit_after=None):
+    """运行蓝海需求挖掘
+    
+    revisit_after: 超过这么多天的已处理关键词重新分析（None 按 config.SEEN_INDEX）
+    """
     print("🚀" + "="*70)
     print("💎 Profit Hunter ULTIMATE - 蓝海需求挖掘系统 V2.0")
     print("="*70)
@@ -480,7 +341,7 @@ def run_hunter(seed_words, max_keywords=100):
     
     for word in seed_words:
         print(f"   挖掘: {word}")
-        suggestions = alphabet_soup_mining(word)
+        suggestions = alphabet_soup_mining(word, query_budget=query_budget)
         # 只保留真实需求
         for s in suggestions:
             if not is_product_keyword(s):
@@ -494,20 +355,26 @@ def run_hunter(seed_words, max_keywords=100):
         if not is_product_keyword(word):
             all_keywords.add(word)
     
-    if not all_keywords:
-        print("❌ 未找到真实需求，请检查种子词")
+    # 以前运行分析过的需求不再重复分析（与其他挖词入口共用 harvest 命名空间）
+    seen = SeenIndex("harvest", revisit_after=revisit_after)
+    fresh = seen.filter_new(all_keywords)
+    if len(fresh) < len(all_keywords):
+        print(f"   ⏭️ 跳过已处理的需求 {len(all_keywords) - len(fresh)} 个")
+    
+    if not fresh:
+        print("❌ 没有新的真实需求（已处理过的需求已跳过）" if all_keywords else "❌ 未找到真实需求，请检查种子词")
         return
     
-    all_keywords = list(all_keywords)[:max_keywords]
+    all_keywords = fresh[:max_keywords]
     
     # Step 2: Google Trends 飙升词
     print("\n📈 Step 2: Google Trends 飙升词挖掘...")
     trends_data = google_trends_rising(seed_words)
     
     # 添加飙升词
-    for item in trends_data:
-        if item['keyword'] not in all_keywords:
-            all_keywords.append(item['keyword'])
+    for keyword in seen.filter_new(item['keyword'] for item in trends_data):
+        if keyword not in all_keywords:
+            all_keywords.append(keyword)
     
     print(f"   ✅ 发现 {len(trends_data)} 个飙升需求")
     
@@ -535,18 +402,21 @@ def run_hunter(seed_words, max_keywords=100):
     results = []
     
     for kw in all_keywords:
+        # 每个关键词只提取一次特征
+        features = extract(kw)
+        
         # 需求分析
-        need_analysis = analyze_need_type(kw)
+        need_analysis = analyze_need_type(kw, features)
         
         # AI可行性
-        ai_feasibility = check_ai_feasibility(kw)
+        ai_feasibility = check_ai_feasibility(kw, features)
         
         # 数据
         gpts_data = gpts_dict.get(kw, {})
         serp_data = serp_dict.get(kw, {})
         
         # 跳过产品词
-        if is_product_keyword(kw):
+        if is_product_keyword(kw, features):
             continue
         
         # 跳过假需求
@@ -576,6 +446,12 @@ def run_hunter(seed_words, max_keywords=100):
             "is_opportunity": serp_data.get('is_opportunity', False)
         })
     
+    # 被过滤掉的词也已分析过，一并记为已处理
+    seen.add(all_keywords)
+    if not results:
+        print("❌ 没有新的真实需求（已处理过的需求已跳过）")
+        return
+    
     # 排序
     results_df = pd.DataFrame(results)
     results_df = results_df.sort_values('score', ascending=False)
@@ -624,6 +500,10 @@ def main():
         """
     )
     parser.add_argument("--max", type=int, default=100, help="最大需求数量")
+    parser.add_argument("--query-budget", type=int, default=None,
+                        help="每个种子词的 Autocomplete 请求预算，设置后启用前缀树扩展")
+    parser.add_argument("--revisit-after", type=int, default=None,
+                        help="超过 N 天的已处理需求重新分析（默认按 config.SEEN_INDEX，0 为全部重新分析）")
     
     args = parser.parse_args()
     
@@ -644,7 +524,8 @@ def main():
     print(f"📋 真实需求: {len(real_needs)} 个")
     
     # 运行
-    run_hunter(real_needs, max_keywords=args.max)
+    run_hunter(real_needs, max_keywords=args.max, query_budget=args.query_budget,
+               revisit_after=args.revisit_after)
 
 if __name__ == "__main__":
     main()
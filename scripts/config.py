@@ -63,3 +63,78 @@ MAX_CANDIDATES = 500
 
 # 降维打击加成分数
 DIMENSION_ATTACK_BONUS = 20
+
+# Autocomplete 本地缓存（SQLite，所有挖词脚本共享）
+SUGGEST_CACHE = {
+    "path": "data/suggest_cache.sqlite",
+    "ttl": {                      # 按来源区分过期时间（秒）
+        "google": 7 * 24 * 3600,
+        "youtube": 3 * 24 * 3600,
+    },
+    "max_entries": 200000,        # 超出后淘汰最旧的记录
+}
+
+# Google Trends 本地时序库（SQLite，增量刷新）
+TRENDS_STORE = {
+    "path": "data/trends_store.sqlite",
+    "ttl": {                      # 按时间范围前缀区分过期时间（秒）
+        "now": 6 * 3600,          # now 1-H / now 7-d 等小时级数据
+        "today": 24 * 3600,       # today 3-m / today 12-m 等日级数据
+    },
+    "overlap_days": 7,            # 增量拉取时与已有序列重叠的天数，用于对齐尺度
+}
+
+# 关键词仓库（SQLite，保留每次运行各阶段的结果，可跨运行查询）
+KEYWORD_WAREHOUSE = {
+    "path": "data/keyword_warehouse.sqlite",
+    "batch_size": 1000,           # 每次 executemany 写入的行数
+}
+
+# 表格输出（Parquet，按日期分区；需安装 pyarrow，未安装时只输出 CSV）
+TABLES = {
+    "dir": "data/tables",
+    "compression": "zstd",
+    "batch_rows": 10000,          # 流式写入时每个文件的行数
+}
+
+# 已处理关键词索引（可扩展 Bloom 过滤器，按命名空间、按时间分代，跨运行跳过已处理的词）
+SEEN_INDEX = {
+    "dir": "data/seen",
+    "capacity": 1000000,          # 分代的初始设计容量，写满后开容量翻倍的新分代
+    "error_rate": 0.01,           # 整个命名空间的误判率上限（新词被误当成已处理的概率，各分代之和）
+    "generation_days": 7,         # 每个分代最多写入的天数；revisit_after / retention 以分代为单位生效
+    "revisit_after_days": None,   # 超过这么多天的记录不再算已处理；None 为永不重访
+    "retention_days": 365,        # 分代文件保留天数
+}
+
+# Playwright SERP 浏览器池（profit_hunter.py --playwright）
+SERP_BROWSER = {
+    "contexts": 2,                # 浏览器 context 数
+    "pages_per_context": 3,       # 每个 context 复用的页面数
+    "concurrency": 4,             # 同时加载的页面上限
+    "rate": 1.0,                  # 同一搜索主机每秒最多发起的页面加载数（代替每个关键词后 sleep 1-2 秒）
+    "timeout": 30000,             # 单页加载超时（毫秒）
+    "max_page_uses": 50,          # 页面复用次数上限，达到后关闭重开
+    "mode": "light",              # full 整页加载 / light 拦截资源、只等结果容器 / http 不开浏览器直接取 HTML
+    "blocked_resources": ["image", "media", "font", "stylesheet"],  # light 模式拦截的资源类型
+    "block_third_party": True,    # light 模式拦截搜索站点以外域名的请求（广告、统计、CDN 字体等）
+    "wait_for": "#search",        # light 模式等待出现的结果容器选择器
+}
+
+# SERP 原始页面归档（serp_archive.py，解析规则变更后离线重新解析）
+SERP_ARCHIVE = {
+    "dir": "data/serp_archive",
+    "codec": "zstd",              # zstd（需要 zstandard，未安装时自动用 gzip）/ gzip
+    "level": {                    # 按编码区分压缩级别：归档在抓取路径上，gzip 高级别太慢
+        "zstd": 10,
+        "gzip": 6,
+    },
+}
+
+# 域名分类（domain_classifier.py，SERP 结果的弱竞争者 / 巨头判断）
+DOMAIN_CLASSIFIER = {
+    "suffix_list": None,          # Public Suffix List 文件，None 用内置的 scripts/data/public_suffix_list.dat
+    "categories": None,           # 分类表 CSV（domain,category），None 用内置的 scripts/data/domain_categories.csv
+    "weak_categories": ["forum", "ugc"],   # 算作弱竞争者（降维打击对象）的类别
+    "giant_categories": ["giant"],         # 算作巨头的类别
+}
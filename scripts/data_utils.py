@@ -4,8 +4,19 @@
 """
 
 import csv
+import shutil
+from datetime import date as Date
 from pathlib import Path
-from config import DATA_DIR
+
+import pandas as pd
+
+from config import DATA_DIR, TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 
 def save_csv(data, filename):
@@ -17,8 +28,8 @@ def save_csv(data, filename):
     filepath = Path(DATA_DIR) / filename
     
     if isinstance(data, list) and data:
-        # 列表：多条记录
-        fieldnames = list(data[0].keys()) if isinstance(data[0], dict) else []
+        # 列表：多条记录（各条字段可能不同，取并集）
+        fieldnames = list(dict.fromkeys(k for row in data for k in row)) if isinstance(data[0], dict) else []
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             if fieldnames:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -40,6 +51,34 @@ def save_csv(data, filename):
     print(f"💾 保存: {filepath}")
 
 
+class CSVStreamWriter:
+    """逐条追加写入 CSV（表头取第一条记录的字段），流式管道边跑边落盘"""
+    
+    def __init__(self, filename):
+        Path(DATA_DIR).mkdir(exist_ok=True)
+        self.filepath = Path(DATA_DIR) / filename
+        self.rows = 0
+        self._file = None
+        self._writer = None
+    
+    def write(self, row):
+        """写入一条记录并立即刷盘"""
+        if self._writer is None:
+            self._file = open(self.filepath, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row.keys()), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self._file.flush()
+        self.rows += 1
+    
+    def close(self):
+        """关闭文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"💾 保存: {self.filepath} ({self.rows} 条)")
+
+
 def load_keywords():
     """加载种子词"""
     words_file = Path(DATA_DIR) / "words.md"
@@ -70,3 +109,157 @@ def load_csv(filepath):
     with open(filepath, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         return list(reader)
+
+
+def table_dir(name):
+    """表目录 data/tables/<name>"""
+    return Path(TABLES["dir"]) / name
+
+
+def save_table(data, name, date=None):
+    """保存为按日期分区的 Parquet 表 data/tables/<name>/date=YYYY-MM-DD/part-0.parquet
+    
+    列带类型、压缩存储；同一天重复保存覆盖当天分区，往日分区保留。
+    未安装 pyarrow 时不写入，返回 None（调用方照常输出 CSV）。
+    """
+    if pq is None or data is None or len(data) == 0:
+        return None
+    
+    if isinstance(data, pd.DataFrame):
+        frame = data
+    else:
+        frame = pd.DataFrame([row.to_dict() if hasattr(row, 'to_dict') else row for row in data])
+    
+    # 先写到临时目录再整体替换，读取方不会读到写了一半的分区
+    partition, tmp = _partition_dirs(name, date)
+    pq.write_table(_arrow_table(frame), tmp / "part-0.parquet", compression=TABLES["compression"])
+    _replace_partition(tmp, partition)
+    
+    filepath = partition / "part-0.parquet"
+    print(f"💾 保存: {filepath}")
+    return filepath
+
+
+def _arrow_table(frame):
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # 混合类型的列（如有的行是列表、有的是字符串）按字符串保存
+        mixed = {column: str for column in frame.columns if frame[column].dtype == object}
+        return pa.Table.from_pandas(frame.astype(mixed), preserve_index=False)
+    
+
+def _partition_dirs(name, date=None):
+    """(分区目录, 写入用的临时目录)；临时目录不以 date= 开头，读取时不会被当成分区"""
+    partition = table_dir(name) / f"date={date or Date.today().isoformat()}"
+    tmp = partition.with_name(f"_tmp-{partition.name}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+    return partition, tmp
+    
+
+def _replace_partition(tmp, partition):
+    if partition.exists():
+        shutil.rmtree(partition)
+    tmp.rename(partition)
+
+
+class TableStreamWriter:
+    """分批写入 Parquet 表（与 save_table 相同的分区布局），内存只保留一个批次
+    
+    每批写成一个 part-N.parquet（各批列类型可以不同，如整数/小数评分），
+    close() 时整体替换当天分区。未安装 pyarrow 时不写入。
+    """
+    
+    def __init__(self, name, date=None, batch_rows=None):
+        self.name = name
+        self.date = date
+        self.batch_rows = batch_rows or TABLES["batch_rows"]
+        self.rows = 0
+        self.parts = 0
+        self.partition = None
+        self._tmp = None
+        self._batch = []
+    
+    def write(self, row):
+        if pq is None:
+            return
+        self._batch.append(row.to_dict() if hasattr(row, 'to_dict') else row)
+        if len(self._batch) >= self.batch_rows:
+            self._flush()
+    
+    def _flush(self):
+        if not self._batch:
+            return
+        if self._tmp is None:
+            self.partition, self._tmp = _partition_dirs(self.name, self.date)
+        pq.write_table(_arrow_table(pd.DataFrame(self._batch)), self._tmp / f"part-{self.parts}.parquet",
+                       compression=TABLES["compression"])
+        self.parts += 1
+        self.rows += len(self._batch)
+        self._batch = []
+    
+    def close(self):
+        """写出剩余批次并替换当天分区"""
+        self._flush()
+        if self._tmp is not None:
+            _replace_partition(self._tmp, self.partition)
+            self._tmp = None
+            print(f"💾 保存: {self.partition} ({self.rows} 条, {self.parts} 个文件)")
+
+
+def load_table(name, columns=None, date=None):
+    """读取表，columns 只读取需要的列
+    
+    name 可以是表名（data/tables 下的目录）、表目录、.parquet 或 .csv 文件路径；
+    date 默认读取最新分区，'all' 读取全部分区（附加 date 列），指定的日期没有分区时抛出 FileNotFoundError。
+    各文件列不同时（流式写入的各批）取并集，某个文件没有的列为空值。
+    表不存在（或未安装 pyarrow）时回退读取 data/<name>.csv。
+    """
+    path = Path(name)
+    if path.suffix == '.csv':
+        return _load_csv_frame(path, columns)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    
+    directory = path if path.is_dir() else table_dir(name)
+    partitions = sorted(directory.glob("date=*")) if pq is not None else []
+    if not partitions:
+        return _load_csv_frame(Path(DATA_DIR) / f"{path.name}.csv", columns)
+    
+    if date == 'all':
+        frames = [_read_partition(p, columns).assign(date=p.name[5:]) for p in partitions]
+        return pd.concat(frames, ignore_index=True)
+    
+    partition = directory / f"date={date}" if date else partitions[-1]
+    if not partition.is_dir():
+        raise FileNotFoundError(f"表 {directory.name} 没有 {date} 的分区"
+                                f"（已有 {partitions[0].name[5:]} ~ {partitions[-1].name[5:]}）")
+    return _read_partition(partition, columns)
+
+
+def _read_partition(partition, columns=None):
+    # part-N 按写入顺序读取（按编号排序，part-10 在 part-9 之后）
+    files = sorted(partition.glob("part-*.parquet"), key=lambda f: int(f.stem[5:]))
+    if not files:
+        # 分区目录存在但还没有文件（例如写入中途失败）
+        return pd.DataFrame(columns=columns)
+    if columns is None:
+        frames = [pq.read_table(f).to_pandas() for f in files]
+    else:
+        # 流式写入的各批列可能不同：每个文件只读它有的列，缺的列补空值
+        frames = []
+        for f in files:
+            names = set(pq.read_schema(f).names)
+            frame = pq.read_table(f, columns=[c for c in columns if c in names]).to_pandas()
+            frames.append(frame.reindex(columns=columns))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def _load_csv_frame(path, columns=None):
+    if not path.exists():
+        return pd.DataFrame(columns=columns)
+    # 关键词可能是 "null"、"nan" 这类字符串，不能按缺失值解析
+    return pd.read_csv(path, usecols=columns, encoding='utf-8-sig',
+                       dtype={'keyword': str}, keep_default_na=False)
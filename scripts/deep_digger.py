@@ -5,6 +5,7 @@ Profit Hunter ULTIMATE - 深度挖掘版
 
 Usage:
     python3 deep_digger.py --hours 1
+    python3 deep_digger.py --parallel 4   # 多进程分析关键词
 """
 
 import argparse
@@ -12,10 +13,23 @@ import random
 import re
 import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Set
 import sys
 
+from data_utils import TableStreamWriter
+from keyword_features import DEEP_USER_INTENTS, PROFILES, extract
+from keyword_record import KeywordRecord, RecordWriter
+from keyword_space import KeywordSpace
+from process_pool import WorkerPool
+from result_spill import SpillWriter, ranked_spill, read_spill
+from seen_index import SeenIndex
+from top_k import top_k
+
+# 内存里保留的最高分记录数（终端输出 TOP 20）
+TOP_N = 20
+
 # 尝试导入 requests
 try:
     import requests
@@ -27,7 +41,8 @@ except ImportError:
 class DeepKeywordDigger:
     """深度关键词挖掘机"""
     
-    def __init__(self):
+    def __init__(self, revisit_after: int = None):
+        """revisit_after: 超过这么多天的已分析关键词重新挖（None 按 config.SEEN_INDEX）"""
         self.data_dir = Path("data_deep")
         self.data_dir.mkdir(exist_ok=True)
         
@@ -107,82 +122,58 @@ class DeepKeywordDigger:
             "reliable", "accurate", "up to date",
         ]
         
-        self.results = []
+        # 每轮结果追加写入落盘文件，内存只保留 Top-N 和计数
+        self.spill_path = self.data_dir / "deep_dig_spill.jsonl"
+        self.top = []
+        self.total_results = 0
+        self.decision_counts = {}
+        self.drop_attack_count = 0
         
+        # 候选词空间（游标 + 已处理索引），第一次取词时才加载
+        self.revisit_after = revisit_after
+        self._keyword_space = None
+    
+    @property
+    def keyword_space(self) -> KeywordSpace:
+        if self._keyword_space is None:
+            self._keyword_space = KeywordSpace(self.seed_roots, self.longtail_patterns, self.data_dir,
+                                               SeenIndex("deep", revisit_after=self.revisit_after))
+        return self._keyword_space
+    
     def generate_longtail_keywords(self, count: int = 500) -> List[str]:
-        """生成长尾关键词（Alphabet Soup 扩展）"""
-        keywords = set()
-        
-        for root in self.seed_roots:
-            for pattern in self.longtail_patterns:
-                keyword = pattern.format(root=root)
-                keywords.add(keyword)
-                
-                # 字母 soup 扩展
-                for letter in 'abcdefghijklmnopqrstuvwxyz':
-                    keywords.add(f"{letter} {keyword}")
-                    
-                if len(keywords) >= count:
-                    break
-            if len(keywords) >= count:
-                break
+        """生成长尾关键词（Alphabet Soup 扩展）
         
-        return list(keywords)[:count]
+        从 词根 × 模式 × 字母前缀 空间里接着上次的位置惰性取 count 个没分析过的词，
+        空间挖完时返回的数量会不足
+        """
+        return self.keyword_space.take(count)
+    
+    def analyze_keywords(self, keywords: List[str]) -> List[KeywordRecord]:
+        """批量分析关键词质量（进程池按块调用），结果存为紧凑记录"""
+        return [KeywordRecord.from_dict(self.analyze_keyword_quality(keyword)) for keyword in keywords]
     
     def analyze_keyword_quality(self, keyword: str) -> Dict:
         """深度分析关键词质量"""
-        keyword_lower = keyword.lower()
-        word_count = len(keyword.split())
-        
-        score = 50  # 基础分
-        
-        # 1. 长度分析（长尾词更好）
-        if 3 <= word_count <= 6:
-            score += 20  # 理想长度
-        elif word_count == 2:
-            score += 10
-        elif word_count > 6:
-            score += 5
-        
-        # 2. 工具类信号
-        tool_signals = ['calculator', 'generator', 'converter', 'checker', 
-                       'finder', 'tracker', 'planner', 'formatter', 'validator',
-                       'creator', 'maker', 'builder', 'designer']
-        if any(signal in keyword_lower for signal in tool_signals):
-            score += 25
-        
-        # 3. 需求强度信号
-        need_signals = ['how to', 'best', 'free', 'online', 'for beginners',
-                       'tool', 'software', 'app', 'template', 'without']
-        if any(signal in keyword_lower for signal in need_signals):
-            score += 15
-        
-        # 4. 商业价值信号
-        commercial_signals = ['vs', 'alternative', 'review', 'compare',
-                             'pricing', 'cost', 'cheap', 'affordable']
-        if any(signal in keyword_lower for signal in commercial_signals):
-            score += 10
-        
-        # 5. 问题信号（可能意味着痛点）
-        question_signals = ['what is', 'meaning', 'definition', 'difference',
-                          'why does', 'how does', 'can i', 'should i']
-        if any(signal in keyword_lower for signal in question_signals):
-            score += 5  # 问句可能有需求，但也可能是信息查询
+        features = extract(keyword)
+        word_count = features.word_count
+        
+        # 1. 长度分析（长尾词更好）/ 2. 工具类信号 / 3. 需求强度信号 / 4. 商业价值信号 / 5. 问题信号
+        score = PROFILES["deep"]["quality"].score(features)
         
         # 6. 计算用户意图
-        user_intent = self.detect_user_intent(keyword_lower)
+        user_intent = self.detect_user_intent(features)
         
         # 7. 计算痛点强度
-        pain_score = self.detect_pain_points(keyword_lower)
+        pain_score = self.detect_pain_points(features)
         
         # 8. 估算搜索量（基于关键词特征）
-        estimated_volume = self.estimate_search_volume(keyword, word_count)
+        estimated_volume = self.estimate_search_volume(features)
         
         # 9. 竞争度（模拟）
-        competition = self.estimate_competition(keyword_lower)
+        competition = self.estimate_competition(features)
         
         # 10. 验证真需求（模拟 Reddit/论坛讨论）
-        demand_validation = self.validate_demand(keyword_lower)
+        demand_validation = self.validate_demand(features)
         
         # 最终评分
         final_score = min(score + pain_score * 0.5, 100)
@@ -214,39 +205,13 @@ class DeepKeywordDigger:
             "recommendation": self.generate_recommendation(keyword, final_score, user_intent, demand_validation)
         }
     
-    def detect_user_intent(self, keyword: str) -> Dict:
+    def detect_user_intent(self, features) -> Dict:
         """检测用户意图"""
-        intents = []
-        pain_indicators = []
-        
         # 检测意图
-        intent_patterns = {
-            "calculate": ["calculator", "calc", "calculate", "computation", "compute"],
-            "convert": ["converter", "convert", "conversion", "transform", "translate"],
-            "generate": ["generator", "generate", "create", "make", "build", "produce"],
-            "check": ["checker", "check", "verify", "validate", "test", "scan"],
-            "find": ["finder", "find", "search", "lookup", "locate", "discover"],
-            "compare": ["compare", "comparison", "vs", "versus", "alternative", "better"],
-            "learn": ["learn", "tutorial", "guide", "how to", "understand", "explain"],
-            "plan": ["planner", "plan", "schedule", "organize", "manage"],
-            "track": ["tracker", "track", "monitor", "log", "measure"],
-            "download": ["download", "downloads", "free", "get", "access"],
-        }
-        
-        for intent, patterns in intent_patterns.items():
-            if any(p in keyword for p in patterns):
-                intents.append(intent)
+        intents = [intent for intent in DEEP_USER_INTENTS if features.has(f"deep:user:{intent}")]
         
         # 检测痛点
-        pain_patterns = [
-            "struggling", "frustrated", "annoying", "difficult", "hard",
-            "confusing", "complicated", "complex", "overwhelming",
-            "waste", "慢", "slow", "expensive", "broken", "error",
-            "missing", "cannot", "can't", "doesn't work", "not working"
-        ]
-        for pattern in pain_patterns:
-            if pattern in keyword:
-                pain_indicators.append(pattern)
+        pain_indicators = features.matched("deep:pain_words")
         
         if not intents:
             intents = ["explore"]
@@ -286,52 +251,20 @@ class DeepKeywordDigger:
             "pain_indicators": pain_indicators
         }
     
-    def detect_pain_points(self, keyword: str) -> int:
-        """检测痛点强度"""
-        pain_score = 0
-        
-        # 强痛点
-        strong_pains = [
-            "struggling with", "how to fix", "error", "cannot",
-            "doesn't work", "won't work", "failed", "broken",
-            "frustrated", "annoying", "waste of time"
-        ]
-        for pain in strong_pains:
-            if pain in keyword:
-                pain_score += 40
-                break
-        
-        # 中等痛点
-        medium_pains = [
-            "best way to", "how to", "tips for", "guide to",
-            "proper way", "correct way", "best practice"
-        ]
-        for pain in medium_pains:
-            if pain in keyword:
-                pain_score += 20
-                break
-        
-        # 弱痛点（信息查询）
-        weak_pains = [
-            "what is", "meaning of", "difference between",
-            "why does", "how does"
-        ]
-        for pain in weak_pains:
-            if pain in keyword:
-                pain_score += 5
-                break
+    def detect_pain_points(self, features) -> int:
+        """检测痛点强度：强痛点 40 / 中等痛点 20 / 弱痛点（信息查询）5"""
+        return PROFILES["deep"]["pain"].score(features)
         
-        return pain_score
-    
-    def estimate_search_volume(self, keyword: str, word_count: int) -> str:
+    def estimate_search_volume(self, features) -> str:
         """估算搜索量"""
         # 基于关键词特征估算
         base_volume = 100  # 基础
+        word_count = features.word_count
         
         # 工具类词搜索量更高
-        if any(t in keyword.lower() for t in ['calculator', 'generator', 'converter']):
+        if features.has("deep:core_tool"):
             base_volume *= 5
-        elif any(t in keyword.lower() for t in ['checker', 'finder', 'tracker']):
+        elif features.has("deep:mid_tool"):
             base_volume *= 3
         
         # 长尾词搜索量较低
@@ -341,7 +274,7 @@ class DeepKeywordDigger:
             base_volume *= 0.7
         
         # 免费/在线词搜索量更高
-        if 'free' in keyword.lower() or 'online' in keyword.lower():
+        if features.has("deep:free_online"):
             base_volume *= 2
         
         if base_volume >= 1000:
@@ -353,22 +286,10 @@ class DeepKeywordDigger:
         else:
             return "很低 (~100/月)"
     
-    def estimate_competition(self, keyword: str) -> Dict:
+    def estimate_competition(self, features) -> Dict:
         """估算竞争度"""
-        weak_domains = [
-            "reddit.com", "quora.com", "stackoverflow.com",
-            "medium.com", "dev.to", "blogger.com", "wordpress.com",
-            "github.com", "wikipedia.org"
-        ]
-        
-        giant_domains = [
-            "google.com", "microsoft.com", "adobe.com",
-            "canva.com", "figma.com", "notion.so", "apple.com",
-            "amazon.com", "youtube.com", "wikipedia.org"
-        ]
-        
-        weak_count = sum(1 for d in weak_domains if d in keyword)
-        giant_count = sum(1 for d in giant_domains if d in keyword)
+        weak_count = features.count("deep:weak_domain")
+        giant_count = features.count("deep:giant_domain")
         
         if weak_count > 0 and giant_count == 0:
             return {
@@ -389,27 +310,26 @@ class DeepKeywordDigger:
                 "is_drop_attack": False
             }
     
-    def validate_demand(self, keyword: str) -> Dict:
+    def validate_demand(self, features) -> Dict:
         """验证需求真实性（模拟 Reddit/论坛搜索）"""
         # 模拟在不同平台验证需求
         sources = []
         
         # Reddit 验证
-        if any(t in keyword for t in ['calculator', 'generator', 'converter']):
+        if features.has("deep:core_tool"):
             sources.append("Reddit: high engagement")
-        elif any(t in keyword for t in ['learn', 'how to', 'guide']):
+        elif features.has("deep:learn"):
             sources.append("Reddit: active discussions")
         
         # Google 趋势验证
         sources.append("Google Trends: trending")
         
         # 工具类需求验证
-        if any(t in keyword for t in ['tool', 'software', 'app', 'online']):
+        if features.has("deep:product"):
             sources.append("Product Hunt: new tools launching")
         
         # 痛点验证
-        pain_keywords = ['struggling', 'frustrated', 'annoying', 'cannot find']
-        if any(p in keyword for p in pain_keywords):
+        if features.has("deep:forum_pain"):
             sources.append("Forums: pain point confirmed")
         
         if not sources:
@@ -466,8 +386,13 @@ class DeepKeywordDigger:
         
         return results
     
-    def run_deep_dig(self, hours: int = 1, keywords_per_hour: int = 100):
-        """深度挖掘运行主函数"""
+    def run_deep_dig(self, hours: int = 1, keywords_per_hour: int = 100, parallel: int = 1,
+                     resume: bool = False):
+        """深度挖掘运行主函数，返回评分最高的 TOP_N 条记录
+        
+        parallel: 关键词分析的工作进程数，大于 1 时整个运行共用一个进程池，每轮分块交给它
+        resume: 接着上次（可能中断的）运行的落盘文件继续，之前的结果计入统计
+        """
         print("\n" + "="*70)
         print("💎 Profit Hunter ULTIMATE - 深度挖掘版")
         print("="*70)
@@ -480,47 +405,77 @@ class DeepKeywordDigger:
         total_keywords = 0
         iterations = 0
         
-        while time.time() - start_time < hours * 3600:
-            iterations += 1
-            
-            print(f"\n🔄 第 {iterations} 轮深度挖掘...")
-            
-            # 生成长尾关键词
-            keywords = self.generate_longtail_keywords(keywords_per_hour)
-            
-            print(f"   📝 生成了 {len(keywords)} 个候选词")
-            
-            # 分析每个关键词
-            round_results = []
-            for keyword in keywords:
-                analysis = self.analyze_keyword_quality(keyword)
-                round_results.append(analysis)
+        if resume and self.spill_path.exists():
+            records = read_spill(self.spill_path)
+            for batch in iter(lambda: list(islice(records, 10000)), []):
+                self.track(batch)
+            print(f"📂 续跑: 已有 {self.total_results} 条结果")
+        spill = SpillWriter(self.spill_path, resume=resume)
+        # 进程池在整个运行中复用，每轮不再重新启动进程、重建分析对象
+        pool = WorkerPool(DeepKeywordDigger, (), parallel) if parallel > 1 else None
+        
+        try:
+            while time.time() - start_time < hours * 3600:
+                iterations += 1
                 
-                # 模拟搜索 Reddit 验证需求（1% 概率）
-                if random.random() < 0.01:
-                    reddit_results = self.search_reddit_for_demand(keyword)
-                    if reddit_results:
-                        print(f"   🔍 Reddit 发现需求: {keyword}")
-            
-            self.results.extend(round_results)
-            total_keywords += len(keywords)
-            
-            # 统计
-            build_now = [r for r in round_results if r["decision"] == "🔴 BUILD NOW"]
-            watch = [r for r in round_results if r["decision"] == "🟡 WATCH"]
-            
-            print(f"   ✅ 本轮完成: {len(round_results)} 个分析")
-            print(f"   🔴 立即做: {len(build_now)} | 🟡 观察: {len(watch)}")
-            
-            # 休息一下，避免限流
-            time.sleep(1)
+                print(f"\n🔄 第 {iterations} 轮深度挖掘...")
+                
+                # 生成长尾关键词
+                keywords = self.generate_longtail_keywords(keywords_per_hour)
+                if not keywords:
+                    print("   🏁 候选词空间已全部挖完（--reset-space 从头再挖，--revisit-after 重访旧词）")
+                    break
+                
+                print(f"   📝 生成了 {len(keywords)} 个新候选词（空间剩余 {self.keyword_space.remaining}）")
+                
+                # 分析每个关键词
+                if parallel > 1:
+                    round_results = pool.map_records('analyze_keywords', keywords)
+                else:
+                    round_results = self.analyze_keywords(keywords)
+                
+                for keyword in keywords:
+                    # 模拟搜索 Reddit 验证需求（1% 概率）
+                    if random.random() < 0.01:
+                        reddit_results = self.search_reddit_for_demand(keyword)
+                        if reddit_results:
+                            print(f"   🔍 Reddit 发现需求: {keyword}")
+                
+                # 本轮结果立即落盘，中途崩溃不丢已完成的轮次
+                spill.write(round_results)
+                self.keyword_space.commit()
+                self.track(round_results)
+                total_keywords += len(keywords)
+                
+                # 统计
+                build_now = [r for r in round_results if r["decision"] == "🔴 BUILD NOW"]
+                watch = [r for r in round_results if r["decision"] == "🟡 WATCH"]
+                
+                print(f"   ✅ 本轮完成: {len(round_results)} 个分析")
+                print(f"   🔴 立即做: {len(build_now)} | 🟡 观察: {len(watch)}")
+                
+                # 休息一下，避免限流
+                time.sleep(1)
+        finally:
+            spill.close()
+            if pool is not None:
+                pool.close()
         
         # 最终统计
         elapsed = time.time() - start_time
         
         self.finalize_results(elapsed, total_keywords, iterations)
         
-        return self.results
+        return self.top
+    
+    def track(self, records: List[KeywordRecord]):
+        """更新计数和内存中的 Top-N（已落盘的记录不再保留）"""
+        self.total_results += len(records)
+        for record in records:
+            self.decision_counts[record.decision] = self.decision_counts.get(record.decision, 0) + 1
+            self.drop_attack_count += bool(record.drop_attack)
+        # 旧的 Top-N 在前，同分时保持先到先得，与对全部结果排序的结果一致
+        self.top = top_k(self.top + list(records), TOP_N, key=lambda x: x.final_score)
     
     def finalize_results(self, elapsed: float, total_keywords: int, iterations: int):
         """最终结果汇总"""
@@ -533,22 +488,16 @@ class DeepKeywordDigger:
         print(f"   🔄  挖掘轮次: {iterations}")
         print(f"   📝  分析关键词: {total_keywords} 个")
         
-        build_now = [r for r in self.results if r["decision"] == "🔴 BUILD NOW"]
-        watch = [r for r in self.results if r["decision"] == "🟡 WATCH"]
-        drop = [r for r in self.results if r["decision"] == "❌ DROP"]
-        
         print(f"\n📈 评分分布:")
-        print(f"   🔴 BUILD NOW: {len(build_now)} 个")
-        print(f"   🟡 WATCH: {len(watch)} 个")
-        print(f"   ❌ DROP: {len(drop)} 个")
+        print(f"   🔴 BUILD NOW: {self.decision_counts.get('🔴 BUILD NOW', 0)} 个")
+        print(f"   🟡 WATCH: {self.decision_counts.get('🟡 WATCH', 0)} 个")
+        print(f"   ❌ DROP: {self.decision_counts.get('❌ DROP', 0)} 个")
         
         # TOP 20 机会
-        self.results.sort(key=lambda x: x["final_score"], reverse=True)
-        
         print(f"\n🏆 TOP 20 机会清单:")
         print("-" * 70)
         
-        for i, r in enumerate(self.results[:20], 1):
+        for i, r in enumerate(self.top, 1):
             drop_emoji = "💎" if r["降维打击"] else "  "
             pain_emoji = "😫" if r["pain_score"] > 20 else "  "
             
@@ -565,36 +514,25 @@ class DeepKeywordDigger:
         print("💾 结果已保存到 data_deep/ 目录")
         
     def save_results(self):
-        """保存结果到 CSV"""
-        import csv
-        
-        if not self.results:
+        """从落盘文件按评分归并排序，一次流式遍历写出结果排名、立即做清单和降维打击机会"""
+        if not self.total_results:
             return
         
-        # 最终结果
-        csv_path = self.data_dir / "deep_dig_results.csv"
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.results[0].keys())
-            writer.writeheader()
-            writer.writerows(self.results)
-        
-        # 立即做清单
-        build_now = [r for r in self.results if r["decision"] == "🔴 BUILD NOW"]
-        if build_now:
-            build_path = self.data_dir / "build_now_list.csv"
-            with open(build_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=build_now[0].keys())
-                writer.writeheader()
-                writer.writerows(build_now)
-        
-        # 降维打击机会
-        drop_attack = [r for r in self.results if r["降维打击"]]
-        if drop_attack:
-            attack_path = self.data_dir / "drop_attack_opportunities.csv"
-            with open(attack_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=drop_attack[0].keys())
-                writer.writeheader()
-                writer.writerows(drop_attack)
+        ranked = RecordWriter(self.data_dir / "deep_dig_results.csv")
+        build_now = RecordWriter(self.data_dir / "build_now_list.csv")
+        drop_attack = RecordWriter(self.data_dir / "drop_attack_opportunities.csv")
+        table = TableStreamWriter("deep_dig_results")
+        try:
+            for row in ranked_spill(self.spill_path):
+                ranked.write(row)
+                table.write(row)
+                if row["decision"] == "🔴 BUILD NOW":
+                    build_now.write(row)
+                if row["降维打击"]:
+                    drop_attack.write(row)
+        finally:
+            for writer in (ranked, build_now, drop_attack, table):
+                writer.close()
 
 
 def main():
@@ -606,6 +544,10 @@ def main():
     python3 deep_digger.py                    # 挖掘 1 小时
     python3 deep_digger.py --hours 2          # 挖掘 2 小时
     python3 deep_digger.py --keywords 200     # 每小时分析 200 个词
+    python3 deep_digger.py --parallel 4       # 4 个进程并行分析
+    python3 deep_digger.py --resume           # 中断后接着上次的结果继续
+    python3 deep_digger.py --reset-space      # 忘掉已挖过的候选词，从头挖
+    python3 deep_digger.py --revisit-after 30 # 超过 30 天的词重新挖
         """
     )
     
@@ -613,13 +555,25 @@ def main():
                        help="挖掘时长（小时），默认 1 小时")
     parser.add_argument("--keywords", type=int, default=100,
                        help="每小时分析关键词数量，默认 100")
+    parser.add_argument("--parallel", type=int, default=1,
+                       help="关键词分析的工作进程数，默认 1（单进程）")
+    parser.add_argument("--resume", action="store_true",
+                       help="接着上次中断的运行继续（保留 data_deep/deep_dig_spill.jsonl 中已有结果）")
+    parser.add_argument("--reset-space", action="store_true",
+                       help="清空候选词游标（data_deep/keyword_space.json）和已处理索引（data/seen/deep）")
+    parser.add_argument("--revisit-after", type=int, default=None,
+                       help="超过 N 天的已分析关键词重新挖（默认按 config.SEEN_INDEX，永不重访）")
     
     args = parser.parse_args()
     
-    digger = DeepKeywordDigger()
+    digger = DeepKeywordDigger(revisit_after=args.revisit_after)
+    if args.reset_space:
+        digger.keyword_space.reset()
     results = digger.run_deep_dig(
         hours=args.hours,
-        keywords_per_hour=args.keywords
+        keywords_per_hour=args.keywords,
+        parallel=args.parallel,
+        resume=args.resume
     )
     
     return results
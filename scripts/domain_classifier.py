@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+域名分类 - 判断 SERP 结果是论坛/UGC（弱竞争）、巨头还是工具站
+
+- 用内置的 Public Suffix List（data/public_suffix_list.dat）求可注册域名（eTLD+1）：
+  www.reddit.com → reddit.com，news.bbc.co.uk → bbc.co.uk，foo.blogspot.com → foo.blogspot.com
+- 分类表（data/domain_categories.csv，domain,category 两列）放进 dict，按主机名从长到短逐级查到
+  可注册域名为止，support.google.com 这类子域名可以单独分类；公共后缀本身也查一次，
+  foo.github.io、bar.blogspot.com 按平台归类
+- 每个结果只做与域名层级数相同次数的哈希查询，不再逐个 `w in domain` 子串匹配，
+  notion.so 不会再命中 notion.solutions、mynotion.so 之类的主机
+
+Usage:
+    python3 domain_classifier.py https://www.reddit.com/r/x support.google.com notion.solutions
+"""
+
+import csv
+import ipaddress
+import sys
+import threading
+from pathlib import Path
+
+from config import DOMAIN_CLASSIFIER
+
+DATA_DIR = Path(__file__).parent / "data"
+SUFFIX_LIST = DATA_DIR / "public_suffix_list.dat"
+CATEGORIES = DATA_DIR / "domain_categories.csv"
+
+# 主机名分类结果缓存的条目上限
+HOST_CACHE_SIZE = 100000
+
+
+def _idna(name):
+    """规则/主机名统一成 ASCII（punycode）小写形式"""
+    if name.isascii():
+        return name.lower()
+    try:
+        return name.encode("idna").decode("ascii").lower()
+    except UnicodeError:
+        return name.lower()
+
+
+def hostname(url_or_host):
+    """URL 或主机名 → 小写主机名（去掉端口和末尾的点）"""
+    text = url_or_host.strip()
+    # 直接切片取主机名，比 urlparse 快，SERP 结果逐条都要调用
+    netloc = text.split("//", 1)[-1]
+    for sep in "/?#":
+        netloc = netloc.split(sep, 1)[0]
+    netloc = netloc.rpartition("@")[2]
+    if netloc.startswith("["):
+        # IPv6 字面量
+        host = netloc[1:netloc.find("]")]
+    else:
+        host = netloc.rsplit(":", 1)[0]
+    return _idna(host.rstrip("."))
+
+
+class PublicSuffixList:
+    """Public Suffix List 规则：普通规则、通配规则（*.ck）和例外规则（!www.ck）各一个 set"""
+    
+    def __init__(self, path=None):
+        self.rules = set()
+        self.wildcards = set()
+        self.exceptions = set()
+        with open(path or SUFFIX_LIST, encoding="utf-8") as f:
+            for line in f:
+                rule = line.split()[0] if line.strip() else ""
+                if not rule or rule.startswith("//"):
+                    continue
+                if rule.startswith("!"):
+                    self.exceptions.add(_idna(rule[1:]))
+                elif rule.startswith("*."):
+                    self.wildcards.add(_idna(rule[2:]))
+                else:
+                    self.rules.add(_idna(rule))
+    
+    def suffix_length(self, labels):
+        """主机名各级标签中公共后缀占的级数（没有规则命中时按默认规则 * 取 1 级）"""
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if candidate in self.exceptions:
+                return len(labels) - i - 1
+            if candidate in self.rules or ".".join(labels[i + 1:]) in self.wildcards:
+                return len(labels) - i
+        return 1
+
+
+class DomainClassifier:
+    """可注册域名 + 分类表查询"""
+    
+    def __init__(self, suffix_list=None, categories=None):
+        self.suffixes = PublicSuffixList(suffix_list or DOMAIN_CLASSIFIER["suffix_list"] or SUFFIX_LIST)
+        self.categories = {}
+        with open(categories or DOMAIN_CLASSIFIER["categories"] or CATEGORIES, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                self.categories[hostname(row["domain"])] = row["category"].strip()
+        self.weak = set(DOMAIN_CLASSIFIER["weak_categories"])
+        self.giant = set(DOMAIN_CLASSIFIER["giant_categories"])
+        # 主机名 -> (可注册域名, 类别)；SERP 结果里同一批站点反复出现
+        self._hosts = {}
+    
+    def _classify(self, host):
+        """(可注册域名, 类别)"""
+        try:
+            ipaddress.ip_address(host)
+            return host, self.categories.get(host)
+        except ValueError:
+            pass
+        labels = [label for label in host.split(".") if label]
+        if not labels:
+            return "", None
+        suffix = self.suffixes.suffix_length(labels)
+        registrable = max(len(labels) - suffix - 1, 0)
+        # 从完整主机名逐级查到可注册域名；多级公共后缀（github.io、blogspot.com）本身也查一次
+        last = registrable + 1 if suffix >= 2 else registrable
+        category = None
+        for i in range(min(last, len(labels) - 2) + 1):
+            category = self.categories.get(".".join(labels[i:]))
+            if category is not None:
+                break
+        return ".".join(labels[registrable:]), category
+    
+    def _lookup(self, url_or_host):
+        host = hostname(url_or_host)
+        result = self._hosts.get(host)
+        if result is None:
+            if len(self._hosts) >= HOST_CACHE_SIZE:
+                self._hosts.clear()
+            result = self._hosts[host] = self._classify(host)
+        return result
+    
+    def registrable_domain(self, url_or_host):
+        """eTLD+1；主机名本身就是公共后缀时原样返回"""
+        return self._lookup(url_or_host)[0]
+    
+    def category(self, url_or_host):
+        """分类表中的类别（forum / ugc / giant / tool …），未收录返回 None"""
+        return self._lookup(url_or_host)[1]
+    
+    def is_weak(self, url_or_host):
+        """论坛 / 用户生成内容等弱竞争者"""
+        return self.category(url_or_host) in self.weak
+    
+    def is_giant(self, url_or_host):
+        return self.category(url_or_host) in self.giant
+
+
+_default_classifier = None
+_default_lock = threading.Lock()
+
+
+def get_domain_classifier():
+    """进程内共享的默认分类器（后缀表和分类表只加载一次）"""
+    global _default_classifier
+    with _default_lock:
+        if _default_classifier is None:
+            _default_classifier = DomainClassifier()
+    return _default_classifier
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    classifier = get_domain_classifier()
+    for arg in sys.argv[1:]:
+        print(f"   {arg:<40} | {classifier.registrable_domain(arg):<24} | {classifier.category(arg) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
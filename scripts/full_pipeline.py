@@ -9,6 +9,7 @@ Process:
 4. Output actionable niche opportunities
 """
 
+import argparse
 import os
 import sys
 import time
@@ -19,6 +20,9 @@ from datetime import datetime
 from pathlib import Path
 from urllib.parse import quote
 import warnings
+from prefix_expander import PrefixExpander
+from seen_index import SeenIndex
+from suggest_cache import get_suggest_cache
 warnings.filterwarnings('ignore')
 
 DATA_DIR = Path("data_full")
@@ -66,36 +70,57 @@ def log(msg):
     print("[{}] {}".format(datetime.now().strftime('%H:%M:%S'), msg))
 
 def google_suggest(query):
+    cache = get_suggest_cache()
+    cached = cache.get(query, client="firefox", hl="en")
+    if cached is not None:
+        return cached
     url = "https://suggestqueries.google.com/complete/search"
     params = {"client": "firefox", "q": quote(query), "hl": "en"}
     try:
         r = requests.get(url, params=params, timeout=5)
         if r.status_code == 200:
             data = r.json()
-            return data[1] if len(data) > 1 else []
+            suggestions = data[1] if len(data) > 1 else []
+            cache.put(query, suggestions, client="firefox", hl="en")
+            return suggestions
     except:
         pass
     return []
 
-def alphabet_soup_expansion(max_kw=2000):
+def alphabet_soup_expansion(max_kw=2000, query_budget=None, seen=None):
     log("Step 0: Alphabet Soup mining ({} seeds)".format(len(SEED_ROOTS)))
     all_kw = set()
-    for root in SEED_ROOTS[:50]:
-        all_kw.update(google_suggest(root))
-        time.sleep(0.1)
-        all_kw.update(google_suggest("{} ".format(root)))
-        time.sleep(0.1)
-        for c in "abcdefghijklmnopqrstuvwxyz"[::2]:
-            all_kw.update(google_suggest("{} {}".format(c, root)))
+    if query_budget:
+        def fetch(query):
             time.sleep(0.05)
-        if len(all_kw) >= max_kw:
-            break
+            return google_suggest(query)
+        expander = PrefixExpander(query_budget=query_budget)
+        all_kw = expander.expand(SEED_ROOTS[:50], fetch)
+        log("   {} requests, {:.1f} keywords/request".format(expander.queries, expander.yield_per_request))
+    else:
+        for root in SEED_ROOTS[:50]:
+            all_kw.update(google_suggest(root))
+            time.sleep(0.1)
+            all_kw.update(google_suggest("{} ".format(root)))
+            time.sleep(0.1)
+            for c in "abcdefghijklmnopqrstuvwxyz"[::2]:
+                all_kw.update(google_suggest("{} {}".format(c, root)))
+                time.sleep(0.05)
+            if len(all_kw) >= max_kw:
+                break
     
     tool_signals = ["calculator", "converter", "generator", "checker", "finder",
         "tracker", "planner", "tool", "online", "free", "maker",
         "creator", "builder", "designer", "editor", "analyzer",
         "solver", "formatter", "validator"]
     filtered = [kw for kw in all_kw if any(s in kw.lower() for s in tool_signals)]
+    if seen is not None:
+        # Keywords validated by earlier runs are not processed again
+        fresh = seen.filter_new(filtered)
+        log("   Skipped {} already processed keywords".format(len(filtered) - len(fresh)))
+        filtered = fresh
+    cache_stats = get_suggest_cache().stats()
+    log("   Cache: {} hits, {} misses".format(cache_stats["hits"], cache_stats["misses"]))
     log("   Filtered to {} keywords".format(len(filtered)))
     return filtered[:max_kw]
 
@@ -238,7 +263,7 @@ def generate_report(df):
     </div>
 </body>
 </html>'''
-    
+
     output_path = REPORTS_DIR / ("profit_hunter_full_" + timestamp + ".html")
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(html)
@@ -246,11 +271,20 @@ def generate_report(df):
     return output_path
 
 def main():
+    parser = argparse.ArgumentParser(description="Profit Hunter ULTIMATE - Complete Workflow")
+    parser.add_argument("--query-budget", type=int, default=None,
+                        help="Alphabet Soup request budget; enables prefix-trie expansion")
+    parser.add_argument("--revisit-after", type=int, default=None,
+                        help="Re-process keywords validated more than N days ago "
+                             "(default: config.SEEN_INDEX; 0 re-processes everything)")
+    args = parser.parse_args()
+    
     log("="*60)
     log("Profit Hunter ULTIMATE - Complete Workflow")
     log("="*60)
     ensure_dirs()
-    keywords = alphabet_soup_expansion(2000)
+    seen = SeenIndex("harvest", revisit_after=args.revisit_after)
+    keywords = alphabet_soup_expansion(2000, query_budget=args.query_budget, seen=seen)
     if not keywords:
         log("No keywords found")
         return
@@ -259,6 +293,7 @@ def main():
         log("No qualified keywords")
         return
     df_validation = validate_keywords(df_gpts, 30)
+    seen.add(df_validation['keyword'])
     report_path = generate_report(df_validation)
     log("")
     log("="*60)
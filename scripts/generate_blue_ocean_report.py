@@ -9,6 +9,7 @@ import os
 sys.path.insert(0, '.')
 
 from datetime import datetime
+from top_k import top_k
 from blue_ocean_hunter import (
     is_product_keyword,
     analyze_need_type,
@@ -55,8 +56,8 @@ def generate_blue_ocean_report(keywords, output_file="blue_ocean_report.html"):
             "is_opportunity": is_opportunity
         })
     
-    # 排序
-    results.sort(key=lambda x: x["score"], reverse=True)
+    # 只有前 30 名会展示，不做全量排序
+    top = top_k(results, 30, key=lambda x: x["score"])
     
     # 统计
     build_now = [r for r in results if "BUILD" in r["decision"]]
@@ -378,7 +379,7 @@ def generate_blue_ocean_report(keywords, output_file="blue_ocean_report.html"):
 """
     
     # 添加TOP 10
-    for i, r in enumerate(results[:10], 1):
+    for i, r in enumerate(top[:10], 1):
         score_class = "high" if r["score"] >= 70 else ("medium" if r["score"] >= 50 else "low")
         decision_class = "build" if "BUILD" in r["decision"] else ("watch" if "WATCH" in r["decision"] else "drop")
         
@@ -425,7 +426,7 @@ def generate_blue_ocean_report(keywords, output_file="blue_ocean_report.html"):
 """
     
     # 添加完整表格
-    for i, r in enumerate(results[:30], 1):
+    for i, r in enumerate(top, 1):
         score_class = "high" if r["score"] >= 70 else ("medium" if r["score"] >= 50 else "low")
         decision_class = "build" if "BUILD" in r["decision"] else ("watch" if "WATCH" in r["decision"] else "drop")
         
@@ -7,6 +7,8 @@ import random
 from datetime import datetime
 from pathlib import Path
 
+from top_k import top_k
+
 REPORTS_DIR = Path("data/reports")
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -193,7 +195,8 @@ for kw in all_keywords[:200]:
         "competitors": competitors, "sources": sources_text, "reason": reason_text, "suggestion": suggestions_text
     })
 
-results.sort(key=lambda x: x['final_score'], reverse=True)
+# 只有前 100 名会展示，不做全量排序
+top = top_k(results, 100, key=lambda x: x['final_score'])
 
 total = len(results)
 recommended = len([r for r in results if r['is_recommended']])
@@ -276,7 +279,7 @@ html = '''<!DOCTYPE html>
             <h2 class="section-title">TOP 10 蓝海机会详情</h2>
 '''
 
-for i, r in enumerate(results[:10], 1):
+for i, r in enumerate(top[:10], 1):
     score_color = '#4CAF50' if r['final_score'] >= 70 else '#FF9800'
     drop_class = 'drop-badge' if r['drop_attack'] else ''
     
@@ -317,7 +320,7 @@ html += '''
                     <tbody>
 '''
 
-for i, r in enumerate(results[:100], 1):
+for i, r in enumerate(top, 1):
     decision_color = '#4CAF50' if r['decision'].startswith('🔴') else ('#FF9800' if r['decision'].startswith('🟡') else '#9e9e9e')
     html += '''<tr>
                         <td>''' + str(i) + '''</td>
@@ -380,5 +383,5 @@ print("")
 print("文件: {}".format(output_path))
 print("")
 print("TOP 10 关键词:")
-for r in results[:10]:
-    print("  {}. {} (评分:{})".format(results.index(r)+1, r['keyword'], r['final_score']))
+for i, r in enumerate(top[:10], 1):
+    print("  {}. {} (评分:{})".format(i, r['keyword'], r['final_score']))
@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+关键词特征引擎 - 所有评分器共用一次扫描
+
+- 各评分器（v3 / ultimate / deep / blue-ocean / super）的信号词表统一登记在 SIGNALS，
+  编译成一个 KeywordMatcher：每个关键词只小写、分词、匹配一次，得到 KeywordFeatures
+- 特征 = 信号类别是否命中 + 词数区间（len:*）
+- 评分档案 PROFILES 是特征上的加分表（基础分 + 命中特征的加分，可封顶），
+  各评分器只负责组合文本以外的数据（Trends / GPTs / SERP）
+"""
+
+import numpy as np
+
+from config import INTENT_SIGNALS, PAIN_TRIGGERS
+from keyword_matcher import KeywordMatcher
+
+
+# ============== 词表 ==============
+
+# v3 评分器（scorer.KeywordScorer）：用户意图类型定义
+USER_INTENTS = {
+    'calculate': {
+        'keywords': ['calculator', 'calculate', 'calculation', 'compute', 'math'],
+        'goal': '用户想计算某个数值',
+        'clarity': '高'
+    },
+    'convert': {
+        'keywords': ['converter', 'convert', 'conversion', 'transform', 'translate'],
+        'goal': '用户想转换单位/格式/语言',
+        'clarity': '高'
+    },
+    'generate': {
+        'keywords': ['generator', 'generate', 'creator', 'maker', 'builder'],
+        'goal': '用户想自动生成内容',
+        'clarity': '高'
+    },
+    'check': {
+        'keywords': ['checker', 'check', 'validate', 'verify', 'test'],
+        'goal': '用户想验证/检查某事',
+        'clarity': '高'
+    },
+    'compare': {
+        'keywords': ['compare', 'comparison', 'vs', 'versus', 'alternative'],
+        'goal': '用户想对比选项',
+        'clarity': '高'
+    },
+    'find': {
+        'keywords': ['finder', 'search', 'lookup', 'lookup', 'locate'],
+        'goal': '用户想查找某物',
+        'clarity': '中'
+    },
+    'plan': {
+        'keywords': ['planner', 'plan', 'schedule', 'organizer'],
+        'goal': '用户想规划/安排',
+        'clarity': '中'
+    },
+    'track': {
+        'keywords': ['tracker', 'track', 'monitor', 'measure'],
+        'goal': '用户想追踪/监测',
+        'clarity': '中'
+    },
+}
+
+# v3 可实现性信号（按优先级）
+BUILDABILITY_SIGNALS = {
+    'tool': ['calculator', 'generator', 'converter'],
+    'web': ['online', 'free', 'web'],
+}
+
+# ultimate（profit_hunter.py / test_offline.py）：意图信号、痛点、用户意图
+ULTIMATE_INTENT_SIGNALS = {
+    "calculator": ["calculator", "calc", "calculation"],
+    "generator": ["generator", "create", "make", "build", "generate"],
+    "converter": ["converter", "convert", "conversion"],
+    "checker": ["checker", "check", "verify", "validate", "test"],
+    "finder": ["finder", "find", "search", "lookup", "locate"],
+    "comparer": ["vs", "versus", "compare", "comparison", "alternative"],
+    "planner": ["planner", "plan", "schedule", "organizer"],
+    "tracker": ["tracker", "track", "monitor", "log"],
+}
+
+ULTIMATE_PAIN_TRIGGERS = {
+    "strong": [
+        "struggling with", "how to fix", "error", "cannot",
+        "doesn't work", "won't work", "failed", "broken"
+    ],
+    "medium": [
+        "best way to", "how to", "tips for", "guide to"
+    ],
+    "weak": [
+        "what is", "meaning of", "difference between"
+    ]
+}
+
+ULTIMATE_USER_INTENTS = {
+    "calculate": ["calculator", "calc", "calculation", "compute"],
+    "convert": ["convert", "converter", "conversion", "transform"],
+    "generate": ["generator", "create", "make", "generate", "build"],
+    "check": ["check", "checker", "verify", "validate", "test"],
+    "find": ["finder", "find", "search", "lookup", "locate"],
+    "compare": ["compare", "comparison", "vs", "versus", "alternative"],
+    "plan": ["planner", "plan", "schedule", "organize"],
+    "track": ["tracker", "track", "monitor", "log"],
+    "learn": ["learn", "tutorial", "guide", "how to", "explain"],
+    "download": ["download", "downloads", "free"],
+}
+
+# deep（deep_digger.py）
+DEEP_SIGNALS = {
+    'tool': ['calculator', 'generator', 'converter', 'checker',
+             'finder', 'tracker', 'planner', 'formatter', 'validator',
+             'creator', 'maker', 'builder', 'designer'],
+    'need': ['how to', 'best', 'free', 'online', 'for beginners',
+             'tool', 'software', 'app', 'template', 'without'],
+    'commercial': ['vs', 'alternative', 'review', 'compare',
+                   'pricing', 'cost', 'cheap', 'affordable'],
+    'question': ['what is', 'meaning', 'definition', 'difference',
+                 'why does', 'how does', 'can i', 'should i'],
+    'pain:strong': ["struggling with", "how to fix", "error", "cannot",
+                    "doesn't work", "won't work", "failed", "broken",
+                    "frustrated", "annoying", "waste of time"],
+    'pain:medium': ["best way to", "how to", "tips for", "guide to",
+                    "proper way", "correct way", "best practice"],
+    'pain:weak': ["what is", "meaning of", "difference between",
+                  "why does", "how does"],
+    # 用户意图里记录的痛点词（全部列出，不只看是否命中）
+    'pain_words': ["struggling", "frustrated", "annoying", "difficult", "hard",
+                   "confusing", "complicated", "complex", "overwhelming",
+                   "waste", "慢", "slow", "expensive", "broken", "error",
+                   "missing", "cannot", "can't", "doesn't work", "not working"],
+    # 搜索量估算 / 需求验证
+    'core_tool': ['calculator', 'generator', 'converter'],
+    'mid_tool': ['checker', 'finder', 'tracker'],
+    'free_online': ['free', 'online'],
+    'learn': ['learn', 'how to', 'guide'],
+    'product': ['tool', 'software', 'app', 'online'],
+    'forum_pain': ['struggling', 'frustrated', 'annoying', 'cannot find'],
+    # 竞争度估算（统计命中的域名个数）
+    'weak_domain': ["reddit.com", "quora.com", "stackoverflow.com",
+                    "medium.com", "dev.to", "blogger.com", "wordpress.com",
+                    "github.com", "wikipedia.org"],
+    'giant_domain': ["google.com", "microsoft.com", "adobe.com",
+                     "canva.com", "figma.com", "notion.so", "apple.com",
+                     "amazon.com", "youtube.com", "wikipedia.org"],
+}
+
+DEEP_USER_INTENTS = {
+    "calculate": ["calculator", "calc", "calculate", "computation", "compute"],
+    "convert": ["converter", "convert", "conversion", "transform", "translate"],
+    "generate": ["generator", "generate", "create", "make", "build", "produce"],
+    "check": ["checker", "check", "verify", "validate", "test", "scan"],
+    "find": ["finder", "find", "search", "lookup", "locate", "discover"],
+    "compare": ["compare", "comparison", "vs", "versus", "alternative", "better"],
+    "learn": ["learn", "tutorial", "guide", "how to", "understand", "explain"],
+    "plan": ["planner", "plan", "schedule", "organize", "manage"],
+    "track": ["tracker", "track", "monitor", "log", "measure"],
+    "download": ["download", "downloads", "free", "get", "access"],
+}
+
+# blue-ocean（blue_ocean_hunter.py）：产品词（不能做，这些是产品名）
+PRODUCT_INDICATORS = [
+    # 工具类产品
+    "calculator", "converter", "generator", "editor", "tool", "maker",
+    "creator", "builder", "parser", "formatter", "validator", "checker",
+    "finder", "searcher", "extractor", "downloader", "uploader",
+    "compressor", "resizer", "cropper", "merger", "splitter",
+    # 平台/服务
+    "app", "software", "platform", "service", "website", "online tool",
+    "free tool", "best tool", "top tool",
+    # 具体产品类别
+    "pdf", "excel", "word", "image", "video", "audio", "text",
+    "barcode", "qr code", "password", "email", "link", "url",
+    # 格式转换
+    "to pdf", "to excel", "to jpg", "to png", "to mp3", "to mp4",
+]
+
+# 产品词根（短词 + 词根 = 产品词）
+PRODUCT_ROOTS = [
+    "generator", "calculator", "converter", "maker", "creator",
+    "builder", "formatter", "validator", "checker", "parser"
+]
+
+# 强需求信号（出现则判定为需求词，优先级最高）
+STRONG_NEED_SIGNALS = [
+    "struggling with", "how to fix", "how to solve", "how to create",
+    "how to make", "how to write", "how to build", "how to learn",
+    "how to start", "tips for", "best way to", "tutorial for",
+    "help me fix", "help me create", "anyone know how",
+    "does anyone know", "why is my", "why does my",
+    "how long does", "is it worth", "difference between",
+    "pros and cons", "step by step", "advanced strategies"
+]
+
+# 需求词（可以做，这些是问题/痛点）
+NEED_INDICATORS = {
+    # 痛点信号（强）
+    "pain_strong": [
+        "struggling with", "how to fix", "how to solve", "error", "not working",
+        "cannot", "can't", "doesn't work", "failed", "issue", "problem",
+        "help", "urgent", "asap", "quickly", "fast", "instant",
+        "stuck", "confused", "lost", "frustrated", "annoying",
+        # 中文
+        "怎么办", "求助", "急", "救命", "崩溃", "蛋疼", "烦死了"
+    ],
+    # 痛点信号（中）
+    "pain_medium": [
+        "difficult", "hard", "complicated", "confusing", "complex",
+        "tired of", "sick of", "fed up", "waste time", "manual",
+        "boring", "repetitive", "tedious", "slow",
+        # 中文
+        "麻烦", "难", "复杂", "太慢", "太累"
+    ],
+    # 需求信号
+    "need": [
+        "need", "want", "looking for", "searching for", "wish",
+        "trying to", "need to", "have to", "must", "should",
+        "anyone know", "does anyone", "suggestion", "recommendation",
+        # 中文
+        "需要", "想要", "求推荐", "应该怎么"
+    ],
+    # 对比/选择信号
+    "compare": [
+        "vs", "versus", "better than", "alternative", "instead of",
+        "compare", "difference between", "pros and cons", "which one",
+        "which is better", "should i use", "or", "either",
+        # 中文
+        "哪个好", "区别", "对比", "还是", "推荐"
+    ],
+    # DIY/教程信号
+    "howto": [
+        "how to", "how do i", "how can i", "how does", "how make",
+        "tutorial", "guide", "step by step", "instructions",
+        "tips", "tricks", "secrets", "hacks", "strategies",
+        # 中文
+        "如何", "怎么", "教程", "指南", "技巧"
+    ],
+    # 优化/改进信号
+    "improve": [
+        "improve", "optimize", "enhance", "better", "upgrade",
+        "increase", "boost", "maximize", "efficient", "automate",
+        # 中文
+        "优化", "改进", "提升", "自动化"
+    ]
+}
+
+# AI适用场景
+AI_APPLICABLE = {
+    "text": {
+        "keywords": ["text", "content", "writing", "article", "blog", "post",
+                    "文案", "文章", "写作", "内容", "博客"],
+        "score": 90,
+        "solution": "AI写作/内容生成"
+    },
+    "image": {
+        "keywords": ["image", "photo", "picture", "art", "design", "logo",
+                    "图片", "图片", "照片", "设计", "艺术"],
+        "score": 85,
+        "solution": "AI图像生成/编辑"
+    },
+    "code": {
+        "keywords": ["code", "coding", "program", "script", "function",
+                    "代码", "编程", "程序", "脚本"],
+        "score": 95,
+        "solution": "AI编程助手"
+    },
+    "data": {
+        "keywords": ["data", "analysis", "analyze", "report", "summary",
+                    "数据", "分析", "报告", "总结"],
+        "score": 88,
+        "solution": "AI数据分析"
+    },
+    "chat": {
+        "keywords": ["chat", "conversation", "reply", "response", "message",
+                    "对话", "回复", "消息"],
+        "score": 92,
+        "solution": "AI对话/客服"
+    },
+    "translate": {
+        "keywords": ["translate", "translation", "language",
+                    "翻译", "语言"],
+        "score": 90,
+        "solution": "AI翻译"
+    },
+    "video": {
+        "keywords": ["video", "subtitle", "caption", "transcribe",
+                    "视频", "字幕", "转录"],
+        "score": 80,
+        "solution": "AI视频处理"
+    },
+    "seo": {
+        "keywords": ["seo", "keyword", "meta", "description", "title",
+                    "关键词", "元描述"],
+        "score": 82,
+        "solution": "AI SEO优化"
+    }
+}
+
+# super（profit_hunter_v3.py）：痛点信号词库（增强版）
+PAIN_SIGNALS = {
+    "urgent": [  # 紧急痛点
+        "struggling with", "how to fix", "error", "not working",
+        "cannot", "doesn't work", "failed", "help", "issue",
+        "求助", "怎么办", "急", "救命", "崩溃"
+    ],
+    "frustration": [  # 挫败感
+        "tired of", "sick of", "fed up", "annoying", "frustrating",
+        "painful", "difficult", "confusing", "complicated",
+        "麻烦", "蛋疼", "烦死了"
+    ],
+    "desire": [  # 强烈需求
+        "want", "need", "looking for", "searching for", "wish",
+        "应该有一个", "要是能", "太需要"
+    ],
+    "comparison": [  # 对比需求
+        "vs", "versus", "alternative", "better than", "compare",
+        "difference", "pros and cons", "哪个好"
+    ]
+}
+
+# 商业价值信号
+COMMERCIAL_SIGNALS = {
+    "high_cpc": [  # 高 CPC 关键词
+        "insurance", "lawyer", "attorney", "loan", "mortgage",
+        "crypto", "trading", "investment", "software", "course"
+    ],
+    "ecommerce": [  # 电商需求
+        "buy", "price", "discount", "sale", "cheap", "best",
+        "评测", "推荐", "购买", "价格"
+    ],
+    "saas": [  # SaaS 需求
+        "tool", "software", "platform", "solution", "service",
+        "工具", "软件", "平台", "服务"
+    ]
+}
+
+
+def ultimate_signals(intent_signals, pain_triggers, user_intents):
+    """ultimate 档案的信号类别（ProfitHunterUltimate 的配置可以覆盖词表）"""
+    return {
+        **{f'ultimate:intent:{name}': words for name, words in intent_signals.items()},
+        **{f'ultimate:pain:{level}': words for level, words in pain_triggers.items()},
+        **{f'ultimate:user:{name}': words for name, words in user_intents.items()},
+    }
+
+
+# 信号类别 → 信号词，类别名以档案名开头
+SIGNALS = {
+    # v3
+    'v3:pain': PAIN_TRIGGERS.get('strong', []),
+    **{f'v3:intent:{name}': INTENT_SIGNALS.get(name, []) for name in ['tool', '对比', 'B2B', '速度']},
+    **{f'v3:build:{name}': words for name, words in BUILDABILITY_SIGNALS.items()},
+    **{f'v3:user:{name}': info['keywords'] for name, info in USER_INTENTS.items()},
+    # ultimate
+    **ultimate_signals(ULTIMATE_INTENT_SIGNALS, ULTIMATE_PAIN_TRIGGERS, ULTIMATE_USER_INTENTS),
+    'ultimate:build:tool': ["calculator", "generator", "converter"],
+    'ultimate:build:web': ["online", "free"],
+    # deep
+    **{f'deep:{name}': words for name, words in DEEP_SIGNALS.items()},
+    **{f'deep:user:{name}': words for name, words in DEEP_USER_INTENTS.items()},
+    # blue-ocean
+    'blue:strong_need': STRONG_NEED_SIGNALS,
+    'blue:product': PRODUCT_INDICATORS,
+    'blue:product_root': PRODUCT_ROOTS,
+    **{f'blue:need:{name}': words for name, words in NEED_INDICATORS.items()},
+    **{f'blue:ai:{name}': info['keywords'] for name, info in AI_APPLICABLE.items()},
+    # super
+    **{f'super:pain:{name}': words for name, words in PAIN_SIGNALS.items()},
+    **{f'super:commercial:{name}': words for name, words in COMMERCIAL_SIGNALS.items()},
+    'super:build:tool': ['calculator', 'generator', 'converter', 'tool'],
+    'super:build:web': ['online', 'free'],
+}
+
+# 词数特征 → (最少词数, 最多词数)，None 表示不设上限
+LENGTH_FEATURES = {
+    'len:1': (1, 1),
+    'len:2': (2, 2),
+    'len:2+': (2, None),
+    'len:2-4': (2, 4),
+    'len:3-6': (3, 6),
+    'len:7+': (7, None),
+}
+
+
+def length_flags(word_counts):
+    """词数数组 → {词数特征: bool 数组}（列式评分用）"""
+    word_counts = np.asarray(word_counts)
+    return {
+        name: (word_counts >= low) & (word_counts <= (high if high is not None else np.inf))
+        for name, (low, high) in LENGTH_FEATURES.items()
+    }
+
+
+# ============== 特征 ==============
+
+class KeywordFeatures:
+    """一个关键词的特征：小写文本、词数、各信号类别命中的信号词"""
+    
+    __slots__ = ('lower', 'word_count', 'hits', '_matcher')
+    
+    def __init__(self, lower, word_count, hits, matcher):
+        self.lower = lower
+        self.word_count = word_count
+        self.hits = hits
+        self._matcher = matcher
+    
+    def has(self, feature):
+        """特征是否成立：信号类别有命中，或词数落在 len:* 区间内"""
+        if feature in self.hits:
+            return True
+        if feature in LENGTH_FEATURES:
+            low, high = LENGTH_FEATURES[feature]
+            return self.word_count >= low and (high is None or self.word_count <= high)
+        return False
+    
+    def first(self, category):
+        """按词表顺序返回第一个命中的信号词"""
+        if category not in self.hits:
+            return None
+        return self._matcher.first(self.hits, category)
+    
+    def matched(self, category):
+        """按词表顺序返回全部命中的信号词"""
+        found = self.hits.get(category)
+        if not found:
+            return []
+        return [word for word in self._matcher.categories[category] if word in found]
+    
+    def count(self, category):
+        """命中的不同信号词个数"""
+        return len(self.hits.get(category, ()))
+
+
+class FeatureEngine:
+    """特征提取引擎：全部信号类别编译成一个匹配器"""
+    
+    def __init__(self, signals=None):
+        self.signals = dict(SIGNALS if signals is None else signals)
+        self.matcher = KeywordMatcher(self.signals)
+    
+    def extract(self, keyword):
+        """一次小写、分词、匹配，得到 KeywordFeatures"""
+        lower = keyword.lower()
+        return KeywordFeatures(lower, len(lower.split()), self.matcher.match(lower), self.matcher)
+    
+    def override(self, signals):
+        """替换部分类别的词表；没有变化时返回自身（共享已编译的匹配器）"""
+        merged = {**self.signals, **signals}
+        if merged == self.signals:
+            return self
+        return FeatureEngine(merged)
+    
+    def subset(self, prefix):
+        """只保留某个档案的类别（列式批量匹配时减少无关命中）"""
+        return FeatureEngine({name: words for name, words in self.signals.items() if name.startswith(prefix)})
+
+
+# ============== 评分档案 ==============
+
+class Profile:
+    """评分档案：基础分 + 命中特征的加分（可为负），可选封顶"""
+    
+    def __init__(self, base, points, cap=None):
+        self.base = base
+        self.points = points
+        self.cap = cap
+        # 信号特征和词数特征分开，逐词评分时不必逐个走 has()
+        self._signal_points = [(feature, points) for feature, points in points.items()
+                               if feature not in LENGTH_FEATURES]
+        self._length_points = [(LENGTH_FEATURES[feature], points) for feature, points in points.items()
+                               if feature in LENGTH_FEATURES]
+    
+    def score(self, features):
+        hits, word_count = features.hits, features.word_count
+        total = self.base
+        for feature, points in self._signal_points:
+            if feature in hits:
+                total += points
+        for (low, high), points in self._length_points:
+            if word_count >= low and (high is None or word_count <= high):
+                total += points
+        return total if self.cap is None else min(total, self.cap)
+    
+    def score_arrays(self, flags):
+        """列式版本：flags 为 {特征: bool 数组}"""
+        total = self.base + sum(np.where(flags[feature], points, 0) for feature, points in self.points.items())
+        return total if self.cap is None else np.minimum(total, self.cap)
+
+
+# ultimate / offline 共用的意图信号加分
+_ULTIMATE_INTENT_POINTS = {
+    'ultimate:intent:calculator': 30,
+    'ultimate:intent:generator': 30,
+    'ultimate:intent:converter': 30,
+    'ultimate:intent:checker': 25,
+    'ultimate:intent:finder': 25,
+    'ultimate:intent:comparer': 20,
+    'len:2-4': 15,
+}
+
+# 可实现性：工具词 100 > 在线/免费 85 > 其他 70（两者都命中时封顶 100）
+_BUILDABILITY = {
+    prefix: Profile(70, {f'{prefix}:build:tool': 30, f'{prefix}:build:web': 15}, cap=100)
+    for prefix in ['v3', 'ultimate', 'super']
+}
+
+
+def ultimate_profiles(pain_triggers):
+    """ultimate 档案：痛点加分按配置的痛点级别生成（strong 40，其他级别 20）"""
+    pain_points = {f'ultimate:pain:{level}': 40 if level == 'strong' else 20 for level in pain_triggers}
+    return {
+        'intent': Profile(70, {**_ULTIMATE_INTENT_POINTS, **pain_points}, cap=100),
+        'pain': Profile(0, pain_points),
+        'buildability': _BUILDABILITY['ultimate'],
+    }
+
+
+PROFILES = {
+    'v3': {
+        'intent': Profile(50, {
+            'v3:pain': 40,
+            'v3:intent:tool': 30,
+            'v3:intent:对比': 25,
+            'v3:intent:B2B': 25,
+            'v3:intent:速度': 20,
+            'len:2+': 15,
+        }, cap=100),
+        'buildability': _BUILDABILITY['v3'],
+    },
+    'ultimate': ultimate_profiles(ULTIMATE_PAIN_TRIGGERS),
+    'offline': {
+        'intent': Profile(70, _ULTIMATE_INTENT_POINTS, cap=100),
+        'buildability': _BUILDABILITY['ultimate'],
+    },
+    'deep': {
+        'quality': Profile(50, {
+            'len:3-6': 20,
+            'len:2': 10,
+            'len:7+': 5,
+            'deep:tool': 25,
+            'deep:need': 15,
+            'deep:commercial': 10,
+            'deep:question': 5,
+        }),
+        'pain': Profile(0, {'deep:pain:strong': 40, 'deep:pain:medium': 20, 'deep:pain:weak': 5}),
+    },
+    'blue-ocean': {
+        'need': Profile(0, {
+            'blue:need:pain_strong': 40,
+            'blue:need:pain_medium': 25,
+            'blue:need:need': 20,
+            'blue:need:compare': 15,
+            'blue:need:howto': 10,
+            'blue:need:improve': 15,
+        }, cap=100),
+    },
+    'super': {
+        'pain': Profile(50, {
+            'super:pain:urgent': 30,
+            'super:pain:frustration': 25,
+            'super:pain:desire': 20,
+            'super:pain:comparison': 15,
+        }, cap=100),
+        'commercial': Profile(50, {
+            'super:commercial:high_cpc': 25,
+            'super:commercial:ecommerce': 20,
+            'super:commercial:saas': 15,
+        }, cap=100),
+        'buildability': _BUILDABILITY['super'],
+        # 长尾更精准：2-4 词 90，1 词 60，其他 75
+        'length': Profile(75, {'len:2-4': 15, 'len:1': -15}),
+    },
+}
+
+# 默认引擎（全部档案的词表）
+FEATURES = FeatureEngine()
+
+
+def extract(keyword):
+    """用默认引擎提取关键词特征"""
+    return FEATURES.extract(keyword)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+关键词信号匹配器 - 所有信号词编译成一个正则，一次扫描拿到全部命中
+
+语义与逐个 `pattern in keyword` 子串判断完全一致：
+- 正则在每个位置用前瞻匹配最长的信号词（按长度降序排列的分支）
+- 同一位置能匹配的更短信号词一定是最长者的前缀，预先算好前缀闭包补全
+- 分支按公共前缀合并成前缀树形式，每个位置只需比较一次首字符
+- match_all 把一整列文本拼成一个串扫描一次（信号词不含换行符，不会跨行匹配），
+  结果为长表，供列式评分使用
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+def _trie_pattern(words):
+    """把信号词编译成前缀树形式的正则（贪婪，优先匹配最长的词）"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+    
+    return build(trie)
+
+
+class KeywordMatcher:
+    """多类别信号词匹配器
+    
+    categories: {类别名: [信号词, ...]}，同一个信号词可以属于多个类别
+    """
+    
+    def __init__(self, categories):
+        self.categories = {name: list(patterns) for name, patterns in categories.items()}
+        
+        owners = {}
+        for name, patterns in self.categories.items():
+            for pattern in patterns:
+                owners.setdefault(pattern, set()).add(name)
+        
+        # 每个信号词 → 以它为最长匹配时同时命中的 (类别, 信号词)
+        self._closure = {
+            longest: [(name, pattern)
+                      for pattern in owners if longest.startswith(pattern)
+                      for name in owners[pattern]]
+            for longest in owners
+        }
+        
+        self._regex = re.compile(f'(?=({_trie_pattern(owners)}))')
+        self._batch_regex = re.compile(f'(?=({_trie_pattern(owners)}))|\n')
+        
+        # 闭包展开表：最长匹配 → (类别, 信号词, 信号词在类别配置中的位置)
+        self._closure_frame = pd.DataFrame(
+            [(longest, name, pattern, self.categories[name].index(pattern))
+             for longest, pairs in self._closure.items() for name, pattern in pairs],
+            columns=['found', 'category', 'pattern', 'rank']
+        )
+        self._closure_frame['category'] = pd.Categorical(self._closure_frame['category'],
+                                                         categories=list(self.categories))
+    
+    def match(self, text):
+        """返回 {类别: 命中的信号词集合}，未命中的类别不出现"""
+        hits = {}
+        closure = self._closure
+        for found in set(self._regex.findall(text)):
+            for name, pattern in closure[found]:
+                matched = hits.get(name)
+                if matched is None:
+                    hits[name] = {pattern}
+                else:
+                    matched.add(pattern)
+        return hits
+    
+    def first(self, hits, category):
+        """按配置顺序返回该类别第一个命中的信号词（对应原来循环里的 break）"""
+        matched = hits.get(category)
+        if not matched:
+            return None
+        for pattern in self.categories[category]:
+            if pattern in matched:
+                return pattern
+    
+    def match_all(self, texts):
+        """批量匹配一列文本
+        
+        返回长表 DataFrame[row, category, pattern, rank]，每个 (row, category, pattern) 只出现一次；
+        category 为按配置顺序排列的 Categorical，rank 是信号词在类别配置中的位置，取最小 rank 即对应 first()
+        """
+        texts = list(texts)
+        blob = '\n'.join(texts)
+        if blob.count('\n') > max(len(texts) - 1, 0):
+            blob = '\n'.join(text.replace('\n', ' ') for text in texts)
+        
+        # 换行符单独成一个分支：findall 中空串即行分隔，累计个数就是行号
+        found = np.array(self._batch_regex.findall(blob), dtype=object)
+        separators = found == ''
+        rows = np.cumsum(separators)[~separators]
+        found = found[~separators]
+        
+        hits = pd.DataFrame({'row': rows, 'found': found}).drop_duplicates()
+        hits = hits.merge(self._closure_frame, on='found').drop(columns='found')
+        return hits.drop_duplicates(['row', 'category', 'pattern']).reset_index(drop=True)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+紧凑关键词记录 - 深度挖掘长时间持有的结果不再逐条用 dict 保存
+
+- KeywordRecord 用 __slots__，没有每条记录一份的 __dict__ 和键字符串
+- 决策、竞争度、意图清晰度等重复出现的分类值只在类上的标签表里存一份，记录里只存小整数编码
+- 按 r["decision"] 读取与原来的 dict 兼容；只在写 CSV 等输出边界调用 to_dict()
+"""
+
+import csv
+
+
+class Category:
+    """分类字段：实例里存编码，标签表在所有记录间共享"""
+    
+    def __init__(self, sequence=False):
+        # sequence=True 的字段（列表）按 tuple 保存，输出时还原为列表
+        self.sequence = sequence
+        self.labels = []
+        self.codes = {}
+    
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+    
+    def encode(self, value):
+        if self.sequence:
+            value = tuple(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+    
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return self.labels[getattr(obj, self.slot)]
+    
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, self.encode(value))
+
+
+class KeywordRecord:
+    """深度挖掘的单个关键词结果"""
+    
+    # (输出列名, 属性名)，顺序即 CSV 列顺序
+    FIELDS = (
+        ("keyword", "keyword"),
+        ("word_count", "word_count"),
+        ("final_score", "final_score"),
+        ("decision", "decision"),
+        ("user_intent", "user_intent"),
+        ("user_goal", "user_goal"),
+        ("intent_clarity", "intent_clarity"),
+        ("pain_score", "pain_score"),
+        ("pain_indicators", "pain_indicators"),
+        ("estimated_volume", "estimated_volume"),
+        ("competition", "competition"),
+        ("competition_score", "competition_score"),
+        ("降维打击", "drop_attack"),
+        ("demand_validation", "demand_validation"),
+        ("demand_sources", "demand_sources"),
+        ("recommendation", "recommendation"),
+    )
+    COLUMNS = [column for column, _ in FIELDS]
+    _ATTRS = dict(FIELDS)
+    
+    __slots__ = (
+        'keyword', 'word_count', 'final_score', 'pain_score', 'competition_score', 'drop_attack',
+        '_decision', '_user_intent', '_user_goal', '_intent_clarity', '_pain_indicators',
+        '_estimated_volume', '_competition', '_demand_validation', '_demand_sources', '_recommendation',
+    )
+    
+    decision = Category()
+    user_intent = Category()
+    user_goal = Category()
+    intent_clarity = Category()
+    pain_indicators = Category(sequence=True)
+    estimated_volume = Category()
+    competition = Category()
+    demand_validation = Category()
+    demand_sources = Category(sequence=True)
+    recommendation = Category()
+    
+    def __init__(self, **fields):
+        for column, attr in self.FIELDS:
+            setattr(self, attr, fields[column] if column in fields else fields[attr])
+    
+    @classmethod
+    def from_dict(cls, row):
+        return cls(**row)
+    
+    def values(self):
+        return tuple(getattr(self, attr) for _, attr in self.FIELDS)
+    
+    def to_dict(self):
+        """转成与原 dict 相同的结构（列表字段还原为 list）"""
+        row = {}
+        for column, attr in self.FIELDS:
+            value = getattr(self, attr)
+            row[column] = list(value) if type(value) is tuple else value
+        return row
+    
+    def keys(self):
+        return self.COLUMNS
+    
+    def __getitem__(self, column):
+        try:
+            return getattr(self, self._ATTRS[column])
+        except KeyError:
+            raise KeyError(column) from None
+    
+    def __eq__(self, other):
+        if not isinstance(other, KeywordRecord):
+            return NotImplemented
+        return self.values() == other.values()
+    
+    def __repr__(self):
+        return f"KeywordRecord({self.keyword!r}, {self.final_score}, {self.decision!r})"
+    
+    # 编码只在本进程有效，跨进程（进程池）按标签序列化后重新编码
+    def __getstate__(self):
+        return self.values()
+    
+    def __setstate__(self, state):
+        for (_, attr), value in zip(self.FIELDS, state):
+            setattr(self, attr, value)
+
+
+def write_csv(path, records):
+    """把记录写成 CSV（输出边界才转成 dict）"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=KeywordRecord.COLUMNS)
+        writer.writeheader()
+        writer.writerows(record.to_dict() for record in records)
+
+
+class RecordWriter:
+    """逐条写 CSV，第一条记录到来时才创建文件（没有记录时不生成文件）"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._file = None
+        self._writer = None
+    
+    def write(self, record):
+        """写入一条 KeywordRecord 或同结构的 dict"""
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=KeywordRecord.COLUMNS)
+            self._writer.writeheader()
+        self._writer.writerow(record if isinstance(record, dict) else record.to_dict())
+        self.rows += 1
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+关键词空间 - 深度挖掘按需惰性生成候选词，每轮、每次运行都挖新的
+
+候选空间是 词根 × 长尾模式 × 字母前缀 的笛卡尔积，不整体生成：
+- 用仿射置换 i → (step * i + offset) % size 打乱遍历顺序，按下标解码出关键词，
+  每轮接着游标往后取，不同词根/模式交错出现
+- 已分析过的关键词记在已处理索引里（seen_index，命名空间 deep），跨轮次、跨运行去重；
+  词根或模式列表变了（空间大小不同）时游标从头开始，索引保证不重复分析
+- 设置了重访天数时，遍历完整个空间后从头再来一遍，只取出超过重访期的词
+- 游标和索引在 commit() 时落盘：只有已保存结果的词才算挖过
+"""
+
+import json
+import math
+import string
+from pathlib import Path
+from typing import List
+
+from seen_index import SeenIndex, normalize_keyword
+
+# 字母 soup 扩展：原词 + a-z 前缀
+PREFIXES = [""] + list(string.ascii_lowercase)
+
+
+def _coprime_step(size, seed):
+    """取一个与 size 互素、约为 size 黄金分割位置的步长，保证置换覆盖每个下标"""
+    step = int(size * 0.6180339887) + seed % max(size, 1) + 1
+    while math.gcd(step, size) != 1:
+        step += 1
+    return step
+
+
+class KeywordSpace:
+    """可续跑的候选词空间"""
+    
+    def __init__(self, roots, patterns, state_dir, seen=None, prefixes=PREFIXES, seed=0):
+        # 词根列表里有重复和多余空格，去掉后空间里不会出现重复的词
+        self.roots = list(dict.fromkeys(root.strip() for root in roots))
+        self.patterns = list(dict.fromkeys(patterns))
+        self.prefixes = list(prefixes)
+        self.size = len(self.roots) * len(self.patterns) * len(self.prefixes)
+        self.seed = seed
+        self.step = _coprime_step(self.size, seed) if self.size else 1
+        self.offset = seed % self.size if self.size else 0
+        
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = state_dir / "keyword_space.json"
+        
+        self.cursor = 0
+        if self.state_path.exists():
+            state = json.loads(self.state_path.read_text(encoding='utf-8'))
+            if state.get("size") == self.size and state.get("seed") == self.seed:
+                self.cursor = state["cursor"]
+        
+        self.seen = seen if seen is not None else SeenIndex("deep")
+        # 已取出、还没 commit 的词
+        self._pending = {}
+    
+    def keyword_at(self, index):
+        """把 [0, size) 内的下标解码成关键词"""
+        rest, prefix = divmod(index, len(self.prefixes))
+        root, pattern = divmod(rest, len(self.patterns))
+        keyword = self.patterns[pattern].format(root=self.roots[root])
+        return f"{self.prefixes[prefix]} {keyword}" if self.prefixes[prefix] else keyword
+    
+    def take(self, count: int) -> List[str]:
+        """从游标处取下一批最多 count 个没分析过的词，空间挖完时返回的数量会不足"""
+        batch = []
+        wrapped = False
+        while len(batch) < count:
+            if self.cursor >= self.size:
+                # 永不重访时空间已挖完；否则每次最多从头再扫一遍，找超过重访期的词
+                if self.seen.revisit_after is None or wrapped or not self.size:
+                    break
+                self.cursor = 0
+                wrapped = True
+            # 每块最多只差 count - len(batch) 个，新词不会多取，游标不会越过没用上的词
+            end = min(self.size, self.cursor + count - len(batch))
+            candidates = [self.keyword_at((self.step * position + self.offset) % self.size)
+                          for position in range(self.cursor, end)]
+            self.cursor = end
+            for keyword in self.seen.filter_new(candidates):
+                key = normalize_keyword(keyword)
+                if key not in self._pending:
+                    self._pending[key] = keyword
+                    batch.append(keyword)
+        return batch
+    
+    @property
+    def remaining(self):
+        """游标之后还没遍历的下标数（其中可能有已经分析过的词）"""
+        return self.size - self.cursor
+    
+    def commit(self):
+        """把取出的词记入已处理索引并保存游标，在本轮结果落盘之后调用"""
+        if self._pending:
+            self.seen.add(self._pending.values())
+            self._pending = {}
+        self.state_path.write_text(
+            json.dumps({"size": self.size, "seed": self.seed, "cursor": self.cursor}),
+            encoding='utf-8'
+        )
+    
+    def reset(self):
+        """清空游标和已处理索引，下次从头挖"""
+        self.cursor = 0
+        self.seen.clear()
+        self._pending = {}
+        if self.state_path.exists():
+            self.state_path.unlink()
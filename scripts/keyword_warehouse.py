@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+关键词仓库 - SQLite 保存每次运行各阶段的结果
+
+各步骤的 CSV 每次运行都会被覆盖，仓库按运行保留历史：
+- runs: 每次运行一行（来源脚本、参数、起止时间）
+- keywords: 每个关键词一行，记录首次/最近出现的运行
+- stage_results: (run_id, stage, keyword) 一行，保存该阶段的整条结果（JSON）和评分/决策
+- 写入按批 executemany，一个阶段一个事务
+
+Usage:
+    python3 keyword_warehouse.py runs                 # 最近的运行
+    python3 keyword_warehouse.py new [--run N]        # 本次运行首次出现的关键词
+    python3 keyword_warehouse.py history KEYWORD      # 某个关键词历次运行的评分
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from config import KEYWORD_WAREHOUSE
+
+
+def _json_default(value):
+    # numpy 标量等
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _number(value):
+    """评分列只存数字，其余（缺失、字符串）存 NULL"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class KeywordWarehouse:
+    """关键词仓库"""
+    
+    def __init__(self, path=None, batch_size=None):
+        self.path = Path(path or KEYWORD_WAREHOUSE["path"])
+        self.batch_size = batch_size or KEYWORD_WAREHOUSE["batch_size"]
+        
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                params TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                keywords INTEGER
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY,
+                first_run INTEGER NOT NULL,
+                last_run INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS stage_results (
+                run_id INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                score REAL,
+                decision TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (run_id, stage, keyword)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_keywords_first_run ON keywords (first_run)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_keyword ON stage_results (keyword, stage, run_id)")
+        self.conn.commit()
+    
+    def start_run(self, source, params=None):
+        """登记一次运行，返回 run_id"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (source, params, started_at) VALUES (?, ?, ?)",
+                (source, json.dumps(params or {}, ensure_ascii=False, default=_json_default), time.time())
+            )
+            return cursor.lastrowid
+    
+    def finish_run(self, run_id):
+        """记录结束时间和本次运行涉及的关键词数"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at=?, keywords="
+                "(SELECT COUNT(DISTINCT keyword) FROM stage_results WHERE run_id=?) WHERE run_id=?",
+                (time.time(), run_id, run_id)
+            )
+    
+    def _batches(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def write_stage(self, run_id, stage, rows, score_field="final_score"):
+        """写入一个阶段的结果（每条需含 keyword），同一运行重复写入时覆盖，返回写入条数"""
+        written = 0
+        with self._lock, self.conn:
+            for batch in self._batches(rows):
+                batch = [row.to_dict() if hasattr(row, 'to_dict') else row for row in batch]
+                self.conn.executemany(
+                    "INSERT INTO keywords VALUES (?, ?, ?) "
+                    "ON CONFLICT (keyword) DO UPDATE SET last_run=MAX(last_run, excluded.last_run)",
+                    [(row["keyword"], run_id, run_id) for row in batch]
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO stage_results VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, stage, row["keyword"], _number(row.get(score_field)), row.get("decision"),
+                      json.dumps(row, ensure_ascii=False, default=_json_default))
+                     for row in batch]
+                )
+                written += len(batch)
+        return written
+    
+    def latest_run(self, source=None):
+        """最近一次运行的 run_id，没有返回 None"""
+        with self._lock:
+            if source is None:
+                row = self.conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+            else:
+                row = self.conn.execute("SELECT MAX(run_id) FROM runs WHERE source=?", (source,)).fetchone()
+        return row[0]
+    
+    def runs(self, limit=20):
+        """最近的运行 [{run_id, source, started_at, finished_at, keywords}]"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT run_id, source, started_at, finished_at, keywords FROM runs "
+                "ORDER BY run_id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(zip(("run_id", "source", "started_at", "finished_at", "keywords"), row)) for row in rows]
+    
+    def new_since_last_run(self, run_id=None, stage="final"):
+        """某次运行（默认最近一次）首次出现、之前任何运行都没有的关键词
+        
+        返回 [{keyword, score, decision}]（score / decision 取该运行 stage 阶段的结果），按评分降序
+        """
+        if run_id is None:
+            run_id = self.latest_run()
+            if run_id is None:
+                return []
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT k.keyword, s.score, s.decision FROM keywords k "
+                "LEFT JOIN stage_results s ON s.run_id=k.first_run AND s.stage=? AND s.keyword=k.keyword "
+                "WHERE k.first_run=? ORDER BY s.score IS NULL, s.score DESC, k.keyword",
+                (stage, run_id)
+            ).fetchall()
+        return [{"keyword": keyword, "score": score, "decision": decision} for keyword, score, decision in rows]
+    
+    def score_history(self, keyword, stage="final"):
+        """某个关键词历次运行的评分 [{run_id, source, started_at, score, decision}]，按运行先后"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT s.run_id, r.source, r.started_at, s.score, s.decision FROM stage_results s "
+                "JOIN runs r ON r.run_id=s.run_id WHERE s.keyword=? AND s.stage=? ORDER BY s.run_id",
+                (keyword, stage)
+            ).fetchall()
+        return [dict(zip(("run_id", "source", "started_at", "score", "decision"), row)) for row in rows]
+    
+    def stage_rows(self, run_id, stage):
+        """读回某次运行某个阶段的完整结果"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM stage_results WHERE run_id=? AND stage=?", (run_id, stage)
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+
+_default_warehouse = None
+_default_lock = threading.Lock()
+
+
+def get_keyword_warehouse():
+    """进程内共享的默认仓库实例"""
+    global _default_warehouse
+    with _default_lock:
+        if _default_warehouse is None:
+            _default_warehouse = KeywordWarehouse()
+    return _default_warehouse
+
+
+def _fmt_time(ts):
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M') if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词仓库查询")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    runs_parser = subparsers.add_parser("runs", help="最近的运行")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    new_parser = subparsers.add_parser("new", help="本次运行首次出现的关键词")
+    new_parser.add_argument("--run", type=int, default=None, help="运行编号（默认最近一次）")
+    new_parser.add_argument("--limit", type=int, default=50)
+    history_parser = subparsers.add_parser("history", help="某个关键词历次运行的评分")
+    history_parser.add_argument("keyword")
+    args = parser.parse_args()
+    
+    warehouse = get_keyword_warehouse()
+    
+    if args.command == "runs":
+        for run in warehouse.runs(args.limit):
+            print(f"#{run['run_id']:<5} {run['source']:<12} {_fmt_time(run['started_at'])} → "
+                  f"{_fmt_time(run['finished_at'])} | {run['keywords'] or 0} 个关键词")
+    
+    elif args.command == "new":
+        new = warehouse.new_since_last_run(args.run)
+        print(f"🆕 新关键词 {len(new)} 个")
+        for row in new[:args.limit]:
+            score = f"{row['score']:.1f}" if row['score'] is not None else "-"
+            print(f"   {row['keyword'][:50]:<50} | {score:>5} | {row['decision'] or ''}")
+    
+    elif args.command == "history":
+        history = warehouse.score_history(args.keyword)
+        if not history:
+            print(f"⚠️ 仓库中没有 '{args.keyword}' 的评分记录")
+        for row in history:
+            score = f"{row['score']:.1f}" if row['score'] is not None else "-"
+            print(f"#{row['run_id']:<5} {row['source']:<12} {_fmt_time(row['started_at'])} | "
+                  f"{score:>5} | {row['decision'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+前缀树扩展模块 - 饱和驱动的 Alphabet Soup
+
+固定的 a-z 前缀循环有一半请求拿不到新词，也挖不到更深的长尾。
+这里沿自动补全的前缀树逐层下探：
+- 某个前缀返回了满页建议（说明还有被截断的补全），才往下扩展一个字符
+- 某个分支没有带来任何新词，就剪掉它
+- 总请求数受硬预算约束
+"""
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+class PrefixExpander:
+    """前缀树扩展器
+    
+    用法一：同步驱动
+        expander = PrefixExpander(query_budget=200)
+        keywords = expander.expand(seeds, fetch)
+    
+    用法二：调用方自己并发执行每一层
+        expander.start(seeds)
+        while True:
+            batch = expander.next_batch()
+            if not batch:
+                break
+            expander.feed(batch, [fetch(query) for query, _ in batch])
+    """
+    
+    def __init__(self, query_budget=200, page_size=10, max_depth=3, alphabet=LETTERS):
+        self.query_budget = query_budget
+        self.page_size = page_size
+        self.max_depth = max_depth
+        self.alphabet = alphabet
+        
+        self.queries = 0
+        self.keywords = set()
+        self._frontier = []
+    
+    @property
+    def yield_per_request(self):
+        """每次请求带来的新关键词数"""
+        return len(self.keywords) / self.queries if self.queries else 0
+    
+    def start(self, seeds):
+        """以种子词作为前缀树的根"""
+        self._frontier = [(seed, 0) for seed in seeds]
+    
+    def next_batch(self):
+        """取出下一层待查询的前缀 [(query, depth)]，超出预算的部分直接丢弃"""
+        remaining = max(0, self.query_budget - self.queries)
+        batch = self._frontier[:remaining]
+        self._frontier = []
+        self.queries += len(batch)
+        return batch
+    
+    def feed(self, batch, results):
+        """回填一层的查询结果，并决定哪些前缀继续下探"""
+        for (query, depth), suggestions in zip(batch, results):
+            new = set(suggestions) - self.keywords
+            self.keywords.update(suggestions)
+            
+            # 没有新词的分支已经枯竭
+            if not new:
+                continue
+            
+            # 未返回满页说明补全已全部列出，无需下探
+            if len(suggestions) < self.page_size or depth >= self.max_depth:
+                continue
+            
+            for char in self.alphabet:
+                self._frontier.append((self._child(query, depth, char), depth + 1))
+    
+    def _child(self, query, depth, char):
+        """根节点之后另起一个词，更深层则在当前词上追加字符"""
+        return f"{query} {char}" if depth == 0 else query + char
+    
+    def expand(self, seeds, fetch):
+        """同步执行完整扩展，返回全部关键词"""
+        self.start(seeds)
+        
+        while True:
+            batch = self.next_batch()
+            if not batch:
+                break
+            self.feed(batch, [fetch(query) for query, _ in batch])
+        
+        return self.keywords
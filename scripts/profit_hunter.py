@@ -43,9 +43,24 @@ except ImportError:
     TrendReq = None
 
 try:
-    from playwright.sync_api import sync_playwright
+    from playwright.async_api import async_playwright
 except ImportError:
-    sync_playwright = None
+    async_playwright = None
+
+from config import SERP_BROWSER
+from domain_classifier import get_domain_classifier
+from keyword_warehouse import get_keyword_warehouse
+from keyword_features import (FEATURES, ULTIMATE_INTENT_SIGNALS, ULTIMATE_PAIN_TRIGGERS,
+                              ULTIMATE_USER_INTENTS, ultimate_profiles, ultimate_signals)
+from prefix_expander import PrefixExpander
+from process_pool import map_records
+from seen_index import SeenIndex
+from serp_archive import get_serp_archive
+from serp_browser import fetch_serps, parse_result_links
+from top_k import top_k
+from suggest_cache import get_suggest_cache
+from trends_batch import fetch_batched_trends
+from trends_store import get_trends_store
 
 
 # ============== 配置 ==============
@@ -57,6 +72,7 @@ CONFIG = {
         "WATCH": 45,
         "MIN_GPTS_RATIO": 0.03,
     },
+    # 弱竞争者 / 巨头站点：真实 SERP 结果中覆盖 domain_classifier 分类表的判断，模拟分析时匹配关键词里提到的站点
     "serp_weak_competitors": [
         "reddit.com", "quora.com", "stackoverflow.com",
         "medium.com", "dev.to", "blogger.com", "wordpress.com"
@@ -65,43 +81,58 @@ CONFIG = {
         "google.com", "microsoft.com", "adobe.com",
         "canva.com", "figma.com", "notion.so"
     ],
-    "pain_triggers": {
-        "strong": [
-            "struggling with", "how to fix", "error", "cannot",
-            "doesn't work", "won't work", "failed", "broken"
-        ],
-        "medium": [
-            "best way to", "how to", "tips for", "guide to"
-        ],
-        "weak": [
-            "what is", "meaning of", "difference between"
-        ]
-    },
-    "intent_signals": {
-        "calculator": ["calculator", "calc", "calculation"],
-        "generator": ["generator", "create", "make", "build", "generate"],
-        "converter": ["converter", "convert", "conversion"],
-        "checker": ["checker", "check", "verify", "validate", "test"],
-        "finder": ["finder", "find", "search", "lookup", "locate"],
-        "comparer": ["vs", "versus", "compare", "comparison", "alternative"],
-        "planner": ["planner", "plan", "schedule", "organizer"],
-        "tracker": ["tracker", "track", "monitor", "log"],
-    },
-    "user_intent_patterns": {
-        "calculate": ["calculator", "calc", "calculation", "compute"],
-        "convert": ["convert", "converter", "conversion", "transform"],
-        "generate": ["generator", "create", "make", "generate", "build"],
-        "check": ["check", "checker", "verify", "validate", "test"],
-        "find": ["finder", "find", "search", "lookup", "locate"],
-        "compare": ["compare", "comparison", "vs", "versus", "alternative"],
-        "plan": ["planner", "plan", "schedule", "organize"],
-        "track": ["tracker", "track", "monitor", "log"],
-        "learn": ["learn", "tutorial", "guide", "how to", "explain"],
-        "download": ["download", "downloads", "free"],
-    }
+    "pain_triggers": ULTIMATE_PAIN_TRIGGERS,
+    "intent_signals": ULTIMATE_INTENT_SIGNALS,
+    "user_intent_patterns": ULTIMATE_USER_INTENTS,
 }
 
 
+def serp_competition(links: List[str], weak_competitors=None, giants=None) -> Dict:
+    """按前 3 名结果的域名判断竞争度（domain_classifier 分类表：论坛/UGC 为弱竞争者）
+    
+    weak_competitors / giants 为站点列表（默认取 CONFIG），优先于分类表
+    """
+    classifier = get_domain_classifier()
+    weak_sites = {classifier.registrable_domain(site) for site in
+                  (CONFIG["serp_weak_competitors"] if weak_competitors is None else weak_competitors)}
+    giant_sites = {classifier.registrable_domain(site) for site in
+                   (CONFIG["serp_giants"] if giants is None else giants)}
+    domains = [classifier.registrable_domain(href) for href in links]
+    
+    # 判断竞争度
+    giant_flags = [domain in giant_sites or (domain not in weak_sites and classifier.is_giant(href))
+                   for domain, href in zip(domains, links)]
+    weak_flags = [domain in weak_sites or (domain not in giant_sites and classifier.is_weak(href))
+                  for domain, href in zip(domains, links)]
+    weak_count = sum(weak_flags)
+    giant_count = sum(giant_flags)
+    
+    if weak_count > 0 and giant_count == 0:
+        competition = "🟢 WEAK"
+        competition_score = 100
+        is_drop_attack = True
+    elif giant_count > 0:
+        competition = "🔴 GIANT"
+        competition_score = 30
+        is_drop_attack = False
+    else:
+        competition = "🟡 MEDIUM"
+        competition_score = 60
+        is_drop_attack = False
+    
+    return {
+        "competition": competition,
+        "competition_score": competition_score,
+        "降维打击": is_drop_attack,
+        "top_domains": domains
+    }
+
+
+def serp_competition_from_html(html: str) -> Dict:
+    """归档的结果页离线重新解析（serp_archive.py reparse）"""
+    return serp_competition(parse_result_links(html))
+
+
 # ============== 核心功能 ==============
 class ProfitHunterUltimate:
     """终极版蓝海关键词猎取系统"""
@@ -111,7 +142,17 @@ class ProfitHunterUltimate:
         self.data_dir = Path(self.config["data_dir"])
         self.data_dir.mkdir(exist_ok=True)
         self.results = []
-        
+        # run() 期间各步骤结果同时写入关键词仓库
+        self.warehouse = get_keyword_warehouse()
+        self.run_id = None
+        # run() 期间跳过以前运行处理过的关键词
+        self.seen = None
+        # 配置覆盖了词表时单独编译，否则共用默认特征引擎
+        self.features = FEATURES.override(ultimate_signals(
+            self.config["intent_signals"], self.config["pain_triggers"], self.config["user_intent_patterns"]))
+        # 痛点加分同样按配置的痛点级别
+        self.profile = ultimate_profiles(self.config["pain_triggers"])
+    
     def load_seed_words(self) -> List[str]:
         """加载种子词"""
         seed_file = self.config.get("seed_words_file", "words.md")
@@ -126,8 +167,12 @@ class ProfitHunterUltimate:
         # 默认种子词
         return ["calculator", "generator", "converter", "checker", "finder"]
     
-    def step0_google_autocomplete(self, words: List[str], max_results: int = 500) -> List[str]:
-        """Step 0: Google Autocomplete 海量挖词"""
+    def step0_google_autocomplete(self, words: List[str], max_results: int = 500,
+                                  query_budget: Optional[int] = None) -> List[str]:
+        """Step 0: Google Autocomplete 海量挖词
+        
+        query_budget: 设置后用前缀树扩展代替固定修饰词循环
+        """
         print("🔍 Step 0: Google Autocomplete 挖词...")
         
         all_keywords = set()
@@ -135,29 +180,53 @@ class ProfitHunterUltimate:
                      'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z',
                      'how to', 'what is', 'best', 'free', 'online', 'for', 'to']
         
-        for word in words[:10]:  # 限制种子词数量
-            for mod in modifiers[:15]:  # 限制修饰词数量
-                query = f"{mod} {word}"
-                suggestions = self._fetch_google_suggestions(query)
-                all_keywords.update(suggestions)
+        # 以前运行处理过的词不计入 max_results
+        skipped = set()
+        
+        def unseen(suggestions):
+            if self.seen is None:
+                return suggestions
+            fresh = self.seen.filter_new(suggestions)
+            skipped.update(set(suggestions).difference(fresh))
+            return fresh
+        
+        if query_budget:
+            expander = PrefixExpander(query_budget=query_budget)
+            all_keywords = unseen(expander.expand(words[:10], self._fetch_google_suggestions))
+            print(f"   📡 请求 {expander.queries} 次, 每次请求 {expander.yield_per_request:.1f} 个关键词")
+        else:
+            for word in words[:10]:  # 限制种子词数量
+                for mod in modifiers[:15]:  # 限制修饰词数量
+                    query = f"{mod} {word}"
+                    suggestions = unseen(self._fetch_google_suggestions(query))
+                    all_keywords.update(suggestions)
+                    if len(all_keywords) >= max_results:
+                        break
                 if len(all_keywords) >= max_results:
                     break
-            if len(all_keywords) >= max_results:
-                break
         
+        if skipped:
+            print(f"   ⏭️ 跳过已处理的关键词 {len(skipped)} 个")
         keywords = list(all_keywords)[:max_results]
         print(f"   📊 挖掘到 {len(keywords)} 个关键词")
+        cache_stats = get_suggest_cache().stats()
+        print(f"   💾 缓存命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次")
         
         # 保存
         self._save_csv(f"step0_suggest_keywords.csv", 
-                      [{"keyword": k} for k in keywords])
+                      [{"keyword": k} for k in keywords], stage="suggest")
         return keywords
     
     def _fetch_google_suggestions(self, query: str) -> List[str]:
-        """获取 Google 自动补全建议"""
+        """获取 Google 自动补全建议（读写本地缓存）"""
+        cache = get_suggest_cache()
+        cached = cache.get(query, client="firefox", hl="en")
+        if cached is not None:
+            return [item[0] for item in cached if isinstance(item, list)]
+        
         if not requests:
             return []
-            
+        
         try:
             url = f"https://suggestqueries.google.com/complete/search"
             params = {
@@ -171,13 +240,18 @@ class ProfitHunterUltimate:
             response = requests.get(url, params=params, headers=headers, timeout=3)
             if response.status_code == 200:
                 data = response.json()
+                cache.put(query, data[1], client="firefox", hl="en")
                 return [item[0] for item in data[1] if isinstance(item, list)]
         except Exception as e:
             pass
         return []
     
-    def step1_google_trends(self, keywords: List[str], deep_dive: bool = True) -> List[Dict]:
-        """Step 1: Google Trends 飙升词捕捉 + 二级深挖"""
+    def step1_google_trends(self, keywords: List[str], deep_dive: bool = True,
+                            batched: bool = False) -> List[Dict]:
+        """Step 1: Google Trends 飙升词捕捉 + 二级深挖
+        
+        batched: 锚点词 + 4 个关键词一个 payload，热度按锚点换算到同一尺度
+        """
         print("📈 Step 1: Google Trends 分析...")
         
         if not TrendReq:
@@ -186,27 +260,51 @@ class ProfitHunterUltimate:
         
         trends_data = []
         pytrends = TrendReq(hl='en-US', tz=360)
-        
-        for keyword in keywords[:50]:  # 限制数量
-            try:
-                pytrends.build_payload([keyword], timeframe='now 7-d')
-                interest = pytrends.interest_over_time()
-                
-                if not interest.empty:
-                    recent = interest[keyword].iloc[-7:].mean()
-                    trends_data.append({
-                        "keyword": keyword,
-                        "avg_interest": recent,
-                        "is_rising": recent > 50
-                    })
-                time.sleep(random.uniform(0.5, 1))  # 避免限流
-            except Exception as e:
-                continue
+        store = get_trends_store()
+        timeframe = 'now 7-d'
+        
+        # 时序库中未过期的直接使用，只拉取缺失/过期的关键词
+        fresh, stale, missing = store.plan(keywords[:50], timeframe)
+        interest = {kw: rec['series'] for kw, rec in fresh.items() if rec['series'] is not None}
+        to_fetch = stale + missing
+        
+        if batched:
+            fetched, _, payloads = fetch_batched_trends(
+                pytrends, to_fetch, timeframe=timeframe,
+                related=False, delay=random.uniform(0.5, 1)
+            )
+            print(f"   📦 批量模式: {payloads} 个 payload")
+        else:
+            fetched = {}
+            for keyword in to_fetch:  # 限制数量
+                try:
+                    pytrends.build_payload([keyword], timeframe=timeframe)
+                    frame = pytrends.interest_over_time()
+                    
+                    if not frame.empty:
+                        fetched[keyword] = frame[keyword]
+                    time.sleep(random.uniform(0.5, 1))  # 避免限流
+                except Exception as e:
+                    continue
+        
+        for keyword, series in fetched.items():
+            store.put(keyword, timeframe, series)
+        interest.update(fetched)
+        print(f"   💾 时序库命中 {len(fresh)} 个, 拉取 {len(to_fetch)} 个")
+        
+        for keyword in keywords[:50]:
+            if keyword in interest:
+                recent = interest[keyword].iloc[-7:].mean()
+                trends_data.append({
+                    "keyword": keyword,
+                    "avg_interest": recent,
+                    "is_rising": recent > 50
+                })
         
         print(f"   📊 分析了 {len(trends_data)} 个关键词")
         
         # 保存
-        self._save_csv(f"step1_trends_deep.csv", trends_data)
+        self._save_csv(f"step1_trends_deep.csv", trends_data, stage="trends")
         return trends_data
     
     def step2_gpts_comparison(self, keywords: List[str]) -> Dict[str, Dict]:
@@ -243,19 +341,26 @@ class ProfitHunterUltimate:
         
         # 保存
         csv_data = [{"keyword": k, **v} for k, v in comparison.items()]
-        self._save_csv(f"step2_gpts_comparison.csv", csv_data)
+        self._save_csv(f"step2_gpts_comparison.csv", csv_data, stage="gpts")
         return comparison
     
-    def step3_serp_analysis(self, keywords: List[str], use_playwright: bool = False) -> Dict[str, Dict]:
-        """Step 3: SERP 竞争分析"""
+    def step3_serp_analysis(self, keywords: List[str], use_playwright: bool = False,
+                            serp_mode: Optional[str] = None) -> Dict[str, Dict]:
+        """Step 3: SERP 竞争分析（serp_mode: full / light / http，None 按 config.SERP_BROWSER）"""
         print("🔎 Step 3: SERP 竞争分析...")
         
         serp_data = {}
         
-        if use_playwright and sync_playwright:
-            # 使用 Playwright 真实检测
-            serp_data = self._playwright_serp_analysis(keywords)
-        else:
+        # http 模式不需要浏览器
+        if use_playwright and (async_playwright or (serp_mode or SERP_BROWSER["mode"]) == "http"):
+            # 使用 Playwright 真实检测（浏览器池并发加载）
+            try:
+                serp_data = self._playwright_serp_analysis(keywords, serp_mode)
+            except Exception as e:
+                # 浏览器启动失败等，整体退回模拟分析
+                print(f"   ⚠️ Playwright 不可用（{str(e).splitlines()[0]}），改用模拟分析")
+        
+        if not serp_data:
             # 模拟分析（基于关键词特征）
             for keyword in keywords:
                 serp_data[keyword] = self._simulate_serp_analysis(keyword)
@@ -264,7 +369,7 @@ class ProfitHunterUltimate:
         
         # 保存
         csv_data = [{"keyword": k, **v} for k, v in serp_data.items()]
-        self._save_csv(f"step3_serp_analysis.csv", csv_data)
+        self._save_csv(f"step3_serp_analysis.csv", csv_data, stage="serp")
         return serp_data
     
     def _simulate_serp_analysis(self, keyword: str) -> Dict:
@@ -300,136 +405,86 @@ class ProfitHunterUltimate:
             ], 3)
         }
     
-    def _playwright_serp_analysis(self, keywords: List[str]) -> Dict[str, Dict]:
-        """使用 Playwright 进行真实 SERP 分析"""
+    def _playwright_serp_analysis(self, keywords: List[str], serp_mode: Optional[str] = None) -> Dict[str, Dict]:
+        """使用 Playwright 浏览器池并发进行真实 SERP 分析，加载失败的关键词退回模拟分析"""
+        pages, stats = fetch_serps(keywords, mode=serp_mode, keep_html=True)
+        print(f"   🌐 页面成功 {stats['ok']} 个, 失败 {stats['failed']} 个（回收页面 {stats['recycled']} 次）| "
+              f"{stats['throughput']:.2f} 页/秒 | p50 {stats['p50']:.1f}s, p95 {stats['p95']:.1f}s")
+        print(f"   📦 每页 {stats['bytes_per_page'] / 1024:.0f} KB, {stats['seconds_per_page']:.2f}s"
+              f"（拦截请求 {stats['blocked']} 个）")
+        
         results = {}
+        archive = get_serp_archive()
+        for keyword, page in pages.items():
+            if page is None:
+                results[keyword] = self._simulate_serp_analysis(keyword)
+                continue
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            
-            for keyword in keywords[:20]:  # 限制数量
-                try:
-                    url = f"https://www.google.com/search?q={keyword.replace(' ', '+')}"
-                    page = browser.new_page()
-                    page.goto(url, timeout=30000)
-                    
-                    # 检测前 3 名域名
-                    domains = []
-                    selectors = page.locator("div.g div.yuRUbf a").first
-                    
-                    for i in range(3):
-                        try:
-                            href = selectors.nth(i).get_attribute("href")
-                            if href:
-                                domain = self._extract_domain(href)
-                                domains.append(domain)
-                        except:
-                            break
-                    
-                    # 判断竞争度
-                    weak_count = sum(1 for d in domains 
-                                    if any(w in d for w in self.config["serp_weak_competitors"]))
-                    giant_count = sum(1 for d in domains 
-                                     if any(g in d for g in self.config["serp_giants"]))
-                    
-                    if weak_count > 0 and giant_count == 0:
-                        competition = "🟢 WEAK"
-                        competition_score = 100
-                        is_drop_attack = True
-                    elif giant_count > 0:
-                        competition = "🔴 GIANT"
-                        competition_score = 30
-                        is_drop_attack = False
-                    else:
-                        competition = "🟡 MEDIUM"
-                        competition_score = 60
-                        is_drop_attack = False
-                    
-                    results[keyword] = {
-                        "competition": competition,
-                        "competition_score": competition_score,
-                        "降维打击": is_drop_attack,
-                        "top_domains": domains
-                    }
-                    
-                    page.close()
-                    time.sleep(random.uniform(1, 2))  # 避免被封
-                    
-                except Exception as e:
-                    results[keyword] = self._simulate_serp_analysis(keyword)
+            links, html = page
+            # 原始页面归档，解析规则改了以后用 serp_archive.py reparse 离线重算
+            archive.put(keyword, html, params={"mode": serp_mode or SERP_BROWSER["mode"]}, source="profit_hunter")
+            results[keyword] = serp_competition(links, self.config["serp_weak_competitors"], self.config["serp_giants"])
         
         return results
     
-    def _extract_domain(self, url: str) -> str:
-        """从 URL 提取域名"""
-        try:
-            from urllib.parse import urlparse
-            return urlparse(url).netloc.replace("www.", "")
-        except:
-            return url
-    
-    def step4_intent_analysis(self, keywords: List[str]) -> List[Dict]:
-        """Step 4: 需求意图评分 + 用户意图深挖"""
+    def step4_intent_analysis(self, keywords: List[str], parallel: int = 1) -> List[Dict]:
+        """Step 4: 需求意图评分 + 用户意图深挖
+        
+        parallel: 工作进程数，大于 1 时关键词分块交给进程池，结果保持输入顺序
+        """
         print("🎯 Step 4: 需求意图分析...")
         
+        if parallel > 1:
+            results = map_records(ProfitHunterUltimate, (self.config,), '_intent_records', keywords, parallel)
+        else:
+            results = self._intent_records(keywords)
+        
+        print(f"   📊 分析了 {len(results)} 个关键词")
+        return results
+    
+    def _intent_records(self, keywords: List[str]) -> List[Dict]:
+        """逐个关键词计算意图评分（纯计算，可在工作进程中执行）"""
         results = []
         
+        profile = self.profile
         for keyword in keywords:
-            keyword_lower = keyword.lower()
-            signals = []
-            intent_score = 70  # 基础分
+            features = self.features.extract(keyword)
             
             # 检测信号词
-            for signal_type, trigger_words in self.config["intent_signals"].items():
-                if any(tw in keyword_lower for tw in trigger_words):
-                    signals.append(signal_type)
-                    if signal_type in ["calculator", "generator", "converter"]:
-                        intent_score += 30
-                    elif signal_type in ["checker", "finder"]:
-                        intent_score += 25
-                    elif signal_type == "comparer":
-                        intent_score += 20
+            signals = [signal_type for signal_type in self.config["intent_signals"]
+                       if features.has(f"ultimate:intent:{signal_type}")]
             
             # 检测痛点
-            pain_score = 0
-            for level, triggers in self.config["pain_triggers"].items():
-                if any(t in keyword_lower for t in triggers):
-                    pain_score += 40 if level == "strong" else 20
-            
-            if pain_score > 0:
-                intent_score += pain_score
+            if profile["pain"].score(features) > 0:
                 signals.append("pain_point")
             
             # 长尾词加分
-            word_count = len(keyword.split())
-            if 2 <= word_count <= 4:
-                intent_score += 15
+            if features.has("len:2-4"):
                 signals.append("long_tail")
             
             # 用户意图深挖
-            user_intent, user_goal, intent_clarity = self._analyze_user_intent(keyword, signals)
+            user_intent, user_goal, intent_clarity = self._analyze_user_intent(keyword, signals, features)
             
             results.append({
                 "keyword": keyword,
                 "signals": ",".join(signals) if signals else "general",
-                "intent_score": min(intent_score, 100),
+                "intent_score": profile["intent"].score(features),
                 "user_intent": user_intent,
                 "user_goal": user_goal,
                 "intent_clarity": intent_clarity
             })
         
-        print(f"   📊 分析了 {len(results)} 个关键词")
         return results
     
-    def _analyze_user_intent(self, keyword: str, signals: List[str]) -> Tuple[str, str, str]:
+    def _analyze_user_intent(self, keyword: str, signals: List[str],
+                             features=None) -> Tuple[str, str, str]:
         """用户意图深挖分析"""
-        keyword_lower = keyword.lower()
+        if features is None:
+            features = self.features.extract(keyword)
         
         # 检测用户真正想做什么
-        detected_intents = []
-        for intent, patterns in self.config["user_intent_patterns"].items():
-            if any(p in keyword_lower for p in patterns):
-                detected_intents.append(intent)
+        detected_intents = [intent for intent in self.config["user_intent_patterns"]
+                            if features.has(f"ultimate:user:{intent}")]
         
         if not detected_intents:
             detected_intents = ["explore"]
@@ -512,13 +567,7 @@ class ProfitHunterUltimate:
             competition_score = serp_info["competition_score"]
             
             # Buildability Score
-            keyword_lower = keyword.lower()
-            if any(t in keyword_lower for t in ["calculator", "generator", "converter"]):
-                build_score = 100
-            elif any(t in keyword_lower for t in ["online", "free"]):
-                build_score = 85
-            else:
-                build_score = 70
+            build_score = self.profile["buildability"].score(self.features.extract(keyword))
             
             # 最终评分（加权）
             final_score = (
@@ -553,9 +602,6 @@ class ProfitHunterUltimate:
             
             final_results.append(result)
         
-        # 按评分排序
-        final_results.sort(key=lambda x: x["final_score"], reverse=True)
-        
         print(f"   📊 评分完成，共 {len(final_results)} 个关键词")
         return final_results
     
@@ -575,6 +621,9 @@ class ProfitHunterUltimate:
         print(f"   🟡 观察: {len(watch)} 个")
         print(f"   ❌ 放弃: {len(drop)} 个")
         
+        # 按评分排名（只在输出时排一次）
+        results = top_k(results, key=lambda x: x["final_score"])
+        
         # 显示 Top 10
         print(f"\n🏆 TOP 10 机会:")
         print("-" * 60)
@@ -586,7 +635,7 @@ class ProfitHunterUltimate:
             print(f"    📊 GPTs 热度: {r['avg_ratio']} | 竞争度: {r['competition']}")
         
         # 保存最终结果
-        self._save_csv("ultimate_final_results.csv", results)
+        self._save_csv("ultimate_final_results.csv", results, stage="final")
         
         print(f"\n💾 结果已保存到 data/ 目录:")
         print(f"   - ultimate_final_results.csv (最终结果)")
@@ -597,16 +646,24 @@ class ProfitHunterUltimate:
         
         return results
     
-    def _save_csv(self, filename: str, data: List[Dict]):
-        """保存 CSV 文件"""
+    def _save_csv(self, filename: str, data: List[Dict], stage: Optional[str] = None):
+        """保存 CSV 文件；在 run() 中时同时写入仓库的 stage 阶段"""
         filepath = self.data_dir / filename
         if data:
             df = pd.DataFrame(data)
             df.to_csv(filepath, index=False, encoding='utf-8')
+            if stage and self.run_id is not None:
+                self.warehouse.write_stage(self.run_id, stage, data)
     
     def run(self, use_trends: bool = False, use_playwright: bool = False, 
-            max_keywords: int = 500, seed_words: str = None):
-        """运行完整流程"""
+            max_keywords: int = 500, seed_words: str = None,
+            query_budget: Optional[int] = None, trends_batch: bool = False,
+            parallel: int = 1, revisit_after: Optional[int] = None, serp_mode: Optional[str] = None):
+        """运行完整流程
+        
+        revisit_after: 超过这么多天的已处理关键词重新分析（None 按 config.SEEN_INDEX）
+        serp_mode: SERP 抓取模式 full / light / http（None 按 config.SERP_BROWSER）
+        """
         print("\n" + "="*60)
         print("💎 Profit Hunter ULTIMATE v3.0")
         print("="*60)
@@ -623,21 +680,26 @@ class ProfitHunterUltimate:
             words = self.load_seed_words()
         
         print(f"📝 使用种子词: {', '.join(words[:5])}...")
-        keywords = self.step0_google_autocomplete(words, max_keywords)
+        self.run_id = self.warehouse.start_run("profit_hunter", {
+            "use_trends": use_trends, "use_playwright": use_playwright, "max_keywords": max_keywords,
+            "seed_words": words, "query_budget": query_budget, "trends_batch": trends_batch,
+        })
+        self.seen = SeenIndex("harvest", revisit_after=revisit_after)
+        keywords = self.step0_google_autocomplete(words, max_keywords, query_budget)
         
         # Step 1: Google Trends（可选）
         trends_data = []
         if use_trends:
-            trends_data = self.step1_google_trends(keywords)
+            trends_data = self.step1_google_trends(keywords, batched=trends_batch)
         
         # Step 2: GPTs 对比
         gpts_comparison = self.step2_gpts_comparison(keywords)
         
         # Step 3: SERP 分析
-        serp_data = self.step3_serp_analysis(keywords, use_playwright)
+        serp_data = self.step3_serp_analysis(keywords, use_playwright, serp_mode)
         
         # Step 4: 意图分析
-        intent_data = self.step4_intent_analysis(keywords)
+        intent_data = self.step4_intent_analysis(keywords, parallel)
         
         # Step 5: 计算最终评分
         results = self.step5_calculate_scores(
@@ -645,7 +707,15 @@ class ProfitHunterUltimate:
         )
         
         # Step 6: 输出结果
-        self.step6_output_results(results)
+        results = self.step6_output_results(results)
+        
+        self.warehouse.finish_run(self.run_id)
+        self.seen.add(r["keyword"] for r in results)
+        self.seen = None
+        new_keywords = self.warehouse.new_since_last_run(self.run_id)
+        print(f"   🆕 首次出现的关键词: {len(new_keywords)} 个（运行 #{self.run_id}，"
+              f"python keyword_warehouse.py new 查看）")
+        self.run_id = None
         
         return results
 
@@ -668,10 +738,20 @@ def main():
                        help="启用 Google Trends 分析")
     parser.add_argument("--playwright", action="store_true",
                        help="启用 Playwright SERP 分析（需要安装 playwright）")
+    parser.add_argument("--serp-mode", choices=["full", "light", "http"], default=None,
+                       help="SERP 抓取模式：full 整页 / light 拦截图片字体等资源 / http 不开浏览器（默认按 config.SERP_BROWSER）")
     parser.add_argument("--max", type=int, default=500,
                        help="最大关键词数量 (默认: 500)")
     parser.add_argument("--seed", type=str, default=None,
                        help="种子词，逗号分隔 (例如: 'ai,ml,python')")
+    parser.add_argument("--query-budget", type=int, default=None,
+                       help="Autocomplete 请求预算，设置后启用前缀树扩展")
+    parser.add_argument("--trends-batch", action="store_true",
+                       help="Trends 批量模式：5 个关键词一个 payload（含锚点词）")
+    parser.add_argument("--parallel", type=int, default=1,
+                       help="意图分析的工作进程数 (默认: 1)")
+    parser.add_argument("--revisit-after", type=int, default=None,
+                       help="超过 N 天的已处理关键词重新分析（默认按 config.SEEN_INDEX，0 为全部重新分析）")
     
     args = parser.parse_args()
     
@@ -683,7 +763,7 @@ def main():
         missing_deps.append("pandas")
     if args.trends and not TrendReq:
         missing_deps.append("pytrends")
-    if args.playwright and not sync_playwright:
+    if args.playwright and not async_playwright and args.serp_mode != "http":
         missing_deps.append("playwright")
     
     if missing_deps:
@@ -699,7 +779,12 @@ def main():
         use_trends=args.trends,
         use_playwright=args.playwright,
         max_keywords=args.max,
-        seed_words=args.seed
+        seed_words=args.seed,
+        trends_batch=args.trends_batch,
+        query_budget=args.query_budget,
+        parallel=args.parallel,
+        revisit_after=args.revisit_after,
+        serp_mode=args.serp_mode
     )
     
     # 返回合适的退出码
@@ -12,6 +12,7 @@
 
 用法：
     python3 profit_hunter_deep_validation.py --input data/ultimate_final_results.csv --max 20
+    python3 profit_hunter_deep_validation.py --input ultimate_final_results --max 20   # Parquet 表（最新分区）
 """
 
 import os
@@ -26,6 +27,12 @@ from urllib.parse import quote
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_utils import load_table, table_dir
+from domain_classifier import get_domain_classifier, hostname
+from seen_index import SeenIndex
+from serp_archive import get_serp_archive
+from serp_parser import parse_serp
+
 # ==================== 配置区 ====================
 
 DATA_DIR = "data"
@@ -154,6 +161,35 @@ def search_reddit_pain_points(keyword: str) -> Dict:
 
 # ==================== Google SERP 需求分析 ====================
 
+def serp_signals(html: str) -> Dict:
+    """从结果页 HTML 计算工具/论坛结果数、商业意图和市场空白（serp_archive.py reparse 也用它）
+    
+    一次解析出自然结果链接、广告块和 SERP 特性，计数只看自然结果的链接
+    """
+    page = parse_serp(html)
+    classifier = get_domain_classifier()
+    categories = [classifier.category(url) for url in page.organic]
+    
+    # 检测工具类网站：分类表里的工具站，或链接里带工具字样
+    tool_words = ["calculator", "converter", "generator", "tool", "online", "free"]
+    tool_count = sum(1 for url, category in zip(page.organic, categories)
+                     if category == "tool" or any(word in url.lower() for word in tool_words))
+    
+    # 检测论坛类网站：分类表里的论坛，或主机名带 forum
+    forum_count = sum(1 for url, category in zip(page.organic, categories)
+                      if category == "forum" or "forum" in hostname(url))
+    
+    return {
+        "tool_results_count": tool_count,
+        "forum_results_count": forum_count,
+        # 商业意图（广告数量）
+        "commercial_intent": min(100, len(page.ads) * 10),
+        # 市场空白判断：论坛结果多 + 工具结果少 = 有需求但缺工具
+        "has_gap": forum_count >= 3 and tool_count < 5,
+        "top_competitors": [classifier.registrable_domain(url) for url in page.organic[:3]],
+        "serp_features": page.features,
+    }
+
 def analyze_google_serp(keyword: str) -> Dict:
     """
     分析 Google 搜索结果，判断需求类型和竞争情况
@@ -187,23 +223,9 @@ def analyze_google_serp(keyword: str) -> Dict:
         response = requests.get(search_url, params=params, headers=headers, timeout=15)
         html = response.text
         
-        # 检测工具类网站
-        tool_domains = ["calculator", "converter", "generator", "tool", "online", "free"]
-        for domain in tool_domains:
-            result["tool_results_count"] += html.lower().count(domain)
-        
-        # 检测论坛类网站
-        forum_domains = ["reddit.com", "quora.com", "stackoverflow.com", "forum"]
-        for domain in forum_domains:
-            result["forum_results_count"] += html.lower().count(domain)
-        
-        # 商业意图（广告数量）
-        ad_count = html.count('data-text-ad') + html.count('ads-fr')
-        result["commercial_intent"] = min(100, ad_count * 10)
-        
-        # 市场空白判断：论坛结果多 + 工具结果少 = 有需求但缺工具
-        if result["forum_results_count"] >= 3 and result["tool_results_count"] < 5:
-            result["has_gap"] = True
+        # 原始页面归档，解析规则改了以后用 serp_archive.py reparse 离线重算
+        get_serp_archive().put(keyword, html, params={"num": params["num"]}, source="deep_validation")
+        result.update(serp_signals(html))
         
         log_execution(f"✅ SERP: {result['tool_results_count']}个工具, "
                      f"{result['forum_results_count']}个论坛, "
@@ -292,17 +314,27 @@ def deep_validate_keyword(keyword: str) -> Dict:
 
 # ==================== 批量验证 ====================
 
-def batch_validate_keywords(keywords: List[str], max_keywords: int = 20) -> pd.DataFrame:
+def batch_validate_keywords(keywords: List[str], max_keywords: int = 20,
+                            seen: Optional[SeenIndex] = None) -> pd.DataFrame:
     """
     批量验证关键词列表
     
     参数：
     - keywords: 待验证的关键词列表
     - max_keywords: 最大验证数量（控制运行时间）
+    - seen: 已处理关键词索引，设置后跳过以前验证过的词，每验证完一个就记录
     
     返回：
-    DataFrame with validation results
+    DataFrame with validation results（没有需要验证的词时为空）
     """
+    if seen is not None:
+        fresh = seen.filter_new(keywords)
+        log_execution(f"⏭️ 跳过已验证的关键词 {len(keywords) - len(fresh)} 个")
+        keywords = fresh
+    if not keywords or max_keywords <= 0:
+        log_execution("⚠️ 没有需要验证的关键词")
+        return pd.DataFrame()
+    
     log_execution(f"\n{'='*60}")
     log_execution(f"🚀 开始批量验证 {min(len(keywords), max_keywords)} 个关键词")
     log_execution(f"{'='*60}\n")
@@ -315,6 +347,8 @@ def batch_validate_keywords(keywords: List[str], max_keywords: int = 20) -> pd.D
         
         validation_result = deep_validate_keyword(keyword)
         results.append(validation_result)
+        if seen is not None:
+            seen.add([keyword])
         
         # 每验证5个词，休息10秒
         if idx % 5 == 0 and idx < len(keywords_to_validate):
@@ -558,20 +592,24 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Profit Hunter Deep Validation')
-    parser.add_argument('--input', type=str, required=True, help='输入 CSV 文件路径（包含 keyword 列）')
+    parser.add_argument('--input', type=str, required=True,
+                        help='输入 CSV / Parquet 文件路径或 data/tables 下的表名（包含 keyword 列）')
     parser.add_argument('--max', type=int, default=20, help='最大验证数量')
+    parser.add_argument('--revisit-after', type=int, default=None,
+                        help='超过 N 天的已验证关键词重新验证（默认按 config.SEEN_INDEX，0 为全部重新验证）')
     
     args = parser.parse_args()
     
     ensure_dirs()
     
-    # 读取输入文件
-    if not os.path.exists(args.input):
+    # 读取输入文件（只读 keyword 列）
+    if not os.path.exists(args.input) and not table_dir(args.input).exists():
         log_execution(f"❌ 输入文件不存在: {args.input}", "ERROR")
         return
     
-    df_input = pd.read_csv(args.input, encoding='utf-8-sig')
-    if 'keyword' not in df_input.columns:
+    try:
+        df_input = load_table(args.input, columns=['keyword'])
+    except (KeyError, ValueError):
         log_execution(f"❌ 输入文件必须包含 'keyword' 列", "ERROR")
         return
     
@@ -579,7 +617,10 @@ def main():
     log_execution(f"📂 从 {args.input} 读取了 {len(keywords)} 个关键词")
     
     # 批量验证
-    df_results = batch_validate_keywords(keywords, max_keywords=args.max)
+    df_results = batch_validate_keywords(keywords, max_keywords=args.max,
+                                         seen=SeenIndex("validate", revisit_after=args.revisit_after))
+    if df_results.empty:
+        return
     
     # 生成 HTML 报告
     generate_deep_validation_report(df_results)
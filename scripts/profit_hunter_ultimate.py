@@ -5,22 +5,33 @@ Profit Hunter ULTIMATE V3 - 终极版蓝海关键词猎取系统
 """
 
 import argparse
+import asyncio
 import logging
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
+import pandas as pd
+
 # 添加当前目录到 path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import *
-from data_utils import save_csv, load_keywords
+from data_utils import save_csv, save_table, load_keywords, CSVStreamWriter, TableStreamWriter
 from alphabet_soup import GoogleSuggestHarvester
 from trends_analyzer import TrendsAnalyzer
+from trends_store import get_trends_store
 from gpts_analyzer import GPTsAnalyzer
 from serp_analyzer import SERPAnalyzer
 from deep_search import DeepSearchAnalyzer  # 新增
-from scorer import KeywordScorer
+from keyword_warehouse import get_keyword_warehouse
+from seen_index import SeenIndex
+from rescore import save_components
+from scorer import COMPONENT_COLUMNS, KeywordScorer, frame_records
+from top_k import top_k
+from stream_pipeline import StreamPipeline
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +39,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 流式模式每次评分的最大关键词数（有多少已完成的取多少，不为凑满一批而等待）
+STREAM_SCORE_BATCH = 64
+
 
 def run_pipeline(args):
     """执行完整的关键词挖掘流程 - V3 版"""
@@ -38,15 +52,28 @@ def run_pipeline(args):
     
     all_keywords = set()
     
+    # 各步骤结果同时写入关键词仓库，保留每次运行的历史
+    warehouse = get_keyword_warehouse()
+    run_id = warehouse.start_run("ultimate", vars(args))
+    
+    # 以前运行处理过的关键词不再重复分析
+    seen = SeenIndex("harvest", revisit_after=args.revisit_after)
+    
     # Step 0: Alphabet Soup 挖词
     logger.info("📊 Step 0: Alphabet Soup 海量挖词...")
-    harvester = GoogleSuggestHarvester()
+    harvester = GoogleSuggestHarvester(seen=seen)
     seed_words = load_keywords()
     logger.info(f"   种子词数量: {len(seed_words)}")
     
-    suggest_results = harvester.harvest(seed_words, max_per_word=args.max)
+    suggest_results = harvester.harvest(seed_words, max_per_word=args.max,
+                                        query_budget=args.query_budget)
     all_keywords.update(suggest_results)
-    logger.info(f"   → 获取 {len(all_keywords)} 个候选关键词")
+    logger.info(f"   → 获取 {len(all_keywords)} 个候选关键词（跳过已处理 {harvester.stats['skipped_seen']} 个）")
+    logger.info(f"   → 请求 {harvester.stats['requests']} 次, "
+                f"每次请求 {harvester.stats['yield_per_request']:.1f} 个关键词")
+    if 'cache' in harvester.stats:
+        logger.info(f"   → 缓存命中 {harvester.stats['cache']['hits']} 次, "
+                    f"未命中 {harvester.stats['cache']['misses']} 次")
     
     # V3: 全部关键词，不采样
     keywords = list(all_keywords)
@@ -54,21 +81,24 @@ def run_pipeline(args):
     
     # 预处理：去重和清理
     keywords = list(set(keywords))
+    warehouse.write_stage(run_id, "suggest", [{"keyword": keyword} for keyword in keywords])
     
     # Step 1: Google Trends 分析
     trends_data = {}
     if args.trends:
         logger.info("📈 Step 1: Google Trends 飙升词分析...")
-        analyzer = TrendsAnalyzer()
+        analyzer = TrendsAnalyzer(batched=args.trends_batch, store=get_trends_store())
         trends_data = analyzer.analyze(keywords)
         save_csv(list(trends_data.values()), "step1_trends_deep.csv")
-        logger.info(f"   → 分析 {len(trends_data)} 个趋势数据")
+        warehouse.write_stage(run_id, "trends", trends_data.values())
+        logger.info(f"   → 分析 {len(trends_data)} 个趋势数据 ({analyzer.payloads} 个 payload)")
     
     # Step 2: GPTs 对比
     logger.info("🤖 Step 2: GPTs 基准对比...")
     gpts_analyzer = GPTsAnalyzer()
     gpts_results = gpts_analyzer.analyze(keywords)
     save_csv(list(gpts_results.values()), "step2_gpts_comparison.csv")
+    warehouse.write_stage(run_id, "gpts", gpts_results.values())
     logger.info(f"   → 对比 {len(gpts_results)} 个关键词")
     
     # 计算 avg_ratio
@@ -85,6 +115,7 @@ def run_pipeline(args):
         serp_analyzer = SERPAnalyzer()
         serp_data = serp_analyzer.analyze(keywords[:args.max])
         save_csv(list(serp_data.values()), "step3_serp_analysis.csv")
+        warehouse.write_stage(run_id, "serp", serp_data.values())
         logger.info(f"   → 分析 {len(serp_data)} 个 SERP")
         
         # 统计降维打击机会
@@ -98,6 +129,7 @@ def run_pipeline(args):
         deep_analyzer = DeepSearchAnalyzer()
         deep_data = deep_analyzer.analyze_batch(keywords[:args.max])
         save_csv(list(deep_data.values()), "step3_5_deep_search.csv")
+        warehouse.write_stage(run_id, "deep", deep_data.values())
         logger.info(f"   → 深度分析 {len(deep_data)} 个关键词")
         
         # 统计高需求关键词
@@ -107,7 +139,11 @@ def run_pipeline(args):
     # Step 4: 综合评分 + 用户意图深挖
     logger.info("🎯 Step 4: 综合评分 + 用户意图深挖...")
     scorer = KeywordScorer(trends_data, gpts_results, serp_data, deep_data)
-    scored_keywords = scorer.score(keywords)
+    scored_frame = scorer.score_frame(scorer.to_frame(keywords), parallel=args.parallel)
+    scored_keywords = frame_records(scored_frame)
+    
+    # 保存分项得分，调整权重/阈值后可用 rescore.py 直接重算
+    save_components(scored_frame)
     
     # Step 5: 输出决策结果
     logger.info("📋 Step 5: 生成最终报告...")
@@ -115,6 +151,11 @@ def run_pipeline(args):
     
     # 保存最终结果（V3: 全部关键词）
     save_csv(final_results, "ultimate_final_results.csv")
+    save_table(final_results, "ultimate_final_results")
+    warehouse.write_stage(run_id, "final", final_results)
+    warehouse.finish_run(run_id)
+    new_keywords = warehouse.new_since_last_run(run_id)
+    seen.add(r["keyword"] for r in final_results)
     
     # 统计
     build_now = [k for k in final_results if 'BUILD NOW' in k.get('decision', '')]
@@ -127,6 +168,7 @@ def run_pipeline(args):
     logger.info(f"   总关键词: {len(final_results)}")
     logger.info(f"   🔴 BUILD NOW: {len(build_now)} 个")
     logger.info(f"   🟡 WATCH: {len(watch)} 个")
+    logger.info(f"   🆕 首次出现: {len(new_keywords)} 个（运行 #{run_id}）")
     logger.info(f"   ⏱️ 耗时: {elapsed:.1f} 秒")
     logger.info("=" * 60)
     
@@ -134,7 +176,7 @@ def run_pipeline(args):
     if build_now:
         logger.info("\n🔥 Top 10 BUILD NOW 机会（含用户意图）：")
         logger.info("-" * 80)
-        for i, kw in enumerate(sorted(build_now, key=lambda x: x.get('final_score', 0), reverse=True)[:10], 1):
+        for i, kw in enumerate(top_k(build_now, 10, key=lambda x: x.get('final_score', 0)), 1):
             降维 = "💎" if kw.get('降维打击') else ""
             avg_ratio = kw.get('avg_ratio', 0)
             user_intent = kw.get('user_intent', 'general')
@@ -159,14 +201,146 @@ def run_pipeline(args):
     return final_results
 
 
+def run_stream_pipeline(args):
+    """流式执行：挖到的关键词立即流经 GPTs / SERP / 评分，各阶段重叠进行"""
+    
+    start = time.time()
+    logger.info("🚀 Profit Hunter ULTIMATE V3 启动（流式模式）")
+    logger.info("=" * 60)
+    
+    pipeline = StreamPipeline(maxsize=args.queue_size)
+    warehouse = get_keyword_warehouse()
+    run_id = warehouse.start_run("ultimate-stream", vars(args))
+    
+    if args.trends:
+        trends_analyzer = TrendsAnalyzer(store=get_trends_store())
+        pipeline.add_stage("trends", lambda kw: trends_analyzer.analyze([kw])[kw],
+                           filename="step1_trends_deep.csv")
+    
+    gpts_analyzer = GPTsAnalyzer()
+    pipeline.add_stage("gpts", lambda kw: gpts_analyzer.analyze([kw])[kw],
+                       filename="step2_gpts_comparison.csv")
+    
+    if args.playwright:
+        serp_analyzer = SERPAnalyzer()
+        pipeline.add_stage("serp", lambda kw: serp_analyzer.analyze([kw])[kw],
+                           filename="step3_serp_analysis.csv", limit=args.max)
+    
+    if args.deep_search:
+        deep_analyzer = DeepSearchAnalyzer()
+        pipeline.add_stage("deep", lambda kw: asyncio.run(deep_analyzer.analyze_batch([kw]))[kw],
+                           filename="step3_5_deep_search.csv", limit=args.max)
+    
+    # Step 0: 挖词线程作为生产者，下游满了会阻塞住挖词；以前运行处理过的关键词不再送入管道
+    seen = SeenIndex("harvest", revisit_after=args.revisit_after)
+    harvester = GoogleSuggestHarvester(seen=seen)
+    seed_words = load_keywords()
+    logger.info(f"📊 Alphabet Soup 流式挖词，种子词数量: {len(seed_words)}")
+    
+    def produce():
+        try:
+            harvester.harvest(seed_words, max_per_word=args.max,
+                              query_budget=args.query_budget, on_keywords=pipeline.feed)
+        finally:
+            pipeline.close()
+    
+    producer = threading.Thread(target=produce, name="harvester", daemon=True)
+    pipeline.start()
+    producer.start()
+    
+    # 评分在主线程消费管道输出：按小批量列式评分，结果和各阶段数据逐批落盘、写入仓库，不在内存中累积
+    scorer = KeywordScorer({}, {}, {}, {})
+    writer = CSVStreamWriter("ultimate_final_results.csv")
+    table_writer = TableStreamWriter("ultimate_final_results")
+    total = watch = 0
+    build_now = []
+    # 分项得分列（数值为主、体积小）按批收集，结束时与批量模式一样并入 score_components.csv
+    components = []
+    first_build_now = None
+    
+    try:
+        for batch in pipeline.batches(STREAM_SCORE_BATCH):
+            keywords = [keyword for keyword, _ in batch]
+            # 评分器只保留当前批次的分析数据
+            scorer.trends = {keyword: record.get("trends", {}) for keyword, record in batch}
+            scorer.gpts = {keyword: record.get("gpts", {}) for keyword, record in batch}
+            scorer.serp = {keyword: record.get("serp", {}) for keyword, record in batch}
+            scorer.deep = {keyword: record.get("deep", {}) for keyword, record in batch}
+            
+            frame = scorer.score_frame(scorer.to_frame(keywords))
+            results = frame_records(frame)
+            components.append(frame[COMPONENT_COLUMNS + ['final_score', 'decision']])
+            for result, decision in zip(results, frame['decision'].tolist()):
+                result['decision'] = str(decision)
+                writer.write(result)
+                table_writer.write(result)
+                if 'BUILD NOW' in result['decision']:
+                    build_now.append(result)
+                    if first_build_now is None:
+                        first_build_now = time.time() - start
+                        logger.info(f"🔥 首个 BUILD NOW: {result['keyword']} ({result['final_score']}分) "
+                                    f"@ {first_build_now:.1f} 秒")
+                elif 'WATCH' in result['decision']:
+                    watch += 1
+            total += len(results)
+            
+            warehouse.write_stage(run_id, "suggest", [{"keyword": keyword} for keyword in keywords])
+            stage_rows = {}
+            for _, record in batch:
+                for name, data in record.items():
+                    if data:
+                        stage_rows.setdefault(name, []).append(data)
+            for name, rows in stage_rows.items():
+                warehouse.write_stage(run_id, name, rows)
+            warehouse.write_stage(run_id, "final", results)
+            seen.add(keywords)
+    finally:
+        writer.close()
+        table_writer.close()
+    producer.join()
+    
+    if components:
+        save_components(pd.concat(components, ignore_index=True))
+    warehouse.finish_run(run_id)
+    new_keywords = warehouse.new_since_last_run(run_id)
+    
+    build_now.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+    
+    logger.info("=" * 60)
+    logger.info("✅ V3 流式分析完成！")
+    logger.info(f"   总关键词: {total}")
+    logger.info(f"   🔴 BUILD NOW: {len(build_now)} 个")
+    logger.info(f"   🟡 WATCH: {watch} 个")
+    logger.info(f"   🆕 首次出现: {len(new_keywords)} 个（运行 #{run_id}）")
+    logger.info(f"   ⏭️ 跳过已处理: {harvester.stats.get('skipped_seen', 0)} 个")
+    if first_build_now is not None:
+        logger.info(f"   ⚡ 首个 BUILD NOW 用时: {first_build_now:.1f} 秒")
+    logger.info(f"   ⏱️ 耗时: {time.time() - start:.1f} 秒")
+    for name, stats in pipeline.stage_stats().items():
+        logger.info(f"   {name}: {stats['processed']} 个, 平均 {stats['avg_seconds']:.2f} 秒/个")
+    logger.info("=" * 60)
+    
+    # 全部结果已写入 ultimate_final_results.csv / 表，这里只返回 BUILD NOW（按评分降序）
+    return build_now
+
+
 def main():
     parser = argparse.ArgumentParser(description='Profit Hunter ULTIMATE V3 - 蓝海关键词猎取')
     parser.add_argument('--trends', action='store_true', help='启用 Google Trends 分析')
     parser.add_argument('--playwright', action='store_true', help='启用 Playwright SERP 分析')
     parser.add_argument('--deep-search', action='store_true', help='启用深度社区搜索')
     parser.add_argument('--max', type=int, default=50, help='种子词最大建议数 (默认50)')
+    parser.add_argument('--query-budget', type=int, default=None,
+                        help='Alphabet Soup 请求预算，设置后启用前缀树扩展')
+    parser.add_argument('--trends-batch', action='store_true',
+                        help='Trends 批量模式：5 个关键词一个 payload（含锚点词）')
     parser.add_argument('--trends-only', action='store_true', help='仅运行 Trends 分析')
     parser.add_argument('--quiet', action='store_true', help='静默模式')
+    parser.add_argument('--stream', action='store_true', help='流式模式：挖词与各分析阶段重叠执行')
+    parser.add_argument('--queue-size', type=int, default=100, help='流式模式各阶段队列容量 (默认100)')
+    parser.add_argument('--parallel', type=int, default=1, help='评分的工作进程数 (默认1，单进程)')
+    parser.add_argument('--revisit-after', type=int, default=None,
+                        help='超过 N 天的已处理关键词重新分析（默认按 config.SEEN_INDEX，0 为全部重新分析）')
     
     args = parser.parse_args()
     
@@ -181,7 +355,7 @@ def main():
         logger.info("💡 提示: 添加 --deep-search 参数可启用深度社区搜索（Reddit/论坛）")
     
     try:
-        results = run_pipeline(args)
+        results = run_stream_pipeline(args) if args.stream else run_pipeline(args)
     except KeyboardInterrupt:
         logger.info("\n⏹️ 用户中断")
         sys.exit(0)
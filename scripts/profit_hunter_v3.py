@@ -21,6 +21,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import re
 
 # ============ 依赖检查 ============
@@ -34,6 +35,12 @@ except ImportError as e:
     print("💡 安装: pip install requests pandas pytrends beautifulsoup4 schedule lxml")
     sys.exit(1)
 
+from keyword_features import PROFILES, extract
+from seen_index import SeenIndex
+from suggest_cache import get_suggest_cache
+from throttle import RateLimiter
+from trends_store import get_trends_store, rising_records
+
 # ============ 配置 ============
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
@@ -72,6 +79,17 @@ PLATFORMS = {
     }
 }
 
+# 各平台限频（每秒请求数），并发挖词时按平台独立控制
+PLATFORM_RATE_LIMITS = {
+    "google": 5.0,
+    "youtube": 3.0,
+    "amazon": 2.0,
+    "reddit": 1.0,
+    "tiktok": 1.0,
+}
+
+RATE_LIMITER = RateLimiter(rates=PLATFORM_RATE_LIMITS)
+
 # 评分阈值（优化后更容易推荐）
 THRESHOLDS = {
     "BUILD_NOW": 60,      # 立即做阈值（降低）
@@ -93,43 +111,7 @@ SERP_GIANTS = [
     "wikipedia.org", "facebook.com", "apple.com"
 ]
 
-# 痛点信号词库（增强版）
-PAIN_SIGNALS = {
-    "urgent": [  # 紧急痛点
-        "struggling with", "how to fix", "error", "not working",
-        "cannot", "doesn't work", "failed", "help", "issue",
-        "求助", "怎么办", "急", "救命", "崩溃"
-    ],
-    "frustration": [  # 挫败感
-        "tired of", "sick of", "fed up", "annoying", "frustrating",
-        "painful", "difficult", "confusing", "complicated",
-        "麻烦", "蛋疼", "烦死了"
-    ],
-    "desire": [  # 强烈需求
-        "want", "need", "looking for", "searching for", "wish",
-        "应该有一个", "要是能", "太需要"
-    ],
-    "comparison": [  # 对比需求
-        "vs", "versus", "alternative", "better than", "compare",
-        "difference", "pros and cons", "哪个好"
-    ]
-}
-
-# 商业价值信号
-COMMERCIAL_SIGNALS = {
-    "high_cpc": [  # 高 CPC 关键词
-        "insurance", "lawyer", "attorney", "loan", "mortgage",
-        "crypto", "trading", "investment", "software", "course"
-    ],
-    "ecommerce": [  # 电商需求
-        "buy", "price", "discount", "sale", "cheap", "best",
-        "评测", "推荐", "购买", "价格"
-    ],
-    "saas": [  # SaaS 需求
-        "tool", "software", "platform", "solution", "service",
-        "工具", "软件", "平台", "服务"
-    ]
-}
+# 痛点信号 PAIN_SIGNALS、商业价值信号 COMMERCIAL_SIGNALS 登记在 keyword_features.py（super 档案）
 
 # ============ 多平台挖掘 ============
 
@@ -137,15 +119,22 @@ def google_autocomplete(keyword):
     """Google Autocomplete 挖词"""
     suggestions = []
     letters = 'abcdefghijklmnopqrstuvwxyz'
+    cache = get_suggest_cache()
     
     for letter in letters[:10]:  # 限制数量
+        query = f"{keyword} {letter}"
+        cached = cache.get(query)
+        if cached is not None:
+            suggestions.extend([s for s in cached if len(s.split()) >= 2])
+            continue
         try:
+            RATE_LIMITER.wait("google")
             url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={keyword}%20{letter}"
             resp = requests.get(url, timeout=10)
             if resp.status_code == 200:
                 data = resp.json()
+                cache.put(query, data[1])
                 suggestions.extend([s for s in data[1] if len(s.split()) >= 2])
-            time.sleep(0.3)
         except:
             continue
     
@@ -154,42 +143,52 @@ def google_autocomplete(keyword):
 def google_trends_rising(keywords):
     """Google Trends 飙升词 + 二级深挖"""
     pytrends = TrendReq(hl='en-US', tz=360)
+    store = get_trends_store()
     rising_data = []
     
     for i, keyword in enumerate(keywords[:8]):
-        try:
-            pytrends.build_payload([keyword], timeframe='now 7-d')
-            related = pytrends.related_queries()
-            
-            if keyword in related and related[keyword]:
-                rising = related[keyword].get('rising')
-                if rising is not None and not rising.empty:
-                    for _, row in rising.head(3).iterrows():
-                        growth = row['value'] if isinstance(row['value'], (int, float)) else 0
-                        if growth > 0:
-                            rising_data.append({
-                                "keyword": row['query'],
-                                "growth": growth,
-                                "source": keyword,
-                                "platform": "google_trends"
-                            })
-            
-            time.sleep(2)
-        except:
-            continue
+        # 时序库中未过期的飙升词直接使用
+        record = store.get(keyword, 'now 7-d')
+        if record and record['rising_fresh']:
+            rising = record['rising']
+        else:
+            try:
+                pytrends.build_payload([keyword], timeframe='now 7-d')
+                rising = rising_records(pytrends.related_queries(), keyword)
+                store.put(keyword, 'now 7-d', rising=rising)
+                time.sleep(2)
+            except:
+                continue
+        
+        for row in rising[:3]:
+            growth = row['value'] if isinstance(row['value'], (int, float)) else 0
+            if growth > 0:
+                rising_data.append({
+                    "keyword": row['query'],
+                    "growth": growth,
+                    "source": keyword,
+                    "platform": "google_trends"
+                })
     
     return rising_data
 
 def youtube_suggestions(keyword):
     """YouTube 挖词"""
     suggestions = []
+    cache = get_suggest_cache()
+    
+    cached = cache.get(keyword, ds="yt")
+    if cached is not None:
+        return [s for s in cached if s]
     
     try:
         # YouTube Suggest API
+        RATE_LIMITER.wait("youtube")
         url = f"https://suggestqueries.google.com/complete/search?client=firefox&ds=yt&q={keyword}"
         resp = requests.get(url, timeout=10)
         if resp.status_code == 200:
             data = resp.json()
+            cache.put(keyword, data[1], ds="yt")
             suggestions = [s for s in data[1] if s]
     except:
         pass
@@ -201,6 +200,7 @@ def amazon_search_terms(keyword):
     terms = []
     
     try:
+        RATE_LIMITER.wait("amazon")
         url = f"https://completion.amazon.com/api/2017/suggestion?l=1&prefix={keyword}"
         resp = requests.get(url, timeout=10, headers={
             "User-Agent": "Mozilla/5.0"
@@ -219,6 +219,7 @@ def reddit_search(keyword):
     posts = []
     
     try:
+        RATE_LIMITER.wait("reddit")
         url = f"https://www.reddit.com/search.json?q={keyword}&sort=relevance&limit=10"
         resp = requests.get(url, timeout=10, headers={
             "User-Agent": "Mozilla/5.0"
@@ -239,6 +240,7 @@ def tiktok_hashtags(keyword):
     tags = []
     
     try:
+        RATE_LIMITER.wait("tiktok")
         url = f"https://www.tiktok.com/discover/{keyword}"
         resp = requests.get(url, timeout=10)
         if resp.status_code == 200:
@@ -265,63 +267,67 @@ def xiaohongshu_search(keyword):
     
     return notes
 
+# (平台, 挖掘函数, 结果是否作为关键词)；Reddit 返回的是帖子标题，只记录不入词库
+PLATFORM_FETCHERS = [
+    ("google", google_autocomplete, True),
+    ("youtube", youtube_suggestions, True),
+    ("amazon", amazon_search_terms, True),
+    ("reddit", reddit_search, False),
+    ("tiktok", tiktok_hashtags, True),
+]
+
+def _timed_fetch(fetcher, word):
+    """执行一次平台挖掘，返回 (结果, 耗时)"""
+    start = time.time()
+    items = fetcher(word)
+    return items, time.time() - start
+
+def multi_platform_mining(seed_words, workers=8):
+    """多平台挖词：workers > 1 时种子词 × 平台并发执行
+    
+    结果按 种子词 → 平台 的顺序合并，与串行执行完全一致。
+    返回 (all_keywords, platform_data, platform_stats)
+    """
+    all_keywords = set()
+    platform_data = defaultdict(list)
+    platform_stats = {name: {"calls": 0, "seconds": 0.0, "items": 0} for name, _, _ in PLATFORM_FETCHERS}
+    
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                [executor.submit(_timed_fetch, fetcher, word) for _, fetcher, _ in PLATFORM_FETCHERS]
+                for word in seed_words
+            ]
+            results = [[f.result() for f in row] for row in futures]
+    else:
+        results = []
+        for word in seed_words:
+            print(f"   挖掘: {word}")
+            results.append([_timed_fetch(fetcher, word) for _, fetcher, _ in PLATFORM_FETCHERS])
+            time.sleep(0.5)
+    
+    for row in results:
+        for (name, _, is_keyword), (items, seconds) in zip(PLATFORM_FETCHERS, row):
+            if is_keyword:
+                all_keywords.update(items)
+            platform_data[name].extend(items)
+            
+            stats = platform_stats[name]
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["items"] += len(items)
+    
+    return all_keywords, platform_data, platform_stats
+
 # ============ 需求分析 ============
 
-def analyze_pain_points(text):
-    """分析文本中的痛点强度"""
-    text_lower = text.lower()
-    score = 50  # 基础分
-    
-    # 紧急痛点
-    for signal in PAIN_SIGNALS["urgent"]:
-        if signal in text_lower:
-            score += 30
-            break
-    
-    # 挫败感
-    for signal in PAIN_SIGNALS["frustration"]:
-        if signal in text_lower:
-            score += 25
-            break
-    
-    # 强烈需求
-    for signal in PAIN_SIGNALS["desire"]:
-        if signal in text_lower:
-            score += 20
-            break
-    
-    # 对比需求
-    for signal in PAIN_SIGNALS["comparison"]:
-        if signal in text_lower:
-            score += 15
-            break
-    
-    return min(score, 100)
-
-def analyze_commercial_value(keyword):
-    """分析商业价值"""
-    keyword_lower = keyword.lower()
-    score = 50  # 基础分
-    
-    # 高 CPC
-    for signal in COMMERCIAL_SIGNALS["high_cpc"]:
-        if signal in keyword_lower:
-            score += 25
-            break
-    
-    # 电商需求
-    for signal in COMMERCIAL_SIGNALS["ecommerce"]:
-        if signal in keyword_lower:
-            score += 20
-            break
-    
-    # SaaS
-    for signal in COMMERCIAL_SIGNALS["saas"]:
-        if signal in keyword_lower:
-            score += 15
-            break
-    
-    return min(score, 100)
+def analyze_pain_points(text, features=None):
+    """分析文本中的痛点强度：紧急 +30 / 挫败感 +25 / 强烈需求 +20 / 对比 +15"""
+    return PROFILES["super"]["pain"].score(features or extract(text))
+    
+def analyze_commercial_value(keyword, features=None):
+    """分析商业价值：高 CPC +25 / 电商 +20 / SaaS +15"""
+    return PROFILES["super"]["commercial"].score(features or extract(keyword))
 
 def analyze_trend_direction(keywords_data):
     """分析趋势方向"""
@@ -391,8 +397,11 @@ def gpts_market_analysis(keyword):
 
 # ============ 智能评分 ============
 
-def calculate_super_score(keyword, platform_data, trend_data, serp_data, gpts_data, pain_score, commercial_score):
+def calculate_super_score(keyword, platform_data, trend_data, serp_data, gpts_data, pain_score, commercial_score,
+                          features=None):
     """计算超级评分"""
+    if features is None:
+        features = extract(keyword)
     
     # 各维度得分
     trend_score = calculate_trend_direction(trend_data)[0] if trend_data else 50
@@ -412,22 +421,10 @@ def calculate_super_score(keyword, platform_data, trend_data, serp_data, gpts_da
         gpts_score = 50
     
     # 可实现性
-    keyword_lower = keyword.lower()
-    if any(t in keyword_lower for t in ['calculator', 'generator', 'converter', 'tool']):
-        build_score = 100
-    elif any(t in keyword_lower for t in ['online', 'free']):
-        build_score = 85
-    else:
-        build_score = 70
+    build_score = PROFILES["super"]["buildability"].score(features)
     
     # 长度分数（长尾更精准）
-    word_count = len(keyword.split())
-    if 2 <= word_count <= 4:
-        length_score = 90
-    elif word_count == 1:
-        length_score = 60
-    else:
-        length_score = 75
+    length_score = PROFILES["super"]["length"].score(features)
     
     # 最终评分（优化权重）
     final_score = (
@@ -457,51 +454,38 @@ def make_decision(score):
 
 # ============ 主程序 ============
 
-def run_super_hunter(seed_words, max_keywords=50):
-    """运行超级需求挖掘"""
+def run_super_hunter(seed_words, max_keywords=50, workers=8, revisit_after=None):
+    """运行超级需求挖掘
+    
+    revisit_after: 超过这么多天的已处理关键词重新分析（None 按 config.SEEN_INDEX）
+    """
     print("🚀" + "="*60)
     print("💎 Profit Hunter ULTIMATE V3.0 - 超级需求挖掘引擎")
     print("="*60)
     
-    all_keywords = set()
-    platform_data = defaultdict(list)
-    
     # Step 1: 多平台挖词
-    print("\n📊 Step 1: 多平台关键词挖掘...")
+    print(f"\n📊 Step 1: 多平台关键词挖掘（并发 {workers}）...")
     
-    for word in seed_words:
-        print(f"   挖掘: {word}")
-        
-        # Google
-        google_kws = google_autocomplete(word)
-        all_keywords.update(google_kws)
-        platform_data["google"].extend(google_kws)
-        
-        # YouTube
-        yt_kws = youtube_suggestions(word)
-        all_keywords.update(yt_kws)
-        platform_data["youtube"].extend(yt_kws)
-        
-        # Amazon
-        amz_kws = amazon_search_terms(word)
-        all_keywords.update(amz_kws)
-        platform_data["amazon"].extend(amz_kws)
-        
-        # Reddit
-        reddit_posts = reddit_search(word)
-        platform_data["reddit"].extend(reddit_posts)
-        
-        # TikTok
-        tt_tags = tiktok_hashtags(word)
-        all_keywords.update(tt_tags)
-        platform_data["tiktok"].extend(tt_tags)
-        
-        time.sleep(0.5)
+    step_start = time.time()
+    all_keywords, platform_data, platform_stats = multi_platform_mining(seed_words, workers=workers)
+    
+    for name, stats in platform_stats.items():
+        avg = stats["seconds"] / stats["calls"] if stats["calls"] else 0
+        print(f"   {PLATFORMS[name]['name']}: 平均 {avg:.2f}s/次, 产出 {stats['items']} 条")
+    
+    print(f"   ✅ 多平台挖掘完成: {len(all_keywords)} 个关键词 ({time.time() - step_start:.1f}s)")
+    cache_stats = get_suggest_cache().stats()
+    print(f"   💾 缓存命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次")
     
-    print(f"   ✅ 多平台挖掘完成: {len(all_keywords)} 个关键词")
+    # 以前运行分析过的关键词不再重复分析（与 profit_hunter / ultimate 共用 harvest 命名空间）
+    seen = SeenIndex("harvest", revisit_after=revisit_after)
+    fresh = seen.filter_new(all_keywords)
+    if len(fresh) < len(all_keywords):
+        print(f"   ⏭️ 跳过已处理的关键词 {len(all_keywords) - len(fresh)} 个")
+    all_keywords = fresh
     
     # 限制数量
-    all_keywords = list(all_keywords)[:max_keywords * 2]
+    all_keywords = all_keywords[:max_keywords * 2]
     
     # Step 2: Trends 飙升词 + 二级深挖
     print("\n📈 Step 2: Google Trends 飙升词 + 二级深挖...")
@@ -510,7 +494,7 @@ def run_super_hunter(seed_words, max_keywords=50):
     # 二级深挖
     for item in trend_data[:5]:
         sub_keywords = google_autocomplete(item['keyword'])
-        all_keywords.update(sub_keywords)
+        all_keywords.extend(seen.filter_new(sub_keywords))
     
     print(f"   ✅ 找到 {len(trend_data)} 个飙升词")
     
@@ -534,16 +518,19 @@ def run_super_hunter(seed_words, max_keywords=50):
         # GPTs 分析
         gpts_data = gpts_market_analysis(keyword)
         
+        # 每个关键词只提取一次特征
+        features = extract(keyword)
+        
         # 痛点分析
-        pain_score = analyze_pain_points(keyword)
+        pain_score = analyze_pain_points(keyword, features)
         
         # 商业价值
-        commercial_score = analyze_commercial_value(keyword)
+        commercial_score = analyze_commercial_value(keyword, features)
         
         # 超级评分
         final_score = calculate_super_score(
             keyword, kw_platform_data, trend_data, 
-            serp_data, gpts_data, pain_score, commercial_score
+            serp_data, gpts_data, pain_score, commercial_score, features
         )
         
         decision = make_decision(final_score)
@@ -562,10 +549,15 @@ def run_super_hunter(seed_words, max_keywords=50):
             "trend_signal": len([t for t in trend_data if t.get('keyword') == keyword])
         })
     
+    if not results:
+        print("\n❌ 没有新的关键词（已处理过的关键词已跳过）")
+        return pd.DataFrame()
+    
     # 排序并保存
     results_df = pd.DataFrame(results)
     results_df = results_df.sort_values('final_score', ascending=False)
     results_df.to_csv(DATA_DIR / "super_results.csv", index=False)
+    seen.add(r["keyword"] for r in results)
     
     # 统计
     build_now = len(results_df[results_df['decision'] == "🔴 BUILD NOW"])
@@ -594,6 +586,9 @@ def run_super_hunter(seed_words, max_keywords=50):
 def main():
     parser = argparse.ArgumentParser(description="Profit Hunter ULTIMATE V3.0 - 超级需求挖掘")
     parser.add_argument("--max", type=int, default=50, help="最大关键词数量")
+    parser.add_argument("--workers", type=int, default=8, help="多平台挖词并发数（1 为串行）")
+    parser.add_argument("--revisit-after", type=int, default=None,
+                        help="超过 N 天的已处理关键词重新分析（默认按 config.SEEN_INDEX，0 为全部重新分析）")
     
     args = parser.parse_args()
     
@@ -605,7 +600,7 @@ def main():
     else:
         seed_words = ["ai", "tool", "calculator", "generator", "online", "free"]
     
-    run_super_hunter(seed_words, max_keywords=args.max)
+    run_super_hunter(seed_words, max_keywords=args.max, workers=args.workers, revisit_after=args.revisit_after)
 
 if __name__ == "__main__":
     main()
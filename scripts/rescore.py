@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Profit Hunter ULTIMATE - 增量重算
+
+评分时各关键词的分项得分（trend / intent / competition / buildability / deep_bonus / 降维打击）
+会持久化到 data/score_components.csv。调整 config.py 中的 WEIGHTS / THRESHOLDS 后，
+用本脚本直接重算综合评分和决策，不需要重跑挖词、Trends、SERP 等网络步骤。
+
+Usage:
+    python3 rescore.py              # 按当前 WEIGHTS / THRESHOLDS 重算并写回
+    python3 rescore.py --dry-run    # 只输出决策变化，不写回
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR
+from scorer import COMPONENT_COLUMNS, combine_scores, decide
+
+COMPONENTS_FILE = Path(DATA_DIR) / "score_components.csv"
+DIFF_FILE = Path(DATA_DIR) / "rescore_diff.csv"
+
+
+def load_components(path=None):
+    """读取持久化的分项得分表"""
+    # 关键词可能是 "null"、"nan" 这类字符串，不能按缺失值解析
+    return pd.read_csv(path or COMPONENTS_FILE, encoding='utf-8',
+                       dtype={'keyword': str}, keep_default_na=False)
+
+
+def save_components(frame, path=None):
+    """把 score_frame 结果中的分项得分并入持久化表（同一关键词保留最新一次），返回表中关键词数"""
+    path = Path(path or COMPONENTS_FILE)
+    components = frame[COMPONENT_COLUMNS + ['final_score', 'decision']]
+    if path.exists():
+        components = pd.concat([load_components(path), components], ignore_index=True)
+        components = components.drop_duplicates('keyword', keep='last')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    components.to_csv(path, index=False, encoding='utf-8')
+    return len(components)
+
+
+def rescore(components, weights=None, thresholds=None):
+    """只用分项得分重算综合评分和决策
+    
+    返回 (更新后的表, 决策发生变化的关键词表)
+    """
+    final_score = combine_scores(
+        components['trend_score'], components['intent_score'], components['competition_score'],
+        components['buildability_score'], components['deep_bonus'], components['降维打击'], weights
+    )
+    decision = decide(final_score, thresholds)
+    changed = decision != components['decision'].to_numpy()
+    
+    diff = pd.DataFrame({
+        'keyword': components['keyword'].to_numpy()[changed],
+        'old_score': components['final_score'].to_numpy()[changed],
+        'new_score': final_score[changed],
+        'old_decision': components['decision'].to_numpy()[changed],
+        'new_decision': decision[changed],
+    })
+    return components.assign(final_score=final_score, decision=decision), diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profit Hunter ULTIMATE - 按新权重/阈值增量重算")
+    parser.add_argument("--dry-run", action="store_true", help="只输出决策变化，不写回")
+    args = parser.parse_args()
+    
+    if not COMPONENTS_FILE.exists():
+        print(f"⚠️ 没有找到分项得分 {COMPONENTS_FILE}，请先运行一次 profit_hunter_ultimate.py")
+        return
+    
+    start = time.perf_counter()
+    components = load_components()
+    updated, diff = rescore(components)
+    elapsed = time.perf_counter() - start
+    
+    print(f"🔁 重算 {len(updated)} 个关键词，用时 {elapsed:.3f} 秒")
+    before = components['decision'].value_counts()
+    after = updated['decision'].value_counts()
+    for decision in ['🔴 BUILD NOW', '🟡 WATCH', '❌ DROP']:
+        print(f"   {decision}: {before.get(decision, 0)} → {after.get(decision, 0)}")
+    print(f"   决策变化: {len(diff)} 个")
+    
+    if args.dry_run:
+        print(diff.head(20).to_string(index=False) if len(diff) else "   （无变化）")
+        return
+    
+    diff.to_csv(DIFF_FILE, index=False, encoding='utf-8')
+    updated.to_csv(COMPONENTS_FILE, index=False, encoding='utf-8')
+    print(f"💾 决策变化已保存到 {DIFF_FILE}")
+
+
+if __name__ == "__main__":
+    main()
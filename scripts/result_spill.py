@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+结果落盘 - 长时间运行的深度挖掘每轮结果追加写入磁盘，内存里只留 Top-K 和计数
+
+- SpillWriter: 追加模式写 JSON Lines，每轮写完 flush，按时间间隔 fsync；进程崩溃时已落盘的轮次都在
+- read_spill: 流式读回 KeywordRecord（忽略崩溃时写了一半的最后一行）
+- ranked_spill: 分块排序 + heapq.merge 归并，按评分降序流式产出各行（dict），内存只占一个分块；
+  同分按写入顺序，结果与 sorted(全部结果, reverse=True) 一致。排序只解析评分，
+  分块原样写回 JSON 行，不重建 KeywordRecord
+"""
+
+import heapq
+import json
+import os
+import tempfile
+import time
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+
+from keyword_record import KeywordRecord
+
+# 两次 fsync 之间的最长间隔（秒）
+FSYNC_INTERVAL = 30
+
+# 归并排序每个分块的记录数
+SORT_CHUNK_SIZE = 20000
+
+
+class SpillWriter:
+    """追加写入记录的落盘文件"""
+    
+    def __init__(self, path, resume=False, fsync_interval=FSYNC_INTERVAL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self.rows = 0
+        # resume=True 时接着已有文件追加，否则开始新的一次运行
+        if resume and self.path.exists():
+            _truncate_partial_line(self.path)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._synced_at = time.time()
+    
+    def write(self, records):
+        """写入一批记录并刷出缓冲区，距上次 fsync 超过间隔时同步到磁盘"""
+        self._file.writelines(
+            json.dumps(record.to_dict(), ensure_ascii=False) + '\n' for record in records
+        )
+        self._file.flush()
+        self.rows += len(records)
+        if time.time() - self._synced_at >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._synced_at = time.time()
+    
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            self.sync()
+            self._file.close()
+
+
+def _truncate_partial_line(path, block=4096):
+    """截掉崩溃时写了一半的最后一行，续写的记录才能从新行开始"""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+def _read_lines(path):
+    # 按字节读：含中文/emoji 的行存成 str 会按 4 字节/字符占用内存，排序分块只保留 UTF-8 字节
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                # 崩溃时写了一半的最后一行
+                break
+            yield line
+
+
+def read_spill(path):
+    """逐条读回落盘的记录"""
+    for line in _read_lines(path):
+        yield KeywordRecord.from_dict(json.loads(line))
+
+
+def _sorted_chunk(lines, chunk_size):
+    """取下一块并按评分降序排好：[(评分, 原始行字节)]"""
+    chunk = [(json.loads(line)["final_score"], line) for line in islice(lines, chunk_size)]
+    chunk.sort(key=itemgetter(0), reverse=True)
+    return chunk
+
+
+def _read_run(path):
+    for line in _read_lines(path):
+        row = json.loads(line)
+        yield row["final_score"], row
+
+
+def ranked_spill(path, chunk_size=SORT_CHUNK_SIZE):
+    """按评分降序流式产出落盘文件中的全部结果行（与 KeywordRecord.to_dict() 结构相同）"""
+    lines = _read_lines(path)
+    chunk = _sorted_chunk(lines, chunk_size)
+    if len(chunk) < chunk_size:
+        # 只有一个分块，不需要临时文件
+        for _, line in chunk:
+            yield json.loads(line)
+        return
+    
+    with tempfile.TemporaryDirectory(dir=Path(path).parent) as tmp:
+        runs = []
+        while chunk:
+            # 临时分块随目录一起删除，不需要 fsync
+            run = Path(tmp) / f"run-{len(runs)}.jsonl"
+            with open(run, 'wb') as f:
+                f.writelines(line for _, line in chunk)
+            runs.append(run)
+            chunk = _sorted_chunk(lines, chunk_size)
+        
+        # heapq.merge 同分时先取排在前面的分块，保持写入顺序
+        for _, row in heapq.merge(*(_read_run(run) for run in runs), key=itemgetter(0), reverse=True):
+            yield row
@@ -6,6 +6,7 @@ Usage:
     python scheduler.py              # 每 6 小时运行一次
     python scheduler.py --interval 12 # 每 12 小时运行一次
     python scheduler.py --immediate  # 立即运行一次
+    python scheduler.py --rescore-trends  # 只用本地时序库重算趋势指标
 
 Windows 后台运行:
     start /B python scheduler.py
@@ -24,7 +25,31 @@ import sys
 # 添加当前目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
+import pandas as pd
+
+from config import DATA_DIR
 from profit_hunter import ProfitHunterUltimate
+from trend_metrics import trend_metrics
+from trends_store import get_trends_store
+
+
+def rescore_trends():
+    """用时序库中已缓存的序列重算全部关键词的趋势指标（不访问网络）"""
+    frames = []
+    for (timeframe, geo), wide in get_trends_store().load_frames().items():
+        metrics = trend_metrics(wide).reset_index()
+        metrics.insert(1, 'timeframe', timeframe)
+        metrics.insert(2, 'geo', geo)
+        frames.append(metrics)
+    
+    if not frames:
+        print("   ⚠️ 时序库为空，跳过趋势重算")
+        return
+    
+    result = pd.concat(frames, ignore_index=True)
+    filepath = Path(DATA_DIR) / "trend_metrics.csv"
+    result.to_csv(filepath, index=False, encoding='utf-8')
+    print(f"📈 趋势重算: {len(result)} 条序列 → {filepath}")
 
 
 def job():
@@ -46,6 +71,8 @@ def job():
         
         print(f"\n✅ 任务完成！发现 {len(build_now)} 个立即做机会")
         
+        rescore_trends()
+        
         # 可以在这里添加通知逻辑（邮件、Slack 等）
         # notify_new_opportunities(build_now)
         
@@ -68,6 +95,7 @@ def main():
     python scheduler.py --interval 1       # 每 1 小时运行（测试用）
     python scheduler.py --immediate        # 立即运行一次
     python scheduler.py --run-once         # 运行一次后退出（不循环）
+    python scheduler.py --rescore-trends   # 只用本地时序库重算趋势指标
         """
     )
     
@@ -77,9 +105,15 @@ def main():
                        help="立即运行一次（然后按间隔继续）")
     parser.add_argument("--run-once", action="store_true",
                        help="只运行一次，不循环")
+    parser.add_argument("--rescore-trends", action="store_true",
+                       help="只用本地时序库重算趋势指标后退出")
     
     args = parser.parse_args()
     
+    if args.rescore_trends:
+        rescore_trends()
+        return
+    
     print("\n" + "="*60)
     print("💎 Profit Hunter ULTIMATE - 调度器")
     print("="*60)
@@ -30,18 +30,15 @@ def job():
     
     try:
         digger = DeepKeywordDigger()
-        results = digger.run_deep_dig(
+        digger.run_deep_dig(
             hours=1,  # 每次挖掘 1 小时
             keywords_per_hour=200  # 每小时分析 200 个词
         )
         
-        # 统计 BUILD NOW 的数量
-        build_now = [r for r in results if r["decision"] == "🔴 BUILD NOW"]
-        drop_attack = [r for r in results if r["降维打击"]]
-        
+        # 统计 BUILD NOW 的数量（全部结果已落盘，用挖掘时累计的计数）
         print(f"\n✅ 任务完成！")
-        print(f"   🔴 立即做机会: {len(build_now)} 个")
-        print(f"   💎 降维打击机会: {len(drop_attack)} 个")
+        print(f"   🔴 立即做机会: {digger.decision_counts.get('🔴 BUILD NOW', 0)} 个")
+        print(f"   💎 降维打击机会: {digger.drop_attack_count} 个")
         
     except Exception as e:
         print(f"\n❌ 任务失败: {e}")
@@ -3,53 +3,143 @@
 关键词评分模块 - V3 用户意图深挖版
 """
 
-from config import THRESHOLDS, PAIN_TRIGGERS, INTENT_SIGNALS, WEIGHTS
+import numpy as np
+import pandas as pd
 
+from config import THRESHOLDS, WEIGHTS
+from keyword_features import FEATURES, PROFILES, USER_INTENTS, length_flags
+from process_pool import map_chunks
+from top_k import top_k
 
-# 用户意图类型定义
-USER_INTENTS = {
-    'calculate': {
-        'keywords': ['calculator', 'calculate', 'calculation', 'compute', 'math'],
-        'goal': '用户想计算某个数值',
-        'clarity': '高'
-    },
-    'convert': {
-        'keywords': ['converter', 'convert', 'conversion', 'transform', 'translate'],
-        'goal': '用户想转换单位/格式/语言',
-        'clarity': '高'
-    },
-    'generate': {
-        'keywords': ['generator', 'generate', 'creator', 'maker', 'builder'],
-        'goal': '用户想自动生成内容',
-        'clarity': '高'
-    },
-    'check': {
-        'keywords': ['checker', 'check', 'validate', 'verify', 'test'],
-        'goal': '用户想验证/检查某事',
-        'clarity': '高'
-    },
-    'compare': {
-        'keywords': ['compare', 'comparison', 'vs', 'versus', 'alternative'],
-        'goal': '用户想对比选项',
-        'clarity': '高'
-    },
-    'find': {
-        'keywords': ['finder', 'search', 'lookup', 'lookup', 'locate'],
-        'goal': '用户想查找某物',
-        'clarity': '中'
-    },
-    'plan': {
-        'keywords': ['planner', 'plan', 'schedule', 'organizer'],
-        'goal': '用户想规划/安排',
-        'clarity': '中'
-    },
-    'track': {
-        'keywords': ['tracker', 'track', 'monitor', 'measure'],
-        'goal': '用户想追踪/监测',
-        'clarity': '中'
-    },
+
+# v3 档案的特征引擎（只含 v3 类别，列式匹配时没有其他档案的无关命中）
+V3_FEATURES = FEATURES.subset('v3:')
+SIGNAL_MATCHER = V3_FEATURES.matcher
+
+# 意图信号标签：(特征类别, 标签)，加分见 PROFILES['v3']['intent']
+INTENT_LABELS = [(f'v3:intent:{name}', label) for name, label in
+                 [('tool', '工具'), ('对比', '对比'), ('B2B', 'B2B'), ('速度', '速度')]]
+
+# score_frame 输入列 → 缺失时的默认值（与逐条评分时 dict.get 的默认值一致）
+FRAME_DEFAULTS = {
+    'trend_score': 50,
+    'ratio': 0,
+    'competition_score': 60,
+    '降维打击': False,
+    'competition': 'MEDIUM',
+    'demand_strength': 'UNKNOWN',
+    'community_buzz': 0,
+    'is_pain_point': False,
+    'is_tool_demand': False,
+    'is_comparison': False,
 }
 
+# 各输入列来自哪份分析数据
+FRAME_SOURCES = {
+    'trend_score': 'trends',
+    'ratio': 'gpts',
+    'competition_score': 'serp',
+    '降维打击': 'serp',
+    'competition': 'serp',
+    'demand_strength': 'deep',
+    'community_buzz': 'deep',
+    'is_pain_point': 'deep',
+    'is_tool_demand': 'deep',
+    'is_comparison': 'deep',
+}
+
+
+# 持久化的分项得分（权重/阈值变化后据此重算，不需要重跑分析）
+COMPONENT_COLUMNS = ['keyword', 'trend_score', 'intent_score', 'competition_score',
+                     'buildability_score', 'deep_bonus', '降维打击']
+
+# score_frame 比 dict 接口多出的列
+FRAME_ONLY_COLUMNS = ['deep_bonus', 'decision']
+
+
+def combine_scores(trend, intent, competition, buildability, deep_bonus, drop_attack, weights=None):
+    """分项得分 → 综合评分（向量化），降维打击 +20 分封顶 100，保留 1 位小数"""
+    weights = weights or WEIGHTS
+    # 加法顺序与逐条评分一致，保证浮点结果相同
+    final_score = (
+        np.asarray(trend, dtype=float) * weights['trend'] +
+        np.asarray(intent, dtype=float) * weights['intent'] +
+        np.asarray(competition, dtype=float) * weights['competition'] +
+        np.asarray(buildability, dtype=float) * weights['buildability'] +
+        np.asarray(deep_bonus, dtype=float)
+    )
+    final_score = np.where(np.asarray(drop_attack, dtype=bool), np.minimum(100, final_score + 20), final_score)
+    return _round1(final_score)
+
+
+def decide(final_scores, thresholds=None):
+    """按阈值批量给出决策"""
+    thresholds = thresholds or THRESHOLDS
+    final_scores = np.asarray(final_scores, dtype=float)
+    return np.select(
+        [final_scores >= thresholds['BUILD_NOW'], final_scores >= thresholds['WATCH']],
+        ['🔴 BUILD NOW', '🟡 WATCH'],
+        default='❌ DROP'
+    )
+
+
+def frame_records(frame):
+    """score_frame 结果 → dict 列表（与 score() 的输出一致）"""
+    # 逐列 tolist 再组装，比 DataFrame.to_dict('records') 快得多
+    columns = [name for name in frame.columns if name not in FRAME_ONLY_COLUMNS]
+    return [dict(zip(columns, row)) for row in zip(*(frame[name].tolist() for name in columns))]
+
+
+def _join_labels(parts, sep=', '):
+    """逐行连接标签：parts 为 [(mask, 标签)]，标签可以是数组或字符串
+    
+    只在 mask 为 True 的行上拼接，返回 (是否有标签, 连接结果 object 数组)
+    """
+    n = len(parts[0][0])
+    joined = np.full(n, '', dtype=object)
+    present = np.zeros(n, dtype=bool)
+    for mask, labels in parts:
+        both = mask & present
+        only = mask & ~present
+        if isinstance(labels, str):
+            joined[both] = joined[both] + (sep + labels)
+            joined[only] = labels
+        else:
+            joined[both] = joined[both] + sep + labels[both]
+            joined[only] = labels[only]
+        present |= mask
+    return present, joined
+
+
+def _round1(values):
+    """保留 1 位小数，结果与内置 round 完全一致
+    
+    np.round 先乘 10 再取整，在 .x5 附近个别值会与 round 不同；这些值逐个用 round 修正
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_half] = [round(value, 1) for value in values[near_half].tolist()]
+    return rounded
+
+
+def _frame_column(df, name):
+    """取出输入列（object 数组，保留原始值类型），缺失的列/值填默认值"""
+    default = FRAME_DEFAULTS[name]
+    if name not in df:
+        return np.array([default] * len(df), dtype=object)
+    values = df[name].to_numpy(dtype=object, copy=True)
+    values[pd.isna(values)] = default
+    return values
+
+
+def _frame_scorer(weights):
+    """进程池工作进程里的评分器（只用 score_frame，不需要分析数据）"""
+    scorer = KeywordScorer({}, {}, {}, {})
+    scorer.weights = weights
+    return scorer
+
 
 class KeywordScorer:
     """关键词评分器 - V3 增强版 + 深度搜索"""
@@ -61,170 +151,176 @@ class KeywordScorer:
         self.deep = deep_data or {}
         self.weights = WEIGHTS
     
-    def score(self, keywords):
-        """对关键词列表评分"""
-        results = []
-        
-        for keyword in keywords:
-            score = self._score_keyword(keyword)
-            results.append(score)
-        
-        return results
+    def score(self, keywords, parallel=1):
+        """对关键词列表评分（score_frame 的 dict 包装）"""
+        return frame_records(self.score_frame(self.to_frame(keywords), parallel))
+    
+    def to_frame(self, keywords):
+        """把 trends/gpts/serp/deep 数据按关键词拼成 score_frame 的输入表"""
+        keywords = list(keywords)
+        sources = {'trends': self.trends, 'gpts': self.gpts, 'serp': self.serp, 'deep': self.deep}
+        columns = {'keyword': keywords}
+        for name, source in FRAME_SOURCES.items():
+            data = sources[source]
+            # object 列保留原始值类型（int 不会被统一成 float）
+            columns[name] = pd.Series([data.get(kw, {}).get(name, FRAME_DEFAULTS[name]) for kw in keywords],
+                                      dtype=object)
+        return pd.DataFrame(columns)
     
-    def _score_keyword(self, keyword):
-        """对单个关键词评分 - V3 增强版 + 深度搜索"""
-        trends = self.trends.get(keyword, {})
-        gpts = self.gpts.get(keyword, {})
-        serp = self.serp.get(keyword, {})
-        deep = self.deep.get(keyword, {})
+    def _text_frame(self, keywords):
+        """批量计算关键词文本特征：意图分、信号、可实现性和用户意图（整列只扫描一次）"""
+        n = len(keywords)
+        hits = SIGNAL_MATCHER.match_all([kw.lower() for kw in keywords])
+        
+        # 每个 (关键词, 类别) 按配置顺序取第一个命中的信号词：rank 最小者
+        categories = list(SIGNAL_MATCHER.categories)
+        no_hit = np.iinfo(np.int64).max
+        first_rank = np.full((n, len(categories)), no_hit, dtype=np.int64)
+        np.minimum.at(first_rank, (hits['row'].to_numpy(dtype=np.int64), hits['category'].cat.codes.to_numpy()),
+                      hits['rank'].to_numpy(dtype=np.int64))
+        matched = {category: first_rank[:, i] != no_hit for i, category in enumerate(categories)}
+        
+        def labels(category, prefix):
+            mask = matched[category]
+            column = np.full(n, '', dtype=object)
+            patterns = np.array(SIGNAL_MATCHER.categories[category], dtype=object)
+            column[mask] = prefix + patterns[first_rank[mask, categories.index(category)]]
+            return mask, column
+        
+        word_count = np.fromiter((len(kw.split()) for kw in keywords), dtype=np.int64, count=n)
+        flags = {**matched, **length_flags(word_count)}
+        
+        # 需求意图强度：强痛点词 (+40)、意图信号词、长尾词 (+15)
+        intent_score = PROFILES['v3']['intent'].score_arrays(flags)
+        signal_parts = [labels('v3:pain', '痛点:')]
+        for category, label in INTENT_LABELS:
+            signal_parts.append(labels(category, f'{label}:'))
+        
+        long_tail = flags['len:2+']
+        long_tail_labels = np.full(n, '', dtype=object)
+        long_tail_labels[long_tail] = [f'长尾:{count}词' for count in word_count[long_tail].tolist()]
+        signal_parts.append((long_tail, long_tail_labels))
+        has_signals, signals = _join_labels(signal_parts)
+        signals[~has_signals] = '普通'
+        
+        # 可实现性：工具词 > 在线/免费工具 > 其他
+        buildability = PROFILES['v3']['buildability'].score_arrays(flags)
+        
+        # 用户意图（多个意图按 USER_INTENTS 顺序拼接）
+        intent_masks = [matched[f'v3:user:{intent}'] for intent in USER_INTENTS]
+        count = np.sum(intent_masks, axis=0) if intent_masks else np.zeros(n, dtype=int)
+        _, user_intent = _join_labels(list(zip(intent_masks, USER_INTENTS)))
+        _, combined = _join_labels(list(zip(intent_masks, USER_INTENTS)), ' + ')
+        user_goal = np.full(n, '普通搜索需求', dtype=object)
+        intent_clarity = np.full(n, '低', dtype=object)
+        for mask, info in zip(intent_masks, USER_INTENTS.values()):
+            single = mask & (count == 1)
+            user_goal[single] = info['goal']
+            intent_clarity[single] = info['clarity']
+        multiple = count > 1
+        user_goal[multiple] = '复合需求：' + combined[multiple]
+        intent_clarity[multiple] = '高'  # 多个意图匹配，清晰度高
+        user_intent[count == 0] = 'general'
+        
+        return intent_score, signals, buildability, user_intent, user_goal, intent_clarity
+    
+    def score_frame(self, df, parallel=1):
+        """列式批量评分 - V3 增强版 + 深度搜索
         
-        # 1. Trend Score (GPTs 热度)
-        trend_score = trends.get('trend_score', 50)
+        df: DataFrame（或 Arrow Table），keyword 列 + FRAME_DEFAULTS 中的分析数据列，
+        缺失的列或空值按默认值处理。返回每个关键词一行的 DataFrame（含 deep_bonus、decision）。
+        parallel: 工作进程数，大于 1 时按行分块交给进程池，结果按原顺序拼接
+        """
+        if hasattr(df, 'to_pandas'):
+            df = df.to_pandas()
+        df = df.reset_index(drop=True)
         
-        # 2. Intent Score
-        intent_score, signals = self._calc_intent_score(keyword)
+        if parallel > 1:
+            parts = map_chunks(_frame_scorer, (self.weights,), 'score_frame', df, parallel)
+            if parts:
+                return pd.concat(parts, ignore_index=True)
+        keywords = df['keyword'].tolist()
+        col = {name: _frame_column(df, name) for name in FRAME_DEFAULTS}
         
-        # 3. Competition Score
-        competition_score = serp.get('competition_score', 60)
+        # 2. Intent Score / 4. Buildability Score / 用户意图深挖（整列一次匹配）
+        intent_score, signals, buildability_score, user_intent, user_goal, intent_clarity = self._text_frame(keywords)
         
-        # 4. Buildability Score
-        buildability_score = self._calc_buildability(keyword)
+        # 1. Trend Score (GPTs 热度) / 3. Competition Score
+        trend = col['trend_score'].astype(float)
+        competition = col['competition_score'].astype(float)
         
         # 5. 深度搜索加成（基于真实社区需求）
-        deep_bonus = self._calc_deep_bonus(deep)
-        
-        # 6. 综合评分
-        final_score = (
-            trend_score * self.weights['trend'] +
-            intent_score * self.weights['intent'] +
-            competition_score * self.weights['competition'] +
-            buildability_score * self.weights['buildability'] +
-            deep_bonus
+        demand = col['demand_strength']
+        deep_bonus = (
+            np.where(demand == 'HIGH', 15, np.where(demand == 'MEDIUM', 8, 0))
+            + np.minimum(10, col['community_buzz'].astype(float) * 2)
+            + np.where(col['is_pain_point'].astype(bool), 10, 0)
+            + np.where(col['is_tool_demand'].astype(bool), 5, 0)
         )
         
-        # 降维打击加成 (+20 分)
-        if serp.get('降维打击'):
-            final_score = min(100, final_score + 20)
+        # 6. 综合评分 + 降维打击加成 (+20 分)
+        final_score = combine_scores(trend, intent_score, competition, buildability_score,
+                                     deep_bonus, col['降维打击'].astype(bool), self.weights)
         
-        # 用户意图分析
-        user_intent_info = self._analyze_user_intent(keyword)
-        
-        return {
-            'keyword': keyword,
-            'final_score': round(final_score, 1),
-            'trend_score': trend_score,
+        return pd.DataFrame({
+            'keyword': keywords,
+            'final_score': final_score,
+            'trend_score': col['trend_score'],
             'intent_score': intent_score,
-            'competition_score': competition_score,
+            'competition_score': col['competition_score'],
             'buildability_score': buildability_score,
-            '降维打击': serp.get('降维打击', False),
-            'competition': serp.get('competition', 'MEDIUM'),
-            'ratio': gpts.get('ratio', 0),
-            'avg_ratio': gpts.get('ratio', 0),  # 显示 GPTs 热度比
-            'signals': ', '.join(signals) if signals else '普通',
+            '降维打击': col['降维打击'],
+            'competition': col['competition'],
+            'ratio': col['ratio'],
+            'avg_ratio': col['ratio'],  # 显示 GPTs 热度比
+            'signals': signals,
             # 用户意图深挖字段
-            'user_intent': user_intent_info['intent_types'],
-            'user_goal': user_intent_info['goal'],
-            'intent_clarity': user_intent_info['clarity'],
+            'user_intent': user_intent,
+            'user_goal': user_goal,
+            'intent_clarity': intent_clarity,
             # 深度搜索数据
-            'demand_strength': deep.get('demand_strength', 'UNKNOWN'),
-            'community_buzz': deep.get('community_buzz', 0),
-            'is_pain_point': deep.get('is_pain_point', False),
-            'is_tool_demand': deep.get('is_tool_demand', False),
-            'is_comparison': deep.get('is_comparison', False),
-        }
+            'demand_strength': col['demand_strength'],
+            'community_buzz': col['community_buzz'],
+            'is_pain_point': col['is_pain_point'],
+            'is_tool_demand': col['is_tool_demand'],
+            'is_comparison': col['is_comparison'],
+            'deep_bonus': deep_bonus,
+            'decision': decide(final_score),
+        })
     
-    def _calc_deep_bonus(self, deep):
-        """计算深度搜索加成"""
-        bonus = 0
-        
-        if not deep:
-            return bonus
-        
-        # 高需求强度 (+15)
-        if deep.get('demand_strength') == 'HIGH':
-            bonus += 15
-        elif deep.get('demand_strength') == 'MEDIUM':
-            bonus += 8
-        
-        # 社区讨论热度 (+5)
-        bonus += min(10, deep.get('community_buzz', 0) * 2)
-        
-        # 痛点需求 (+10)
-        if deep.get('is_pain_point'):
-            bonus += 10
-        
-        # 工具需求 (+5)
-        if deep.get('is_tool_demand'):
-            bonus += 5
+    def _calc_intent_score(self, keyword, features=None):
+        """计算需求意图强度 - 返回 (score, signals)
         
-        return bonus
-    
-    def _calc_intent_score(self, keyword):
-        """计算需求意图强度 - 返回 (score, signals)"""
-        score = 50  # 基础分
-        keyword_lower = keyword.lower()
+        features: 关键词特征（含 v3 类别），不传则现场提取
+        """
+        if features is None:
+            features = V3_FEATURES.extract(keyword)
         signals = []
         
         # 强痛点词 (+40)
-        for trigger in PAIN_TRIGGERS.get('strong', []):
-            if trigger in keyword_lower:
-                score += 40
-                signals.append(f'痛点:{trigger}')
-                break
-        
-        # 工具词 (+30)
-        for tool in INTENT_SIGNALS.get('tool', []):
-            if tool in keyword_lower:
-                score += 30
-                signals.append(f'工具:{tool}')
-                break
+        trigger = features.first('v3:pain')
+        if trigger:
+            signals.append(f'痛点:{trigger}')
         
-        # 对比词 (+25)
-        for compare in INTENT_SIGNALS.get('对比', []):
-            if compare in keyword_lower:
-                score += 25
-                signals.append(f'对比:{compare}')
-                break
-        
-        # B2B 词 (+25)
-        for b2b in INTENT_SIGNALS.get('B2B', []):
-            if b2b in keyword_lower:
-                score += 25
-                signals.append(f'B2B:{b2b}')
-                break
-        
-        # 速度词 (+20)
-        for speed in INTENT_SIGNALS.get('速度', []):
-            if speed in keyword_lower:
-                score += 20
-                signals.append(f'速度:{speed}')
-                break
+        # 工具词 (+30) / 对比词 (+25) / B2B 词 (+25) / 速度词 (+20)
+        for category, label in INTENT_LABELS:
+            signal = features.first(category)
+            if signal:
+                signals.append(f'{label}:{signal}')
         
         # 长尾词 (+15)
-        word_count = len(keyword.split())
-        if word_count >= 2:
-            score += 15
-            signals.append(f'长尾:{word_count}词')
+        if features.has('len:2+'):
+            signals.append(f'长尾:{features.word_count}词')
         
-        return min(100, score), signals
+        return PROFILES['v3']['intent'].score(features), signals
     
-    def _calc_buildability(self, keyword):
-        """计算可实现性"""
-        keyword_lower = keyword.lower()
-        
-        # 工具词最容易实现
-        for tool in ['calculator', 'generator', 'converter']:
-            if tool in keyword_lower:
-                return 100
+    def _calc_buildability(self, keyword, features=None):
+        """计算可实现性：工具词 100 > 在线/免费工具 85 > 其他 70"""
+        if features is None:
+            features = V3_FEATURES.extract(keyword)
+        return PROFILES['v3']['buildability'].score(features)
         
-        # 在线/免费工具
-        for word in ['online', 'free', 'web']:
-            if word in keyword_lower:
-                return 85
-        
-        return 70
-    
-    def _analyze_user_intent(self, keyword):
+    def _analyze_user_intent(self, keyword, features=None):
         """用户意图深挖 - V3 核心功能
         
         分析用户真正想做什么：
@@ -234,18 +330,11 @@ class KeywordScorer:
         - check: 用户想验证/检查某事
         ...
         """
-        keyword_lower = keyword.lower()
-        matched_intents = []
-        
-        # 检测意图类型
-        for intent_type, intent_info in USER_INTENTS.items():
-            for kw in intent_info['keywords']:
-                if kw in keyword_lower:
-                    matched_intents.append(intent_type)
-                    break
+        if features is None:
+            features = V3_FEATURES.extract(keyword)
         
-        # 去重
-        matched_intents = list(set(matched_intents))
+        # 检测意图类型（按 USER_INTENTS 顺序，与 score_frame 一致）
+        matched_intents = [intent_type for intent_type in USER_INTENTS if features.has(f'v3:user:{intent_type}')]
         
         # 生成 user_goal
         if len(matched_intents) == 0:
@@ -270,25 +359,16 @@ class KeywordScorer:
                 'clarity': '高'  # 多个意图匹配，清晰度高
             }
     
-    def get_final_results(self, scored_keywords):
-        """生成最终决策结果 - V3 版"""
-        results = []
+    def get_final_results(self, scored_keywords, top=None):
+        """生成最终决策结果 - V3 版
         
-        for kw in scored_keywords:
-            score = kw.get('final_score', 0)
-            
-            # 决策
-            if score >= THRESHOLDS['BUILD_NOW']:
-                decision = '🔴 BUILD NOW'
-            elif score >= THRESHOLDS['WATCH']:
-                decision = '🟡 WATCH'
-            else:
-                decision = '❌ DROP'
-            
-            kw['decision'] = decision
-            results.append(kw)
+        top: 只返回评分最高的 top 个（不做全量排序）；默认返回全部关键词的排名
+        """
+        results = list(scored_keywords)
         
-        # 按评分排序
-        results.sort(key=lambda x: x.get('final_score', 0), reverse=True)
+        # 决策
+        for kw, decision in zip(results, decide([kw.get('final_score', 0) for kw in results])):
+            kw['decision'] = str(decision)
         
-        return results
+        # 按评分排序
+        return top_k(results, top, key=lambda x: x.get('final_score', 0))
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+已处理关键词索引 - 跨运行持久化的 Bloom 过滤器，挖词/验证时跳过已经处理过的词
+
+- 关键词先归一化（小写、合并空白）再哈希：blake2b 取 128 位拆成两个 64 位哈希，
+  双重哈希生成 k 个位置，每个分代查询/写入都是 O(k)，与已记录的词数无关
+- 位数组用 numpy.memmap 映射到文件，只有访问到的页才读入内存
+- 每个命名空间（harvest / deep / validate）每 generation_days 天一个分代文件，写满后开容量翻倍的新分代；
+  Bloom 过滤器不能删除单个词，按分代日期实现 revisit_after（只查最近 N 天写入过的分代）
+  和 retention_days（删除过期分代）
+- 可扩展 Bloom 过滤器：新分代的误判率取剩余额度的一半，各分代误判率之和（新词被误当成已处理的
+  概率）不超过 error_rate，不随分代数增加
+- 误判只会让极少数新词被当成已处理而跳过，不会漏记已处理的词
+
+Usage:
+    python3 seen_index.py stats                 # 各命名空间的分代、词数和文件大小
+    python3 seen_index.py check KEYWORD         # 查询关键词是否已处理
+    python3 seen_index.py clear NAME            # 清空一个命名空间
+"""
+
+import argparse
+import hashlib
+import math
+import re
+import shutil
+import struct
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from config import SEEN_INDEX
+
+# 文件头：魔数、位数、哈希个数、已写入词数、设计容量
+HEADER = struct.Struct("<8sQQQQ")
+MAGIC = b"PHBLOOM2"
+
+# 旧版文件头（没有设计容量，按配置的 capacity 计）
+HEADER_V1 = struct.Struct("<8sQQQ")
+MAGIC_V1 = b"PHBLOOM1"
+
+# 分代文件名：YYYYMMDD-序号.bloom
+GENERATION_RE = re.compile(r"^(\d{8})-(\d+)\.bloom$")
+
+
+def normalize_keyword(keyword):
+    """小写并合并空白，同一个词的不同写法只记一次"""
+    return " ".join(str(keyword).lower().split())
+
+
+def bloom_size(capacity, error_rate):
+    """按设计容量和误判率计算 (位数, 哈希个数)"""
+    bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def false_positive_rate(bits, hashes, count):
+    """写入 count 个词后的理论误判率"""
+    return (1 - math.exp(-hashes * count / bits)) ** hashes
+
+
+class BloomFilter:
+    """映射到单个文件的 Bloom 过滤器"""
+    
+    def __init__(self, path, capacity=None, error_rate=None):
+        self.path = Path(path)
+        if not self.path.exists():
+            capacity = capacity or SEEN_INDEX["capacity"]
+            bits, hashes = bloom_size(capacity, error_rate or SEEN_INDEX["error_rate"])
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, bits, hashes, 0, capacity))
+                # 稀疏文件，未写入的页不占磁盘
+                f.truncate(HEADER.size + (bits + 7) // 8)
+        
+        with open(self.path, 'rb') as f:
+            head = f.read(HEADER.size)
+        if head[:8] == MAGIC:
+            _, self.bits, self.hashes, self.count, self.capacity = HEADER.unpack(head)
+            self._header = HEADER
+        elif head[:8] == MAGIC_V1:
+            _, self.bits, self.hashes, self.count = HEADER_V1.unpack(head[:HEADER_V1.size])
+            self.capacity = SEEN_INDEX["capacity"]
+            self._header = HEADER_V1
+        else:
+            raise ValueError(f"不是 Bloom 过滤器文件: {self.path}")
+        self._map = np.memmap(self.path, dtype=np.uint8, mode='r+')
+        self._bytes = self._map[self._header.size:]
+        self._steps = np.arange(self.hashes, dtype=np.uint64)
+    
+    def _positions(self, keywords):
+        """(n, k) 的位下标矩阵，keywords 须已归一化"""
+        digests = b"".join(hashlib.blake2b(keyword.encode('utf-8'), digest_size=16).digest()
+                           for keyword in keywords)
+        h = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        # uint64 运算溢出时回绕，正是双重哈希需要的
+        return (h[:, :1] + self._steps * (h[:, 1:] | np.uint64(1))) % np.uint64(self.bits)
+    
+    def _lookup(self, positions):
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        return (self._bytes[positions >> np.uint64(3)] & masks).astype(bool).all(axis=1)
+    
+    def contains_many(self, keywords):
+        """逐个判断是否（可能）已记录，返回布尔数组"""
+        if not keywords:
+            return np.zeros(0, dtype=bool)
+        return self._lookup(self._positions(keywords))
+    
+    def add_many(self, keywords):
+        """记录一批词，返回其中新加入的个数"""
+        if not keywords:
+            return 0
+        positions = self._positions(keywords)
+        added = int((~self._lookup(positions)).sum())
+        masks = np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+        np.bitwise_or.at(self._bytes, (positions >> np.uint64(3)).ravel(), masks.ravel())
+        self.count += added
+        if self._header is HEADER:
+            head = HEADER.pack(MAGIC, self.bits, self.hashes, self.count, self.capacity)
+        else:
+            head = HEADER_V1.pack(MAGIC_V1, self.bits, self.hashes, self.count)
+        self._map[:self._header.size] = np.frombuffer(head, dtype=np.uint8)
+        return added
+    
+    @property
+    def full(self):
+        return self.count >= self.capacity
+    
+    def false_positive_rate(self):
+        """按当前词数估计的误判率"""
+        return false_positive_rate(self.bits, self.hashes, self.count)
+    
+    def flush(self):
+        self._map.flush()
+
+
+class SeenIndex:
+    """一个命名空间下按时间分代的已处理关键词索引（可扩展 Bloom 过滤器）"""
+    
+    def __init__(self, name, revisit_after=None, root=None, capacity=None, error_rate=None):
+        """revisit_after: 超过这么多天的记录不再算已处理（None 用配置，配置也为 None 时永不重访）"""
+        self.name = name
+        self.dir = Path(root or SEEN_INDEX["dir"]) / name
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity or SEEN_INDEX["capacity"]
+        self.error_rate = error_rate or SEEN_INDEX["error_rate"]
+        self.generation_days = SEEN_INDEX["generation_days"]
+        self.revisit_after = SEEN_INDEX["revisit_after_days"] if revisit_after is None else revisit_after
+        self._lock = threading.Lock()
+        self._filters = {}
+        # 分代列表只在打开、开新分代和清空时更新，查询不再扫描目录
+        self._generations = self._scan()
+        self._prune()
+    
+    def _scan(self):
+        """[(开始日期, 序号, 路径)]，按时间先后"""
+        generations = []
+        for path in self.dir.glob("*.bloom"):
+            match = GENERATION_RE.match(path.name)
+            if match:
+                day = date(int(match[1][:4]), int(match[1][4:6]), int(match[1][6:]))
+                generations.append((day, int(match[2]), path))
+        return sorted(generations)
+    
+    def _spans(self):
+        """[(开始日期, 最后写入日期, 路径)]：每个分代写到下一代开始那天，最新一代写到今天"""
+        ends = [day for day, _, _ in self._generations[1:]] + [date.today()]
+        return [(day, end, path) for (day, _, path), end in zip(self._generations, ends)]
+    
+    def _prune(self):
+        retention = SEEN_INDEX["retention_days"]
+        if retention is None:
+            return
+        cutoff = date.today() - timedelta(days=retention)
+        expired = {path for _, end, path in self._spans() if end < cutoff}
+        for path in expired:
+            path.unlink()
+        self._generations = [generation for generation in self._generations if generation[2] not in expired]
+    
+    def _filter(self, path):
+        if path not in self._filters:
+            self._filters[path] = BloomFilter(path, self.capacity, self.error_rate)
+        return self._filters[path]
+    
+    def _active(self):
+        """revisit_after 窗口内写入过的分代（新的在前，最近的词先查到）"""
+        cutoff = None if self.revisit_after is None else date.today() - timedelta(days=self.revisit_after)
+        return [self._filter(path) for _, end, path in reversed(self._spans()) if cutoff is None or end > cutoff]
+    
+    def _current(self):
+        """可写入的分代：最新一代没写满且未超过 generation_days 天时继续写，否则开新分代"""
+        today = date.today()
+        capacity, n = self.capacity, 0
+        if self._generations:
+            day, last_n, path = self._generations[-1]
+            bloom = self._filter(path)
+            if not bloom.full and (today - day).days < self.generation_days:
+                return bloom
+            if bloom.full:
+                # 写满说明词量大，新分代容量翻倍，分代数随词数对数增长
+                capacity = bloom.capacity * 2
+            if day == today:
+                n = last_n + 1
+        # 新分代的误判率取剩余额度的一半（旧分代已不再写入，误判率按实际词数计）；
+        # 调小了 error_rate 等导致额度用完时取下限，避免新分代无限变大
+        used = sum(self._filter(path).false_positive_rate() for _, _, path in self._generations)
+        error_rate = max((self.error_rate - used) / 2, self.error_rate / 1024)
+        path = self.dir / f"{today:%Y%m%d}-{n}.bloom"
+        bloom = self._filters[path] = BloomFilter(path, capacity, error_rate)
+        self._generations.append((today, n, path))
+        return bloom
+    
+    def seen_mask(self, keywords):
+        """keywords 中每个词是否已处理（布尔数组）"""
+        return self._mask([normalize_keyword(keyword) for keyword in keywords])
+    
+    def _mask(self, normalized):
+        seen = np.zeros(len(normalized), dtype=bool)
+        with self._lock:
+            for bloom in self._active():
+                pending = np.flatnonzero(~seen)
+                if not len(pending):
+                    break
+                seen[pending] = bloom.contains_many([normalized[i] for i in pending])
+        return seen
+    
+    def __contains__(self, keyword):
+        return bool(self.seen_mask([keyword])[0])
+    
+    def filter_new(self, keywords):
+        """去掉已处理的词（保持原顺序，归一化后相同的词只留第一个）"""
+        firsts = {}
+        for keyword in keywords:
+            firsts.setdefault(normalize_keyword(keyword), keyword)
+        seen = self._mask(list(firsts))
+        return [keyword for keyword, known in zip(firsts.values(), seen) if not known]
+    
+    def add(self, keywords):
+        """把一批词记为已处理，返回新记录的个数"""
+        normalized = list(dict.fromkeys(normalize_keyword(keyword) for keyword in keywords))
+        added = 0
+        with self._lock:
+            while normalized:
+                bloom = self._current()
+                room = bloom.capacity - bloom.count
+                batch, normalized = normalized[:room], normalized[room:]
+                added += bloom.add_many(batch)
+                bloom.flush()
+        return added
+    
+    def clear(self):
+        """删除这个命名空间的全部分代"""
+        with self._lock:
+            self._filters.clear()
+            self._generations = []
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.dir.mkdir(parents=True, exist_ok=True)
+    
+    def stats(self):
+        """{generations, keywords, bytes, error_rate}（error_rate 为全部分代的误判率之和）"""
+        with self._lock:
+            filters = [self._filter(path) for _, _, path in self._generations]
+        return {
+            "generations": len(filters),
+            "keywords": sum(bloom.count for bloom in filters),
+            "bytes": sum(bloom.path.stat().st_size for bloom in filters),
+            "error_rate": sum(bloom.false_positive_rate() for bloom in filters),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="已处理关键词索引")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="各命名空间的分代、词数和文件大小")
+    check_parser = subparsers.add_parser("check", help="查询关键词是否已处理")
+    check_parser.add_argument("keyword")
+    check_parser.add_argument("--revisit-after", type=int, default=None, help="只看最近 N 天的记录")
+    clear_parser = subparsers.add_parser("clear", help="清空一个命名空间")
+    clear_parser.add_argument("name")
+    args = parser.parse_args()
+    
+    root = Path(SEEN_INDEX["dir"])
+    names = sorted(path.name for path in root.iterdir() if path.is_dir()) if root.exists() else []
+    
+    if args.command == "stats":
+        if not names:
+            print(f"⚠️ {root} 下还没有索引")
+        for name in names:
+            stats = SeenIndex(name).stats()
+            print(f"   {name:<10} | {stats['generations']:>3} 个分代 | {stats['keywords']:>10,} 个词 | "
+                  f"{stats['bytes'] / 2**20:8.1f} MB | 误判率 {stats['error_rate']:.2%}")
+    
+    elif args.command == "check":
+        for name in names:
+            known = args.keyword in SeenIndex(name, revisit_after=args.revisit_after)
+            print(f"   {name:<10} | {'✅ 已处理' if known else '🆕 未处理'}")
+    
+    elif args.command == "clear":
+        SeenIndex(args.name).clear()
+        print(f"🧹 已清空 {args.name}")
+
+
+if __name__ == "__main__":
+    main()
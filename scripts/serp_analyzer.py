@@ -3,22 +3,15 @@
 SERP 竞争分析模块 - 降维打击检测 - V3 简化版
 """
 
+from domain_classifier import get_domain_classifier
+
 
 class SERPAnalyzer:
     """SERP 竞争分析器 - V3 简化版"""
     
     def __init__(self):
-        self.weak_competitors = [
-            "reddit.com", "quora.com", "stackoverflow.com",
-            "medium.com", "dev.to", "blogger.com", "wordpress.com",
-            "github.com", "youtube.com", "wikipedia.org"
-        ]
-        
-        self.giants = [
-            "google.com", "microsoft.com", "adobe.com",
-            "canva.com", "figma.com", "notion.so",
-            "amazon.com", "apple.com", "facebook.com"
-        ]
+        # 弱竞争者 / 大厂按可注册域名查分类表（scripts/data/domain_categories.csv）
+        self.classifier = get_domain_classifier()
     
     def analyze(self, keywords):
         """分析 SERP 竞争度 - V3 简化版"""
@@ -103,8 +96,8 @@ class SERPAnalyzer:
     
     def is_weak_competitor(self, domain):
         """检测是否是弱竞争者"""
-        return any(wc in domain.lower() for wc in self.weak_competitors)
+        return self.classifier.is_weak(domain)
     
     def is_giant(self, domain):
         """检测是否是大厂"""
-        return any(g in domain.lower() for g in self.giants)
+        return self.classifier.is_giant(domain)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+SERP 原始页面归档 - 压缩保存抓到的结果页 HTML，解析规则改了以后离线重新解析，不用重新抓取
+
+- 每个页面按 (查询词, 请求参数, 日期) 的哈希寻址：objects/<前两位>/<哈希>.html.zst（未安装
+  zstandard 时用 .html.gz），同一天同样的请求只存一份
+- index.jsonl 逐行记录哈希、查询词、参数、日期、来源和原始/压缩后大小，只追加
+- reparse 按来源选解析函数（PARSERS），分块交给多个进程读盘、解压、解析，不访问网络
+
+Usage:
+    python3 serp_archive.py stats                                  # 各来源的页面数和压缩率
+    python3 serp_archive.py reparse                                # 每个页面用其来源的解析函数重新解析
+    python3 serp_archive.py reparse --parser deep_validation --workers 8 --since 2026-10-01
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from config import SERP_ARCHIVE
+from process_pool import map_records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 来源 -> 解析函数（"模块:函数"，接收 HTML 文本返回 dict），工作进程里按需导入
+PARSERS = {
+    "deep_validation": "profit_hunter_deep_validation:serp_signals",
+    "profit_hunter": "profit_hunter:serp_competition_from_html",
+}
+
+# 每块交给工作进程的页面数：单页解析本身较重，块不需要太大
+REPARSE_CHUNK = 50
+
+
+def serp_key(query, params=None, day=None):
+    """(查询词, 请求参数, 日期) 的哈希，作为页面的地址"""
+    day = day or date.today().isoformat()
+    payload = json.dumps([query, params or {}, day], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _compress(data, codec, level):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level)
+
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("读取 .zst 归档需要安装 zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SerpArchive:
+    """按请求哈希寻址的压缩 SERP 页面归档"""
+    
+    def __init__(self, root=None, codec=None, level=None):
+        self.root = Path(root or SERP_ARCHIVE["dir"])
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        codec = codec or SERP_ARCHIVE["codec"]
+        # 未安装 zstandard 时退回 gzip，已有的 .zst 页面照常按扩展名读取
+        self.codec = "gzip" if codec == "zstd" and zstandard is None else codec
+        self.level = level or SERP_ARCHIVE["level"][self.codec]
+        self._lock = threading.Lock()
+        self._indexed = None
+    
+    def _path(self, key, codec):
+        suffix = ".html.zst" if codec == "zstd" else ".html.gz"
+        return self.objects / key[:2] / f"{key}{suffix}"
+    
+    def _find(self, key):
+        for codec in ("zstd", "gzip"):
+            path = self._path(key, codec)
+            if path.exists():
+                return path, codec
+        return None, None
+    
+    def put(self, query, html, params=None, source="", day=None):
+        """归档一个页面，返回哈希；同一请求已归档过时不重复写入"""
+        day = day or date.today().isoformat()
+        key = serp_key(query, params, day)
+        raw = html.encode('utf-8')
+        
+        with self._lock:
+            if self._indexed is None:
+                self._indexed = {(entry["key"], entry["source"]) for entry in self.entries()}
+            if (key, source) in self._indexed:
+                return key
+            
+            path, codec = self._find(key)
+            if path is None:
+                codec = self.codec
+                path = self._path(key, codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # 先写临时文件再改名，崩溃时不会留下半个页面
+                tmp = path.with_name(path.name + ".tmp")
+                tmp.write_bytes(_compress(raw, codec, self.level))
+                os.replace(tmp, path)
+            
+            entry = {
+                "key": key,
+                "query": query,
+                "params": params or {},
+                "date": day,
+                "source": source,
+                "codec": codec,
+                "size": len(raw),
+                "stored": path.stat().st_size,
+                "archived_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._indexed.add((key, source))
+        return key
+    
+    def get(self, key):
+        """按哈希读回页面 HTML，不存在时返回 None"""
+        path, codec = self._find(key)
+        if path is None:
+            return None
+        return _decompress(path.read_bytes(), codec).decode('utf-8')
+    
+    def entries(self, source=None, since=None):
+        """索引中的页面记录（按归档顺序），可按来源和起始日期（YYYY-MM-DD）筛选"""
+        if not self.index_path.exists():
+            return []
+        entries = []
+        with open(self.index_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 崩溃时写了一半的最后一行
+                    break
+                entry = json.loads(line)
+                if source and entry["source"] != source:
+                    continue
+                if since and entry["date"] < since:
+                    continue
+                entries.append(entry)
+        return entries
+    
+    def stats(self):
+        """{来源: {pages, size, stored}}"""
+        stats = {}
+        for entry in self.entries():
+            row = stats.setdefault(entry["source"], {"pages": 0, "size": 0, "stored": 0})
+            row["pages"] += 1
+            row["size"] += entry["size"]
+            row["stored"] += entry["stored"]
+        return stats
+
+
+def _resolve(name):
+    module, function = PARSERS[name].split(":")
+    return getattr(importlib.import_module(module), function)
+
+
+class _Reparser:
+    """工作进程内的解析器：读盘、解压、按来源调用解析函数"""
+    
+    def __init__(self, root, parser=None):
+        self.archive = SerpArchive(root)
+        self.parser = parser
+        self._functions = {}
+    
+    def parse(self, entries):
+        rows = []
+        for entry in entries:
+            name = self.parser or entry["source"]
+            if name not in self._functions:
+                self._functions[name] = _resolve(name)
+            html = self.archive.get(entry["key"])
+            if html is None:
+                continue
+            rows.append({"keyword": entry["query"], "date": entry["date"], "source": entry["source"],
+                         "key": entry["key"], **self._functions[name](html)})
+        return rows
+
+
+def reparse(archive=None, parser=None, source=None, since=None, workers=None):
+    """用当前的解析规则重新解析归档页面，返回结果行列表（顺序与索引一致）
+    
+    parser: PARSERS 中的名字，None 时每个页面用其来源对应的解析函数
+    """
+    archive = archive or SerpArchive()
+    entries = archive.entries(source=source, since=since)
+    names = {parser} if parser else {entry["source"] for entry in entries}
+    unknown = names - set(PARSERS)
+    if unknown:
+        raise ValueError(f"没有对应的解析函数: {', '.join(sorted(unknown))}（可选 {', '.join(PARSERS)}）")
+    return map_records(_Reparser, (str(archive.root), parser), "parse", entries,
+                       workers or os.cpu_count() or 1, chunk_size=REPARSE_CHUNK)
+
+
+_default_archive = None
+_default_lock = threading.Lock()
+
+
+def get_serp_archive():
+    """进程内共享的默认归档实例"""
+    global _default_archive
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = SerpArchive()
+    return _default_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SERP 原始页面归档")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="各来源的页面数和压缩率")
+    reparse_parser = subparsers.add_parser("reparse", help="离线重新解析归档页面")
+    reparse_parser.add_argument("--parser", choices=list(PARSERS), default=None,
+                                help="解析函数（默认按页面来源）")
+    reparse_parser.add_argument("--source", default=None, help="只解析这个来源的页面")
+    reparse_parser.add_argument("--since", default=None, help="只解析该日期（YYYY-MM-DD）之后抓取的页面")
+    reparse_parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认 CPU 核数）")
+    reparse_parser.add_argument("--output", default=None, help="结果 CSV 路径")
+    args = parser.parse_args()
+    
+    archive = SerpArchive()
+    
+    if args.command == "stats":
+        stats = archive.stats()
+        if not stats:
+            print(f"⚠️ {archive.root} 下还没有归档页面")
+        for source, row in sorted(stats.items()):
+            print(f"   {source or '-':<16} | {row['pages']:>8,} 个页面 | {row['size'] / 2**20:8.1f} MB → "
+                  f"{row['stored'] / 2**20:7.1f} MB（{row['size'] / max(row['stored'], 1):.1f}x）")
+    
+    elif args.command == "reparse":
+        import pandas as pd
+        
+        start = time.perf_counter()
+        rows = reparse(archive, parser=args.parser, source=args.source, since=args.since, workers=args.workers)
+        elapsed = time.perf_counter() - start
+        if not rows:
+            print("⚠️ 没有可重新解析的页面")
+            return
+        output = args.output or archive.root / f"reparse_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        pd.DataFrame(rows).to_csv(output, index=False, encoding='utf-8')
+        print(f"✅ 重新解析 {len(rows)} 个页面，用时 {elapsed:.1f}s（{len(rows) / elapsed:.0f} 页/秒）→ {output}")
+
+
+if __name__ == "__main__":
+    main()
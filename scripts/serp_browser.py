@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+SERP 浏览器池 - async Playwright 并发抓取搜索结果页
+
+- 一个浏览器、N 个 context，每个 context 固定数量的页面，页面放在队列里反复使用
+- 并发上限（信号量）+ 按主机限频（throttle.AsyncRateLimiter），代替逐个开页面、每个关键词后 sleep 1-2 秒
+- 页面加载/解析失败时关闭该页面，在同一 context 里重开（context 已失效时换新的）；
+  每个页面用满 max_page_uses 次也会回收，避免长时间运行内存上涨
+- 记录每次页面加载的耗时和流量，stats() 给出吞吐量、p50 / p95 延迟和每页字节数
+
+三种抓取模式（SERP_BROWSER["mode"]）：
+- full: 原样加载整页，等 load 事件
+- light: 拦截图片/媒体/字体/样式表和第三方域名的请求，只等 DOM 解析完、结果容器出现
+- http: 不开浏览器，requests 直接取 HTML 再解析链接（结果页不需要执行 JS 时最快）
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus, urlparse
+
+import numpy as np
+import requests
+
+from config import SERP_BROWSER
+from domain_classifier import get_domain_classifier
+from serp_parser import parse_serp
+from throttle import AsyncRateLimiter
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+SEARCH_URL = "https://www.google.com/search"
+
+MODES = ("full", "light", "http")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+async def top_result_links(page, limit=3):
+    """自然结果前 limit 个链接"""
+    return await page.locator("div.g div.yuRUbf a").evaluate_all(
+        "(links, limit) => links.slice(0, limit).map(link => link.href)", limit)
+
+
+async def top_result_links_and_html(page, limit=3):
+    """(前 limit 个链接, 页面 HTML)，HTML 用于归档"""
+    return await top_result_links(page, limit), await page.content()
+
+
+def parse_result_links(html, limit=3):
+    """HTML 文本中的自然结果前 limit 个链接"""
+    return parse_serp(html).organic[:limit]
+
+
+def parse_result_links_and_html(html, limit=3):
+    return parse_result_links(html, limit), html
+
+
+def _site(host):
+    """主机所属站点（可注册域名，IP 原样），用于区分第三方请求；按 Public Suffix List，
+    www.google.co.uk 的站点是 google.co.uk 而不是 co.uk"""
+    return get_domain_classifier().registrable_domain(host)
+
+
+def _latency_stats(latencies, elapsed, ok, failed, recycled, total_bytes, blocked):
+    latencies = np.asarray(latencies)
+    p50, p95 = np.percentile(latencies, [50, 95]).tolist() if len(latencies) else (0.0, 0.0)
+    pages = ok + failed
+    return {
+        "ok": ok,
+        "failed": failed,
+        "recycled": recycled,
+        "throughput": ok / elapsed if elapsed else 0.0,
+        "p50": p50,
+        "p95": p95,
+        "seconds_per_page": float(latencies.mean()) if len(latencies) else 0.0,
+        "bytes_per_page": total_bytes / pages if pages else 0.0,
+        "blocked": blocked,
+    }
+
+
+class _PageSlot:
+    """池里的一个页面及其所属 context"""
+    
+    __slots__ = ("context", "page", "uses")
+    
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class SerpBrowserPool:
+    """复用页面的 SERP 浏览器池
+    
+    用法：
+        async with SerpBrowserPool() as pool:
+            pages = await pool.run(keywords)      # {keyword: top_result_links 结果或 None}
+            print(pool.stats())
+    """
+    
+    def __init__(self, contexts=None, pages_per_context=None, concurrency=None, rate=None,
+                 timeout=None, max_page_uses=None, search_url=SEARCH_URL, headless=True, mode=None):
+        if async_playwright is None:
+            raise ImportError("需要安装 playwright: pip install playwright && playwright install chromium")
+        self.contexts = contexts or SERP_BROWSER["contexts"]
+        self.pages_per_context = pages_per_context or SERP_BROWSER["pages_per_context"]
+        self.concurrency = concurrency or SERP_BROWSER["concurrency"]
+        self.timeout = timeout or SERP_BROWSER["timeout"]
+        self.max_page_uses = max_page_uses or SERP_BROWSER["max_page_uses"]
+        self.search_url = search_url
+        self.headless = headless
+        self.host = urlparse(search_url).netloc
+        self.site = _site(urlparse(search_url).hostname)
+        self.limiter = AsyncRateLimiter(SERP_BROWSER["rate"] if rate is None else rate)
+        self.light = (mode or SERP_BROWSER["mode"]) == "light"
+        self.blocked_types = set(SERP_BROWSER["blocked_resources"])
+        
+        self.latencies = []
+        self.ok = 0
+        self.failed = 0
+        self.recycled = 0
+        self.elapsed = 0.0
+        self.bytes = 0
+        self.blocked = 0
+    
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._slots = asyncio.Queue()
+            for _ in range(self.contexts):
+                context = await self._new_context()
+                for _ in range(self.pages_per_context):
+                    self._slots.put_nowait(_PageSlot(context, await self._new_page(context)))
+        except BaseException:
+            await self._playwright.stop()
+            raise
+        # 页面数本身也限制了并发，两者取小
+        self._semaphore = asyncio.Semaphore(min(self.concurrency, self._slots.qsize()))
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self._browser.close()
+        await self._playwright.stop()
+    
+    async def _new_context(self):
+        context = await self._browser.new_context()
+        if self.light:
+            await context.route("**/*", self._route)
+        return context
+    
+    async def _new_page(self, context):
+        page = await context.new_page()
+        page.on("requestfinished", self._count_bytes)
+        return page
+    
+    async def _route(self, route):
+        """light 模式：拦截用不到的资源类型和第三方域名"""
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        third_party = SERP_BROWSER["block_third_party"] and _site(host) != self.site
+        if request.resource_type in self.blocked_types or third_party:
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _count_bytes(self, request):
+        sizes = await request.sizes()
+        self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+    
+    def url_for(self, keyword):
+        return f"{self.search_url}?q={quote_plus(keyword)}"
+    
+    async def _recycle(self, slot):
+        """关闭页面并重开一个"""
+        self.recycled += 1
+        try:
+            await slot.page.close()
+        except Exception:
+            pass
+        try:
+            slot.page = await self._new_page(slot.context)
+        except Exception:
+            # context 已失效（例如崩溃），换一个新的
+            slot.context = await self._new_context()
+            slot.page = await self._new_page(slot.context)
+        slot.uses = 0
+    
+    async def _load(self, page, keyword):
+        if self.light:
+            # 不等 load 事件（图片、字体、iframe），HTML 解析完且结果容器出现即可
+            await page.goto(self.url_for(keyword), timeout=self.timeout, wait_until="domcontentloaded")
+            await page.wait_for_selector(SERP_BROWSER["wait_for"], state="attached", timeout=self.timeout)
+        else:
+            await page.goto(self.url_for(keyword), timeout=self.timeout)
+    
+    async def fetch(self, keyword, extract=top_result_links):
+        """加载一个关键词的结果页，用 extract(page) 解析；失败返回 None"""
+        async with self._semaphore:
+            slot = await self._slots.get()
+            try:
+                await self.limiter.wait(self.host)
+                start = time.perf_counter()
+                try:
+                    await self._load(slot.page, keyword)
+                    result = await extract(slot.page)
+                except Exception:
+                    self.failed += 1
+                    await self._recycle(slot)
+                    return None
+                self.latencies.append(time.perf_counter() - start)
+                self.ok += 1
+                slot.uses += 1
+                if slot.uses >= self.max_page_uses:
+                    await self._recycle(slot)
+                return result
+            finally:
+                self._slots.put_nowait(slot)
+    
+    async def run(self, keywords, extract=top_result_links):
+        """并发抓取一批关键词，返回 {keyword: 解析结果或 None}"""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.fetch(keyword, extract) for keyword in keywords))
+        self.elapsed += time.perf_counter() - start
+        return dict(zip(keywords, results))
+    
+    def stats(self):
+        """成功/失败/回收页面数、吞吐量（页/秒）、加载延迟分位数（秒）、每页耗时和字节数、拦截的请求数"""
+        return _latency_stats(self.latencies, self.elapsed, self.ok, self.failed, self.recycled,
+                              self.bytes, self.blocked)
+
+
+class SerpHttpClient:
+    """http 模式：不开浏览器，直接请求结果页 HTML（接口与 SerpBrowserPool 相同）"""
+    
+    def __init__(self, concurrency=None, rate=None, timeout=None, search_url=SEARCH_URL, **_browser_options):
+        self.concurrency = concurrency or SERP_BROWSER["concurrency"]
+        self.timeout = (timeout or SERP_BROWSER["timeout"]) / 1000
+        self.search_url = search_url
+        self.host = urlparse(search_url).netloc
+        self.limiter = AsyncRateLimiter(SERP_BROWSER["rate"] if rate is None else rate)
+        
+        self.latencies = []
+        self.ok = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.bytes = 0
+    
+    async def __aenter__(self):
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+    
+    async def __aexit__(self, *exc):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+    
+    def _get(self, keyword):
+        """在线程池中执行，返回 (html, 响应字节数)；计数留给事件循环，避免多线程同时累加"""
+        response = self.session.get(self.search_url, params={"q": keyword}, timeout=self.timeout)
+        response.raise_for_status()
+        size = len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        return response.text, size
+    
+    async def fetch(self, keyword, extract=parse_result_links):
+        """请求一个关键词的结果页，用 extract(html) 解析；失败返回 None"""
+        async with self._semaphore:
+            await self.limiter.wait(self.host)
+            start = time.perf_counter()
+            try:
+                html, size = await asyncio.get_running_loop().run_in_executor(self._executor, self._get, keyword)
+                self.bytes += size
+                result = extract(html)
+            except Exception:
+                self.failed += 1
+                return None
+            self.latencies.append(time.perf_counter() - start)
+            self.ok += 1
+            return result
+    
+    async def run(self, keywords, extract=parse_result_links):
+        """并发抓取一批关键词，返回 {keyword: 解析结果或 None}"""
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.fetch(keyword, extract) for keyword in keywords))
+        self.elapsed += time.perf_counter() - start
+        return dict(zip(keywords, results))
+    
+    def stats(self):
+        return _latency_stats(self.latencies, self.elapsed, self.ok, self.failed, 0, self.bytes, 0)
+
+
+def fetch_serps(keywords, extract=None, mode=None, keep_html=False, **options):
+    """同步入口：按模式抓取一批关键词，返回 ({keyword: 解析结果或 None}, stats)
+    
+    extract 默认取前 3 个结果链接（keep_html=True 时为 (链接, 页面 HTML)）；
+    浏览器模式传 async extract(page)，http 模式传 extract(html)
+    """
+    mode = mode or SERP_BROWSER["mode"]
+    if extract is None and keep_html:
+        extract = parse_result_links_and_html if mode == "http" else top_result_links_and_html
+    if mode not in MODES:
+        raise ValueError(f"未知的 SERP 抓取模式: {mode}（可选 {', '.join(MODES)}）")
+    
+    async def main():
+        if mode == "http":
+            client = SerpHttpClient(**options)
+        else:
+            client = SerpBrowserPool(mode=mode, **options)
+        async with client:
+            if extract is None:
+                return await client.run(keywords), client.stats()
+            return await client.run(keywords, extract), client.stats()
+    return asyncio.run(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+SERP 结构化解析 - 一次遍历结果页，按顺序取出自然结果链接、广告块和 SERP 特性
+
+- 安装了 selectolax 时用 lexbor（C 实现）解析：全部规则合成一个选择器列表，一次遍历按文档顺序返回命中的节点
+- 未安装时退回标准库 HTMLParser 流式解析，同样只过一遍文档；两种后端结果一致
+- 工具/论坛结果数、广告数等计数都从结构化结果计算，只看结果链接本身，不再对整页小写后逐个 count 子串
+"""
+
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# 自然结果链接所在的容器（div 的 class）
+RESULT_CLASS = "yuRUbf"
+
+# 广告块：带 data-text-ad 属性或 ads-fr class 的 div
+AD_ATTR = "data-text-ad"
+AD_CLASS = "ads-fr"
+
+# SERP 特性：名称 -> (标签, 属性, 值)；属性为 class / id 时按单个 class、id 匹配，值为 None 时只看属性是否存在
+SERP_FEATURES = {
+    "people_also_ask": ("div", "class", "related-question-pair"),
+    "featured_snippet": ("div", "class", "xpdopen"),
+    "knowledge_panel": ("div", "class", "kp-wholepage"),
+    "local_pack": ("div", "class", "VkpGBb"),
+    "shopping": ("div", "class", "commercial-unit-desktop-top"),
+    "image_pack": ("div", "id", "imagebox_bigimages"),
+    "top_stories": ("g-section-with-header", None, None),
+    "video": ("video-voyager", None, None),
+}
+
+
+class SerpPage:
+    """一个结果页的解析结果"""
+    
+    __slots__ = ("organic", "ads", "features")
+    
+    def __init__(self):
+        self.organic = []       # 自然结果链接，按排名
+        self.ads = []           # 每个广告块的落地链接（没有链接的广告块为 None）
+        self.features = []      # 出现的 SERP 特性，按页面上第一次出现的顺序
+
+
+def _target(href):
+    """/url?q= 跳转链接还原成目标地址，其他链接原样返回；不是 http 链接时返回 None"""
+    if href.startswith("/url?"):
+        href = parse_qs(urlparse(href).query).get("q", [""])[0]
+    return href if href.startswith("http") else None
+
+
+def _selector(tag, attr, value):
+    if attr == "class":
+        return f"{tag}.{value}"
+    if attr == "id":
+        return f"{tag}#{value}"
+    if attr:
+        return f"{tag}[{attr}]"
+    return tag
+
+
+def _matches(tag, attrs, spec):
+    spec_tag, attr, value = spec
+    if tag != spec_tag:
+        return False
+    if attr is None:
+        return True
+    if attr not in attrs:
+        return False
+    if value is None:
+        return True
+    if attr == "class":
+        return value in (attrs[attr] or "").split()
+    return attrs[attr] == value
+
+
+_AD_SPECS = (("div", AD_ATTR, None), ("div", "class", AD_CLASS))
+_ORGANIC = f"div.{RESULT_CLASS} a[href]"
+_SELECTOR = ", ".join(
+    [_ORGANIC, 'a[href^="/url?"]']
+    + [_selector(*spec) for spec in _AD_SPECS]
+    + [_selector(*spec) for spec in SERP_FEATURES.values()]
+)
+
+
+def _parse_lexbor(html):
+    page = SerpPage()
+    redirects = []
+    done = set()
+    for node in LexborHTMLParser(html).css(_SELECTOR):
+        # 同时命中多条规则的节点会返回多次
+        if node.mem_id in done:
+            continue
+        done.add(node.mem_id)
+        attrs = node.attributes
+        if node.tag == "a":
+            url = _target(attrs.get("href") or "")
+            if url is None:
+                continue
+            if node.css_matches(_ORGANIC):
+                page.organic.append(url)
+            else:
+                redirects.append(url)
+            continue
+        if any(_matches(node.tag, attrs, spec) for spec in _AD_SPECS):
+            link = node.css_first("a[href]")
+            page.ads.append(_target(link.attributes.get("href") or "") if link is not None else None)
+        for name, spec in SERP_FEATURES.items():
+            if name not in page.features and _matches(node.tag, attrs, spec):
+                page.features.append(name)
+    # 无 JS 版结果页没有结果容器，自然结果是 /url?q= 跳转链接
+    if not page.organic:
+        page.organic = redirects
+    return page
+
+
+class _SinglePassParser(HTMLParser):
+    """标准库后端：一遍流式解析，用 div 栈判断链接是否在结果容器/广告块内"""
+    
+    def __init__(self):
+        super().__init__()
+        self.page = SerpPage()
+        self.redirects = []
+        # 每个打开的 div：(是否结果容器, 广告块下标或 None)
+        self._divs = []
+        self._results_open = 0
+        # 已经找到第一个链接的广告块
+        self._linked = set()
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        page = self.page
+        if tag == "div":
+            is_result = RESULT_CLASS in (attrs.get("class") or "").split()
+            ad = None
+            if any(_matches(tag, attrs, spec) for spec in _AD_SPECS):
+                ad = len(page.ads)
+                page.ads.append(None)
+            self._divs.append((is_result, ad))
+            self._results_open += is_result
+        elif tag == "a" and "href" in attrs:
+            href = attrs["href"] or ""
+            # 广告块的落地链接是块内第一个链接
+            for _, ad in self._divs:
+                if ad is not None and ad not in self._linked:
+                    self._linked.add(ad)
+                    page.ads[ad] = _target(href)
+            url = _target(href)
+            if url is not None:
+                if self._results_open:
+                    page.organic.append(url)
+                elif href.startswith("/url?"):
+                    self.redirects.append(url)
+        for name, spec in SERP_FEATURES.items():
+            if name not in page.features and _matches(tag, attrs, spec):
+                page.features.append(name)
+    
+    def handle_endtag(self, tag):
+        if tag == "div" and self._divs:
+            is_result, _ = self._divs.pop()
+            self._results_open -= is_result
+
+
+def _parse_stdlib(html):
+    parser = _SinglePassParser()
+    parser.feed(html)
+    parser.close()
+    page = parser.page
+    if not page.organic:
+        page.organic = parser.redirects
+    return page
+
+
+def parse_serp(html, backend=None):
+    """解析结果页 HTML，返回 SerpPage
+    
+    backend: "lexbor" / "stdlib"，None 时安装了 selectolax 就用 lexbor
+    """
+    if backend is None:
+        backend = "lexbor" if LexborHTMLParser is not None else "stdlib"
+    if backend == "lexbor":
+        if LexborHTMLParser is None:
+            raise ImportError("需要安装 selectolax: pip install selectolax")
+        return _parse_lexbor(html)
+    return _parse_stdlib(html)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+流式管道 - 用有界队列把挖词和各分析阶段串起来
+
+- 每个阶段一个线程，逐个关键词处理，处理完立即交给下一阶段
+- 队列有容量上限：下游处理不过来时上游自动阻塞（背压）
+- 各阶段结果边产出边追加写入 CSV
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from data_utils import CSVStreamWriter
+
+logger = logging.getLogger(__name__)
+
+# 结束标记，沿管道逐级传递
+_DONE = object()
+
+
+class StreamStage(threading.Thread):
+    """管道中的一个分析阶段
+    
+    analyze(keyword) 返回该关键词在本阶段的结果 dict，
+    结果以阶段名为键记入随关键词流动的 record。
+    limit: 只分析最先到达的 limit 个关键词，其余直接放行
+    """
+    
+    def __init__(self, name, analyze, inbox, outbox, filename=None, limit=None):
+        super().__init__(name=f"stage-{name}", daemon=True)
+        self.stage_name = name
+        self.analyze = analyze
+        self.inbox = inbox
+        self.outbox = outbox
+        self.writer = CSVStreamWriter(filename) if filename else None
+        self.limit = limit
+        
+        self.processed = 0
+        self.seconds = 0.0
+    
+    def run(self):
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is _DONE:
+                    break
+                
+                keyword, record = item
+                if self.limit is None or self.processed < self.limit:
+                    start = time.time()
+                    try:
+                        result = self.analyze(keyword)
+                    except Exception as e:
+                        logger.error(f"{self.stage_name} 阶段分析失败 '{keyword}': {e}")
+                        result = {}
+                    self.seconds += time.time() - start
+                    self.processed += 1
+                    
+                    record[self.stage_name] = result
+                    if self.writer is not None and result:
+                        self.writer.write(result)
+                
+                self.outbox.put(item)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+            self.outbox.put(_DONE)
+
+
+class StreamPipeline:
+    """关键词流式管道
+    
+    用法：
+        pipeline = StreamPipeline(maxsize=100)
+        pipeline.add_stage("gpts", analyze_gpts, filename="step2.csv")
+        pipeline.start()
+        # 生产者线程里调用 pipeline.feed(keywords)，结束后 pipeline.close()
+        for batch in pipeline.batches(64):
+            for keyword, record in batch:
+                ...
+    """
+    
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.source = queue.Queue(maxsize=maxsize)
+        self.stages = []
+        self._specs = []
+        self._seen = set()
+        self._output = self.source
+    
+    def add_stage(self, name, analyze, filename=None, limit=None):
+        """追加一个分析阶段（按添加顺序串联）"""
+        self._specs.append((name, analyze, filename, limit))
+    
+    def start(self):
+        """为每个阶段创建队列和线程"""
+        inbox = self.source
+        for name, analyze, filename, limit in self._specs:
+            outbox = queue.Queue(maxsize=self.maxsize)
+            self.stages.append(StreamStage(name, analyze, inbox, outbox, filename, limit))
+            inbox = outbox
+        self._output = inbox
+        
+        for stage in self.stages:
+            stage.start()
+    
+    def feed(self, keywords):
+        """送入一批关键词（去重）；队列已满时阻塞"""
+        for keyword in keywords:
+            if keyword in self._seen:
+                continue
+            self._seen.add(keyword)
+            self.source.put((keyword, {}))
+    
+    def close(self):
+        """生产结束"""
+        self.source.put(_DONE)
+    
+    def batches(self, max_size):
+        """按完成顺序产出 [(keyword, record), ...]：等到一条结果后，把队列里已经到达的结果一并取出（最多 max_size 条）
+        
+        下游可以按小批量处理，又不会为凑满一批而等待
+        """
+        done = False
+        while not done:
+            item = self._output.get()
+            if item is _DONE:
+                break
+            batch = [item]
+            while len(batch) < max_size:
+                try:
+                    item = self._output.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            yield batch
+        
+        for stage in self.stages:
+            stage.join()
+    
+    def stage_stats(self):
+        """各阶段处理数量和平均耗时"""
+        return {
+            stage.stage_name: {
+                "processed": stage.processed,
+                "avg_seconds": stage.seconds / stage.processed if stage.processed else 0,
+            }
+            for stage in self.stages
+        }
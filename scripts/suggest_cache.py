@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Autocomplete 建议缓存 - SQLite 持久化，所有挖词脚本共享
+
+缓存键: (endpoint, client, ds, hl, query)
+- 按来源（google / youtube）设置不同 TTL
+- 记录命中/未命中次数
+- 条目数超过上限时淘汰最旧的记录
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import SUGGEST_CACHE
+
+
+SUGGEST_URL = "https://suggestqueries.google.com/complete/search"
+
+# 每写入多少条检查一次容量
+EVICT_CHECK_INTERVAL = 500
+
+
+class SuggestCache:
+    """Autocomplete 建议缓存"""
+    
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = Path(path or SUGGEST_CACHE["path"])
+        self.ttl = {**SUGGEST_CACHE["ttl"], **(ttl or {})}
+        self.max_entries = max_entries or SUGGEST_CACHE["max_entries"]
+        
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        
+        # 挖词器会在线程池里读写，统一用一把锁串行化
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS suggestions (
+                endpoint TEXT NOT NULL,
+                client TEXT NOT NULL,
+                ds TEXT NOT NULL,
+                hl TEXT NOT NULL,
+                query TEXT NOT NULL,
+                suggestions TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, client, ds, hl, query)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_fetched_at ON suggestions (fetched_at)")
+        self.conn.commit()
+    
+    def _source_ttl(self, ds):
+        """ds=yt 是 YouTube 建议，其余按 Google 处理"""
+        return self.ttl["youtube"] if ds == "yt" else self.ttl["google"]
+    
+    def get(self, query, endpoint=SUGGEST_URL, client="firefox", ds="", hl=""):
+        """读取未过期的缓存，未命中返回 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT suggestions, fetched_at FROM suggestions "
+                "WHERE endpoint=? AND client=? AND ds=? AND hl=? AND query=?",
+                (endpoint, client, ds, hl, query)
+            ).fetchone()
+            
+            if row and time.time() - row[1] < self._source_ttl(ds):
+                self.hits += 1
+                return json.loads(row[0])
+            
+            self.misses += 1
+            return None
+    
+    def put(self, query, suggestions, endpoint=SUGGEST_URL, client="firefox", ds="", hl=""):
+        """写入一次成功请求的原始建议列表"""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, client, ds, hl, query,
+                 json.dumps(suggestions, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+            
+            self._puts += 1
+            if self._puts % EVICT_CHECK_INTERVAL == 0:
+                self._evict()
+    
+    def _evict(self):
+        """删除过期记录；仍超出容量时按写入时间淘汰最旧的 10%"""
+        now = time.time()
+        self.conn.execute(
+            "DELETE FROM suggestions WHERE (ds = 'yt' AND fetched_at < ?) "
+            "OR (ds != 'yt' AND fetched_at < ?)",
+            (now - self.ttl["youtube"], now - self.ttl["google"])
+        )
+        
+        count = self.conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        if count > self.max_entries:
+            overflow = count - int(self.max_entries * 0.9)
+            self.conn.execute(
+                "DELETE FROM suggestions WHERE rowid IN "
+                "(SELECT rowid FROM suggestions ORDER BY fetched_at LIMIT ?)",
+                (overflow,)
+            )
+        self.conn.commit()
+    
+    def stats(self):
+        """命中统计"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "entries": entries,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_suggest_cache():
+    """进程内共享的默认缓存实例"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SuggestCache()
+    return _default_cache
@@ -9,6 +9,9 @@ from datetime import datetime
 from pathlib import Path
 import sys
 
+from keyword_features import PROFILES, ULTIMATE_INTENT_SIGNALS, ULTIMATE_USER_INTENTS, extract
+from top_k import top_k
+
 # 简化的配置
 CONFIG = {
     "thresholds": {
@@ -23,29 +26,7 @@ CONFIG = {
     "serp_giants": [
         "google.com", "microsoft.com", "adobe.com",
         "canva.com", "figma.com", "notion.so"
-    ],
-    "intent_signals": {
-        "calculator": ["calculator", "calc", "calculation"],
-        "generator": ["generator", "create", "make", "build", "generate"],
-        "converter": ["converter", "convert", "conversion"],
-        "checker": ["checker", "check", "verify", "validate", "test"],
-        "finder": ["finder", "find", "search", "lookup", "locate"],
-        "comparer": ["vs", "versus", "compare", "comparison", "alternative"],
-        "planner": ["planner", "plan", "schedule", "organizer"],
-        "tracker": ["tracker", "track", "monitor", "log"],
-    },
-    "user_intent_patterns": {
-        "calculate": ["calculator", "calc", "calculation", "compute"],
-        "convert": ["convert", "converter", "conversion", "transform"],
-        "generate": ["generator", "create", "make", "generate", "build"],
-        "check": ["check", "checker", "verify", "validate", "test"],
-        "find": ["finder", "find", "search", "lookup", "locate"],
-        "compare": ["compare", "comparison", "vs", "versus", "alternative"],
-        "plan": ["planner", "plan", "schedule", "organize"],
-        "track": ["tracker", "track", "monitor", "log"],
-        "learn": ["learn", "tutorial", "guide", "how to", "explain"],
-        "download": ["download", "downloads", "free"],
-    }
+    ]
 }
 
 
@@ -65,33 +46,21 @@ def generate_keywords(seed_words, count):
     return list(keywords)[:count]
 
 
-def analyze_intent(keyword):
+def analyze_intent(keyword, features=None):
     """分析用户意图"""
-    keyword_lower = keyword.lower()
-    signals = []
-    intent_score = 70
-    
-    for signal_type, trigger_words in CONFIG["intent_signals"].items():
-        if any(tw in keyword_lower for tw in trigger_words):
-            signals.append(signal_type)
-            if signal_type in ["calculator", "generator", "converter"]:
-                intent_score += 30
-            elif signal_type in ["checker", "finder"]:
-                intent_score += 25
-            elif signal_type == "comparer":
-                intent_score += 20
+    if features is None:
+        features = extract(keyword)
+    
+    signals = [signal_type for signal_type in ULTIMATE_INTENT_SIGNALS
+               if features.has(f"ultimate:intent:{signal_type}")]
     
     # 长尾词
-    word_count = len(keyword.split())
-    if 2 <= word_count <= 4:
-        intent_score += 15
+    if features.has("len:2-4"):
         signals.append("long_tail")
     
     # 检测用户意图
-    detected_intents = []
-    for intent, patterns in CONFIG["user_intent_patterns"].items():
-        if any(p in keyword_lower for p in patterns):
-            detected_intents.append(intent)
+    detected_intents = [intent for intent in ULTIMATE_USER_INTENTS
+                        if features.has(f"ultimate:user:{intent}")]
     
     if not detected_intents:
         detected_intents = ["explore"]
@@ -126,7 +95,7 @@ def analyze_intent(keyword):
     
     return {
         "signals": ",".join(signals) if signals else "general",
-        "intent_score": min(intent_score, 100),
+        "intent_score": PROFILES["offline"]["intent"].score(features),
         "user_intent": intent_str,
         "user_goal": user_goal,
         "intent_clarity": clarity
@@ -182,7 +151,7 @@ def gpts_comparison(keyword):
     }
 
 
-def calculate_final_score(keyword, intent_info, serp_info, gpts_info):
+def calculate_final_score(keyword, intent_info, serp_info, gpts_info, features=None):
     """计算最终评分"""
     # Trend Score
     if gpts_info["avg_ratio"] >= 0.20 and gpts_info["growth"] > 0:
@@ -198,13 +167,7 @@ def calculate_final_score(keyword, intent_info, serp_info, gpts_info):
     competition_score = serp_info["competition_score"]
     
     # Buildability Score
-    keyword_lower = keyword.lower()
-    if any(t in keyword_lower for t in ["calculator", "generator", "converter"]):
-        build_score = 100
-    elif any(t in keyword_lower for t in ["online", "free"]):
-        build_score = 85
-    else:
-        build_score = 70
+    build_score = PROFILES["offline"]["buildability"].score(features or extract(keyword))
     
     # 最终评分
     final_score = (trend_score * 0.25 + intent_score * 0.35 + 
@@ -243,11 +206,12 @@ def main():
     
     results = []
     for keyword in keywords:
-        intent_info = analyze_intent(keyword)
+        features = extract(keyword)
+        intent_info = analyze_intent(keyword, features)
         serp_info = serp_analysis(keyword)
         gpts_info = gpts_comparison(keyword)
         
-        final_score, decision = calculate_final_score(keyword, intent_info, serp_info, gpts_info)
+        final_score, decision = calculate_final_score(keyword, intent_info, serp_info, gpts_info, features)
         
         results.append({
             "keyword": keyword,
@@ -263,9 +227,6 @@ def main():
             "signals": intent_info["signals"]
         })
     
-    # 排序
-    results.sort(key=lambda x: x["final_score"], reverse=True)
-    
     # 输出
     print("\n" + "="*60)
     print("🎉 分析完成！")
@@ -283,7 +244,7 @@ def main():
     print(f"\n🏆 TOP 10 机会:")
     print("-" * 60)
     
-    for i, r in enumerate(results[:10], 1):
+    for i, r in enumerate(top_k(results, 10, key=lambda x: x["final_score"]), 1):
         drop_emoji = "💎" if r["降维打击"] else "  "
         print(f"{i:2}. {drop_emoji} {r['keyword'][:40]:<40} | 评分: {r['final_score']:>5} | {r['decision']}")
         print(f"    📌 用户意图: {r['user_goal']} | 意图清晰度: {r['intent_clarity']}")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+限频工具 - 按主机控制请求节奏
+"""
+
+import asyncio
+import threading
+import time
+
+
+class AsyncRateLimiter:
+    """异步限频器：同一主机两次请求之间至少间隔 1/rate 秒"""
+    
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = {}
+    
+    async def wait(self, host):
+        """等待属于该主机的下一个请求时间片"""
+        if not self.interval:
+            return
+        
+        # 事件循环单线程，预约时间片无需加锁
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, 0))
+        self._next_slot[host] = slot + self.interval
+        
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class RateLimiter:
+    """线程安全的限频器：每个主机可单独设置速率，未配置的主机使用默认速率"""
+    
+    def __init__(self, rate=None, rates=None):
+        self.default_interval = 1.0 / rate if rate else 0
+        self.intervals = {host: 1.0 / r for host, r in (rates or {}).items() if r}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, host):
+        """阻塞到属于该主机的下一个请求时间片"""
+        interval = self.intervals.get(host, self.default_interval)
+        if not interval:
+            return
+        
+        # 锁内只预约时间片，睡眠放在锁外，不阻塞其他主机
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0))
+            self._next_slot[host] = slot + interval
+        
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Top-K 选择 - 只取前 K 名时不做全量排序
+
+- 用 numpy.argpartition 的思路先按分数门槛选出前 K 个（O(n)），只对这 K 个排序
+- 同分按原顺序排列，结果与 sorted(..., reverse=True)[:k] 完全一致
+- k 为 None 或 full_sort=True 时退化为一次稳定的全量排序
+"""
+
+import numpy as np
+
+
+def top_k_indices(scores, k=None, full_sort=False):
+    """返回分数最高的 k 个下标（按分数降序，同分按下标升序）"""
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    if k is None or full_sort or k >= n:
+        return np.argsort(-scores, kind='stable')[:k]
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # 第 k 大的分数作为门槛：高于门槛的全部入选，等于门槛的按原顺序补足 k 个
+    threshold = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    chosen = np.sort(np.concatenate([above, ties]))
+    return chosen[np.argsort(-scores[chosen], kind='stable')]
+
+
+def top_k(items, k=None, key=None, full_sort=False):
+    """按 key 取分数最高的 k 个元素（降序）；k 为 None 时返回全部元素的排名"""
+    items = list(items)
+    if k is None or full_sort or k >= len(items):
+        # 全量排名时内置的稳定排序比 numpy 下标再取回元素更快
+        return sorted(items, key=key, reverse=True)[:k]
+    scores = np.fromiter(items if key is None else map(key, items), dtype=float, count=len(items))
+    return [items[i] for i in top_k_indices(scores, k).tolist()]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+趋势指标批量计算 - 一次向量化计算所有关键词
+
+输入为宽表（每列一个关键词、每行一个时间点）或 NumPy 矩阵，
+输出每个关键词的 trend_score / growth / slope / volatility。
+允许各列长度不同（缺失值为 NaN），只使用每列的有效数据点。
+"""
+
+import numpy as np
+import pandas as pd
+
+RECENT_POINTS = 7   # 近期窗口
+OLDER_POINTS = 30   # 对比窗口
+
+
+def _tail_mean(compact, points):
+    """每列最后 points 个有效值的均值（compact 已把 NaN 挤到顶部）"""
+    tail = compact[-points:]
+    valid = ~np.isnan(tail)
+    total = np.where(valid, tail, 0).sum(axis=0)
+    n = valid.sum(axis=0)
+    return np.divide(total, n, out=np.zeros(compact.shape[1]), where=n > 0)
+
+
+def trend_metrics(data, keywords=None):
+    """批量计算趋势指标
+    
+    data: DataFrame（列为关键词）或形状为 (时间点, 关键词) 的矩阵
+    返回以关键词为索引的 DataFrame：
+    - growth: 近 7 个点均值相对近 30 个点均值的增长率（%）
+    - trend_score: 50 + growth，截断到 0-100；无法计算增长时为 0
+    - slope: 最小二乘斜率（每个时间点的变化量）
+    - volatility: 变异系数（标准差 / 均值）
+    """
+    if isinstance(data, pd.DataFrame):
+        keywords = list(data.columns)
+        values = data.to_numpy(dtype=float)
+    else:
+        values = np.asarray(data, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        keywords = keywords if keywords is not None else list(range(values.shape[1]))
+    
+    rows, cols = values.shape
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    
+    # 稳定排序把每列的 NaN 挤到顶部，有效值保持原顺序排在底部
+    order = np.argsort(valid, axis=0, kind='stable')
+    compact = np.take_along_axis(values, order, axis=0)
+    
+    recent = _tail_mean(compact, RECENT_POINTS)
+    older = np.where(counts > RECENT_POINTS, _tail_mean(compact, OLDER_POINTS), recent)
+    
+    has_growth = older > 0
+    growth = np.divide(recent - older, older, out=np.zeros(cols), where=has_growth) * 100
+    trend_score = np.where(has_growth, np.clip(50 + growth, 0, 100), 0)
+    
+    # 每列有效点的时间位置 0..n-1
+    positions = np.arange(rows)[:, None] - (rows - counts)[None, :]
+    filled = np.nan_to_num(compact)
+    compact_valid = positions >= 0
+    n = np.maximum(counts, 1)
+    mean_t = (counts - 1) / 2
+    mean_y = filled.sum(axis=0) / n
+    dt = np.where(compact_valid, positions - mean_t, 0)
+    dy = np.where(compact_valid, filled - mean_y, 0)
+    var_t = (dt ** 2).sum(axis=0)
+    slope = np.divide((dt * dy).sum(axis=0), var_t, out=np.zeros(cols), where=var_t > 0)
+    
+    std_y = np.sqrt((dy ** 2).sum(axis=0) / n)
+    volatility = np.divide(std_y, mean_y, out=np.zeros(cols), where=mean_y > 0)
+    
+    return pd.DataFrame({
+        'trend_score': trend_score,
+        'growth': growth,
+        'slope': slope,
+        'volatility': volatility,
+    }, index=pd.Index(keywords, name='keyword'))
+
+
+def series_frame(series_by_keyword):
+    """{keyword: Series} → 按时间对齐的宽表"""
+    if not series_by_keyword:
+        return pd.DataFrame()
+    return pd.concat(series_by_keyword, axis=1)
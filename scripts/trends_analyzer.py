@@ -6,15 +6,90 @@ Google Trends 分析模块
 import time
 from pytrends.request import TrendReq
 
+from trends_batch import fetch_batched_trends, fetch_incremental_trends
+from trends_store import rising_records
+from trend_metrics import trend_metrics, series_frame
+
+TIMEFRAME = 'today 3-m'  # 最近3个月
+
 
 class TrendsAnalyzer:
     """Google Trends 分析器"""
     
-    def __init__(self):
+    def __init__(self, batched=False, anchor=None, store=None):
         self.pytrends = TrendReq(hl='en-US', tz=360)
+        # batched: 每个 payload 放 5 个词（含锚点词），见 trends_batch
+        self.batched = batched
+        self.anchor = anchor
+        # store: TrendsStore，设置后只拉取缺失或过期的关键词，见 trends_store
+        self.store = store
+        self.payloads = 0
+    
+    def _score_series(self, series):
+        """根据近 7 天 vs 近 30 天的热度变化计算 (趋势得分, 增长率)"""
+        if series.empty:
+            return 0, 0
+        metrics = trend_metrics(series.to_frame()).iloc[0]
+        return metrics['trend_score'], metrics['growth']
     
     def analyze(self, keywords):
         """分析关键词趋势"""
+        if self.store is None:
+            return self._fetch(keywords)
+        
+        fresh, stale, missing = self.store.plan(keywords, TIMEFRAME)
+        
+        # 过期的只拉取最新一段拼接到已有序列，拼接失败的改为完整拉取
+        if stale:
+            failed, payloads = fetch_incremental_trends(self.pytrends, self.store, stale, TIMEFRAME)
+            self.payloads += payloads
+            missing += failed
+        
+        fetched = self._fetch(missing)
+        
+        cached = self._results_from_records({
+            keyword: self.store.get(keyword, TIMEFRAME)
+            for keyword in keywords if keyword not in fetched
+        })
+        return {keyword: fetched.get(keyword) or cached[keyword] for keyword in keywords}
+    
+    def _fetch(self, keywords):
+        """从 Google Trends 拉取"""
+        if self.batched:
+            return self._analyze_batched(keywords)
+        return self._analyze_single(keywords)
+    
+    def _remember(self, keyword, series, rising):
+        """写入时序库（未启用时跳过）"""
+        if self.store is not None:
+            self.store.put(keyword, TIMEFRAME, series, rising)
+    
+    def _results_from_records(self, records):
+        """由时序库记录生成分析结果，所有序列一次向量化计算"""
+        frame = series_frame({kw: rec['series'] for kw, rec in records.items() if rec['series'] is not None})
+        metrics = trend_metrics(frame)
+        
+        results = {}
+        for keyword, record in records.items():
+            result = {
+                'keyword': keyword,
+                'trend_score': 0,
+                'growth': 0,
+                'slope': 0,
+                'volatility': 0,
+                'rising_queries': [q['query'] for q in record['rising'][:5]],
+                'status': 'cached'
+            }
+            if keyword in metrics.index:
+                result.update(metrics.loc[keyword].to_dict())
+            if self.batched:
+                series = record['series']
+                result['avg_interest'] = round(float(series.mean()), 2) if series is not None else 0
+            results[keyword] = result
+        return results
+    
+    def _analyze_single(self, keywords):
+        """逐个关键词一个 payload"""
         results = {}
         
         for keyword in keywords:
@@ -22,11 +97,12 @@ class TrendsAnalyzer:
                 # 构建 payload
                 self.pytrends.build_payload(
                     kw_list=[keyword],
-                    timeframe='today 3-m'  # 最近3个月
+                    timeframe=TIMEFRAME
                 )
                 
                 # 获取兴趣随时间变化
                 interest_over_time = self.pytrends.interest_over_time()
+                self.payloads += 1
                 
                 # 获取相关查询
                 related_queries = self.pytrends.related_queries()
@@ -39,24 +115,23 @@ class TrendsAnalyzer:
                         rising = [q['query'] for q in rising_data.head(5).to_dict('records')]
                 
                 # 计算趋势得分
-                score = 0
+                score, growth = 0, 0
+                series = None
                 if not interest_over_time.empty:
-                    recent = interest_over_time[keyword].tail(7).mean()
-                    older = interest_over_time[keyword].tail(30).mean() if len(interest_over_time) > 7 else recent
-                    if older > 0:
-                        growth = (recent - older) / older * 100
-                        score = min(100, max(0, 50 + growth))
+                    series = interest_over_time[keyword]
+                    score, growth = self._score_series(series)
+                self._remember(keyword, series, rising_records(related_queries, keyword))
                 
                 results[keyword] = {
                     'keyword': keyword,
                     'trend_score': score,
-                    'growth': growth if 'growth' in dir() else 0,
+                    'growth': growth,
                     'rising_queries': rising,
                     'status': 'success'
                 }
                 
                 time.sleep(1)  # 避免限频
-                
+            
             except Exception as e:
                 results[keyword] = {
                     'keyword': keyword,
@@ -68,6 +143,50 @@ class TrendsAnalyzer:
         
         return results
     
+    def _analyze_batched(self, keywords):
+        """批量模式：锚点词 + 4 个关键词一个 payload，请求数约为逐个查询的 1/5"""
+        if not keywords:
+            return {}
+        
+        interest, related, payloads = fetch_batched_trends(
+            self.pytrends, keywords, anchor=self.anchor, timeframe=TIMEFRAME
+        )
+        self.payloads += payloads
+        metrics = trend_metrics(series_frame(interest))
+        
+        results = {}
+        for keyword in keywords:
+            if keyword not in interest:
+                results[keyword] = {
+                    'keyword': keyword,
+                    'trend_score': 50,
+                    'growth': 0,
+                    'avg_interest': 0,
+                    'rising_queries': [],
+                    'status': 'error: no data'
+                }
+                continue
+            
+            self._remember(keyword, interest[keyword], rising_records(related, keyword))
+            
+            rising = []
+            rising_data = (related.get(keyword) or {}).get('rising')
+            if rising_data is not None:
+                rising = [q['query'] for q in rising_data.head(5).to_dict('records')]
+            
+            results[keyword] = {
+                'keyword': keyword,
+                'trend_score': metrics.at[keyword, 'trend_score'],
+                'growth': metrics.at[keyword, 'growth'],
+                'slope': metrics.at[keyword, 'slope'],
+                'volatility': metrics.at[keyword, 'volatility'],
+                'avg_interest': round(float(interest[keyword].mean()), 2),
+                'rising_queries': rising,
+                'status': 'success'
+            }
+        
+        return results
+    
     def get_rising_keywords(self, trends_data, min_growth=10):
         """获取飙升词"""
         rising = []
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Google Trends 批量查询 - 锚点词归一化
+
+pytrends 每个 payload 最多 5 个关键词，但每个 payload 内部会各自归一化到 0-100，
+不同 payload 之间的数值不能直接比较。这里每批固定放入同一个锚点词：
+- 锚点 + 4 个关键词组成一批，请求数约为逐个查询的 1/5
+- 以第一批中锚点的平均热度为基准，按锚点在各批中的热度换算缩放系数，
+  把所有关键词的热度换算到同一个尺度
+- related_queries 每批请求一次，覆盖整批关键词
+
+锚点最好选热度稳定、量级居中的词；锚点热度为 0 的批次无法换算，保留原始数值。
+
+配合 trends_store 时，过期的关键词用 fetch_incremental_trends 只拉取最新一段。
+"""
+
+import time
+
+from trends_store import rising_records
+
+# pytrends 单个 payload 的关键词上限
+PAYLOAD_SIZE = 5
+
+
+def plan_batches(keywords, anchor, batch_size=PAYLOAD_SIZE):
+    """把关键词按 锚点 + (batch_size - 1) 个一组切分"""
+    others = [kw for kw in dict.fromkeys(keywords) if kw != anchor]
+    step = batch_size - 1
+    batches = [[anchor] + others[i:i + step] for i in range(0, len(others), step)]
+    return batches or [[anchor]]
+
+
+def fetch_batched_trends(pytrends, keywords, anchor=None, timeframe='today 3-m',
+                         related=True, delay=1.0):
+    """批量获取热度曲线和相关查询
+    
+    返回 (interest, related_queries, payloads)：
+    - interest: {keyword: 换算到统一尺度后的热度序列}
+    - related_queries: {keyword: pytrends related_queries 的单词结果}
+    - payloads: 实际发出的 payload 数
+    """
+    if not keywords:
+        return {}, {}, 0
+    
+    anchor = anchor or keywords[0]
+    interest = {}
+    related_queries = {}
+    reference = None
+    payloads = 0
+    
+    for batch in plan_batches(keywords, anchor):
+        try:
+            pytrends.build_payload(kw_list=batch, timeframe=timeframe)
+            payloads += 1
+            frame = pytrends.interest_over_time()
+            
+            if not frame.empty:
+                anchor_level = frame[anchor].mean()
+                if reference is None and anchor_level > 0:
+                    reference = anchor_level
+                scale = reference / anchor_level if reference and anchor_level > 0 else 1.0
+                
+                for kw in batch:
+                    if kw in frame and kw not in interest:
+                        interest[kw] = frame[kw] * scale
+            
+            if related:
+                batch_related = pytrends.related_queries() or {}
+                for kw in batch:
+                    if kw in batch_related and kw not in related_queries:
+                        related_queries[kw] = batch_related[kw]
+            
+            time.sleep(delay)  # 避免限频
+        except Exception:
+            continue
+    
+    return interest, related_queries, payloads
+
+
+def fetch_incremental_trends(pytrends, store, keywords, timeframe, geo='',
+                             related=True, delay=1.0):
+    """只拉取已过期关键词的最新一段，拼接到时序库已有序列之后
+    
+    每个关键词靠自己与已有序列的重叠区间换算尺度，不需要锚点词，每批可放满 5 个。
+    返回 (无法拼接、需要完整拉取的关键词, payloads)
+    """
+    failed = []
+    payloads = 0
+    
+    for i in range(0, len(keywords), PAYLOAD_SIZE):
+        batch = keywords[i:i + PAYLOAD_SIZE]
+        try:
+            window = store.incremental_timeframe(batch, timeframe, geo)
+            pytrends.build_payload(kw_list=batch, timeframe=window, geo=geo)
+            payloads += 1
+            frame = pytrends.interest_over_time()
+            batch_related = (pytrends.related_queries() or {}) if related else {}
+            
+            for kw in batch:
+                rising = rising_records(batch_related, kw) if related else None
+                if frame.empty or kw not in frame or not store.extend(kw, timeframe, frame[kw], rising, geo):
+                    failed.append(kw)
+            
+            time.sleep(delay)  # 避免限频
+        except Exception:
+            failed.extend(batch)
+    
+    return failed, payloads
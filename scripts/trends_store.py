@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Google Trends 本地时序库 - SQLite 持久化，支持增量刷新
+
+存储键: (keyword, timeframe, geo)
+- trends_points: 热度序列的每个时间点
+- trends_meta: 飙升查询 + 序列/飙升查询各自的抓取时间（两者可以分开抓取，分别判断是否过期）
+- 未过期的关键词直接读库；过期的日级序列只拉取最后一段并拼接，
+  不再重新拉取整个时间窗口
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from config import TRENDS_STORE
+
+
+def window_days(timeframe):
+    """'today 3-m' → 90 天；无法解析（如 now 7-d、日期区间）返回 None"""
+    match = re.fullmatch(r'today (\d+)-([dmy])', timeframe)
+    if not match:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    return n * {'d': 1, 'm': 30, 'y': 365}[unit]
+
+
+class TrendsStore:
+    """Trends 时序库"""
+    
+    def __init__(self, path=None, ttl=None, overlap_days=None):
+        self.path = Path(path or TRENDS_STORE["path"])
+        self.ttl = {**TRENDS_STORE["ttl"], **(ttl or {})}
+        self.overlap_days = overlap_days or TRENDS_STORE["overlap_days"]
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS trends_meta (
+                keyword TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                geo TEXT NOT NULL,
+                rising TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                series_at REAL,
+                rising_at REAL,
+                PRIMARY KEY (keyword, timeframe, geo)
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(trends_meta)")}
+        if "series_at" not in columns:
+            # 旧库只有一个 fetched_at：有序列的记为序列抓取时间，有飙升查询的记为飙升查询抓取时间
+            self.conn.execute("ALTER TABLE trends_meta ADD COLUMN series_at REAL")
+            self.conn.execute("ALTER TABLE trends_meta ADD COLUMN rising_at REAL")
+            self.conn.execute(
+                "UPDATE trends_meta SET series_at=fetched_at WHERE EXISTS (SELECT 1 FROM trends_points p "
+                "WHERE p.keyword=trends_meta.keyword AND p.timeframe=trends_meta.timeframe AND p.geo=trends_meta.geo)"
+            )
+            self.conn.execute("UPDATE trends_meta SET rising_at=fetched_at WHERE rising != '[]'")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS trends_points (
+                keyword TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                geo TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (keyword, timeframe, geo, ts)
+            )
+        """)
+        self.conn.commit()
+    
+    def _ttl(self, timeframe):
+        """小时级时间范围（now ...）过期更快"""
+        return self.ttl["now"] if timeframe.startswith("now") else self.ttl["today"]
+    
+    def _load_series(self, keyword, timeframe, geo):
+        rows = self.conn.execute(
+            "SELECT ts, value FROM trends_points "
+            "WHERE keyword=? AND timeframe=? AND geo=? ORDER BY ts",
+            (keyword, timeframe, geo)
+        ).fetchall()
+        if not rows:
+            return None
+        series = pd.Series([v for _, v in rows], index=pd.to_datetime([t for t, _ in rows]), name=keyword)
+        
+        # 增量拼接后序列会变长，只返回时间范围内的部分
+        days = window_days(timeframe)
+        if days:
+            series = series[series.index > series.index[-1] - timedelta(days=days)]
+        return series
+    
+    def get(self, keyword, timeframe, geo=""):
+        """读取记录 {series, rising, fetched_at, series_fresh, rising_fresh}；从未抓取过返回 None
+        
+        series_fresh / rising_fresh: 该部分抓取过且未过期（只抓过飙升查询的记录没有序列，反之亦然）
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT rising, fetched_at, series_at, rising_at FROM trends_meta "
+                "WHERE keyword=? AND timeframe=? AND geo=?",
+                (keyword, timeframe, geo)
+            ).fetchone()
+            if row is None:
+                return None
+            rising, fetched_at, series_at, rising_at = row
+            series = self._load_series(keyword, timeframe, geo)
+        now, ttl = time.time(), self._ttl(timeframe)
+        return {
+            "series": series,
+            "rising": json.loads(rising),
+            "fetched_at": fetched_at,
+            "series_fresh": series is not None and series_at is not None and now - series_at < ttl,
+            "rising_fresh": rising_at is not None and now - rising_at < ttl,
+        }
+    
+    def plan(self, keywords, timeframe, geo=""):
+        """把关键词分成三类：
+        fresh: {keyword: 记录}，序列未过期可直接使用
+        stale: 已过期但可增量拼接的关键词（日级时间范围且已有序列）
+        missing: 需要完整拉取的关键词
+        """
+        fresh, stale, missing = {}, [], []
+        incremental = window_days(timeframe) is not None
+        
+        for keyword in dict.fromkeys(keywords):
+            record = self.get(keyword, timeframe, geo)
+            if record and record["series_fresh"]:
+                fresh[keyword] = record
+                self.hits += 1
+                continue
+            
+            self.misses += 1
+            if record and incremental and record["series"] is not None:
+                stale.append(keyword)
+            else:
+                missing.append(keyword)
+        
+        return fresh, stale, missing
+    
+    def incremental_timeframe(self, keywords, timeframe, geo=""):
+        """增量拉取的日期区间：从最早的最后一个点往前 overlap_days 天到今天"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(last_ts) FROM (SELECT MAX(ts) AS last_ts FROM trends_points "
+                f"WHERE timeframe=? AND geo=? AND keyword IN ({','.join('?' * len(keywords))}) "
+                "GROUP BY keyword)",
+                (timeframe, geo, *keywords)
+            ).fetchone()
+        start = pd.Timestamp(row[0]) - timedelta(days=self.overlap_days)
+        return f"{start:%Y-%m-%d} {datetime.now():%Y-%m-%d}"
+    
+    def put(self, keyword, timeframe, series=None, rising=None, geo=""):
+        """整体写入（替换已有序列）"""
+        with self._lock:
+            if series is not None:
+                self.conn.execute(
+                    "DELETE FROM trends_points WHERE keyword=? AND timeframe=? AND geo=?",
+                    (keyword, timeframe, geo)
+                )
+                self._insert_points(keyword, timeframe, geo, series)
+            self._write_meta(keyword, timeframe, geo, series is not None, rising)
+            self.conn.commit()
+    
+    def extend(self, keyword, timeframe, series, rising=None, geo=""):
+        """把新拉取的一段序列拼接到已有序列之后
+        
+        Trends 每次请求都各自归一化到 0-100，用重叠区间的均值比把新数据换算到已有尺度。
+        重叠区间没有热度（无法换算）时返回 False，调用方应改为完整拉取。
+        """
+        with self._lock:
+            stored = self._load_series(keyword, timeframe, geo)
+            if stored is None:
+                return False
+            
+            overlap = series.index[series.index <= stored.index[-1]]
+            overlap = overlap[overlap.isin(stored.index)]
+            new_level = series[overlap].mean() if len(overlap) else 0
+            if not new_level > 0:
+                return False
+            
+            scale = stored[overlap].mean() / new_level
+            self._insert_points(keyword, timeframe, geo, series[series.index > stored.index[-1]] * scale)
+            self._write_meta(keyword, timeframe, geo, True, rising)
+            self.conn.commit()
+            return True
+    
+    def _insert_points(self, keyword, timeframe, geo, series):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO trends_points VALUES (?, ?, ?, ?, ?)",
+            [(keyword, timeframe, geo, pd.Timestamp(ts).isoformat(), float(value))
+             for ts, value in series.items()]
+        )
+    
+    def _write_meta(self, keyword, timeframe, geo, has_series, rising):
+        # 只更新本次抓取到的部分：rising 为 None 表示没有拉取相关查询，保留已有的飙升查询和抓取时间
+        now = time.time()
+        self.conn.execute(
+            "INSERT INTO trends_meta (keyword, timeframe, geo, rising, fetched_at, series_at, rising_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (keyword, timeframe, geo) DO UPDATE SET "
+            "fetched_at=excluded.fetched_at, "
+            "series_at=COALESCE(excluded.series_at, trends_meta.series_at), "
+            "rising=CASE WHEN excluded.rising_at IS NULL THEN trends_meta.rising ELSE excluded.rising END, "
+            "rising_at=COALESCE(excluded.rising_at, trends_meta.rising_at)",
+            (keyword, timeframe, geo, json.dumps(rising or [], ensure_ascii=False, default=str), now,
+             now if has_series else None, now if rising is not None else None)
+        )
+    
+    def load_frames(self):
+        """读出库中全部序列：{(timeframe, geo): 宽表（每列一个关键词）}，供批量重算使用"""
+        with self._lock:
+            points = pd.read_sql_query(
+                "SELECT keyword, timeframe, geo, ts, value FROM trends_points", self.conn
+            )
+        if points.empty:
+            return {}
+        points['ts'] = pd.to_datetime(points['ts'])
+        
+        frames = {}
+        for (timeframe, geo), group in points.groupby(['timeframe', 'geo']):
+            days = window_days(timeframe)
+            if days:
+                last = group.groupby('keyword')['ts'].transform('max')
+                group = group[group['ts'] > last - timedelta(days=days)]
+            frames[(timeframe, geo)] = group.pivot(index='ts', columns='keyword', values='value')
+        return frames
+    
+    def stats(self):
+        """命中统计"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM trends_meta").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0,
+            "entries": entries,
+        }
+
+
+def rising_records(related, keyword, limit=10):
+    """从 pytrends related_queries() 结果中取出某个词的飙升查询 [{query, value}]"""
+    rising = (related or {}).get(keyword) or {}
+    frame = rising.get('rising')
+    if frame is None or frame.empty:
+        return []
+    head = frame.head(limit)
+    return [
+        {'query': query, 'value': value.item() if hasattr(value, 'item') else value}
+        for query, value in zip(head['query'], head['value'])
+    ]
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_trends_store():
+    """进程内共享的默认时序库实例"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = TrendsStore()
+    return _default_store